@@ -9,9 +9,8 @@ def _():
     import polars as pl
     import polars_corpus as plc
     import treesearch
-    from collections import Counter
 
-    return Counter, pl, plc, treesearch
+    return pl, plc, treesearch
 
 
 @app.cell
@@ -41,13 +40,10 @@ def _(pl, plc, table):
 
 
 @app.cell
-def _(Counter, treesearch):
-    query = 'Verb [upos="VERB"];'
+def _(treesearch):
+    query = 'MATCH { Verb [upos="VERB"]; }'
     path = "/Volumes/Corpora/CCOHA/conll/*.conllu.gz"
-    pattern = treesearch.parse_query(query)
-    verbs = Counter(
-        tree.get_word(match["Verb"]).lemma for tree, match in treesearch.search_files(path, pattern)
-    )
+    verbs = treesearch.count(path, query, "Verb.lemma")
     return (verbs,)
 
 
@@ -1,68 +1,122 @@
 import treesearch
 import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Rows per Parquet write: peak memory is one batch of columns, not the whole result
+BATCH_SIZE = 65536
+
+XCOMP_SCHEMA = pa.schema([("head_lemma", pa.string()), ("xcomp_lemma", pa.string())])
+
+
+def write_batch(writer, cols):
+    """Write the buffered columns as one record batch and empty them."""
+    writer.write_batch(pa.RecordBatch.from_pydict(cols, schema=writer.schema))
+    for col in cols.values():
+        col.clear()
 
 
 def xcomps():
     xcomp_query = """
-    Head [upos="VERB"];
-    XComp [upos="VERB" & feats.VerbForm="Inf"];
-    Head -[xcomp]-> XComp;
+    MATCH {
+        Head [upos="VERB"];
+        XComp [upos="VERB" & feats.VerbForm="Inf"];
+        Head -[xcomp]-> XComp;
+    }
     """
 
-    data = []
+    cols = {name: [] for name in XCOMP_SCHEMA.names}
     path = "/Volumes/Corpora/CCOHA/conll/*.conllu.gz"
     pattern = treesearch.compile_query(xcomp_query)
-    for tree, match in treesearch.search_files(path, pattern):
-        main = tree.get_word(match["Head"])
-        xcomp = tree.get_word(match["XComp"])
-        data.append({"head_lemma": main.lemma, "xcomp_lemma": xcomp.lemma})
-    df = pl.DataFrame(data)
-    df.write_parquet("xcomps.parquet")
+    rows = treesearch.project(path, pattern, ["Head.lemma", "XComp.lemma"], ordered=False)
+    with pq.ParquetWriter("xcomps.parquet", XCOMP_SCHEMA, compression="zstd") as writer:
+        for head_lemma, xcomp_lemma in rows:
+            cols["head_lemma"].append(head_lemma)
+            cols["xcomp_lemma"].append(xcomp_lemma)
+            if len(cols["head_lemma"]) == BATCH_SIZE:
+                write_batch(writer, cols)
+        if cols["head_lemma"]:
+            write_batch(writer, cols)
 
 
-def check_dep(tree, node, deprel, tag=None):
-    deps = node.children_by_deprel(deprel)
-    for dep in deps:
-        if tag is None or dep.xpos == tag:
-            return True
-    return False
+# Column types for helps(), given up front so Polars doesn't infer them
+HELP_SCHEMA = {
+    "head_form": pl.String,
+    "transitive": pl.Boolean,
+    "head_to": pl.Boolean,
+    "head_aux": pl.Boolean,
+    "xcomp_lemma": pl.String,
+    "bare_inf": pl.Boolean,
+    "xcomp_transitive": pl.Boolean,
+    "distance": pl.Int32,
+    "doc_id": pl.String,
+    "sent_id": pl.String,
+    "text": pl.String,
+}
 
 
 def helps():
     help_query = """
-    Head [upos="VERB" & lemma="help"];
-    XComp [upos="VERB" & feats.VerbForm="Inf"];
-    Head -[xcomp]-> XComp;
-    Head !-[aux:pass]-> _;
-    _ !-[conj]-> Head;
-    Head !-[conj]-> _;
-    XComp !-[conj]-> _;
-    Head << XComp;
+    MATCH {
+        Head [upos="VERB" & lemma="help"];
+        XComp [upos="VERB" & feats.VerbForm="Inf"];
+        Head -[xcomp]-> XComp;
+        Head !-[aux:pass]-> _;
+        _ !-[conj]-> Head;
+        Head !-[conj]-> _;
+        XComp !-[conj]-> _;
+        Head << XComp;
+    }
     """
 
     path = "/Volumes/Corpora/CCOHA/conll/*.conllu.gz"
-    data = []
+    # One list per column: avoids building (and re-hashing) a dict per match
+    cols = {name: [] for name in HELP_SCHEMA}
+    # Evaluated in Rust for each match (including the lowercasing), so the
+    # loop only sees plain values
+    exprs = [
+        "Head.form.lower",
+        "Head.has_child(obj)",
+        "XComp.has_child(nsubj)",
+        "Head.has_child(mark, TO)",
+        "Head.has_child(aux)",
+        "XComp.lemma",
+        "XComp.has_child(mark, TO)",
+        "XComp.has_child(obj)",
+        "XComp.has_child(ccomp)",
+        "XComp.id - Head.id",
+        "meta.doc_id",
+        "meta.sent_id",
+        "text",
+    ]
     pattern = treesearch.compile_query(help_query)
-    for tree, match in treesearch.search_files(path, pattern):
-        head = tree.get_word(match["Head"])
-        xcomp = tree.get_word(match["XComp"])
-        data.append(
-            {
-                "head_form": head.form.lower(),
-                "transitive": check_dep(tree, head, "obj") or check_dep(tree, xcomp, "nsubj"),
-                "head_to": check_dep(tree, head, "mark", tag="TO"),
-                "head_aux": check_dep(tree, head, "aux"),
-                "xcomp_lemma": xcomp.lemma,
-                "bare_inf": not check_dep(tree, xcomp, "mark", tag="TO"),
-                "xcomp_transitive": check_dep(tree, xcomp, "obj")
-                or check_dep(tree, xcomp, "ccomp"),
-                "distance": int(xcomp.id - head.id),
-                "doc_id": tree.metadata["doc_id"],
-                "sent_id": tree.metadata["sent_id"],
-                "text": tree.sentence_text,
-            }
-        )
-    df = pl.DataFrame(data)
+    for (
+        head_form,
+        head_obj,
+        xcomp_nsubj,
+        head_to,
+        head_aux,
+        xcomp_lemma,
+        xcomp_to,
+        xcomp_obj,
+        xcomp_ccomp,
+        distance,
+        doc_id,
+        sent_id,
+        text,
+    ) in treesearch.project(path, pattern, exprs, ordered=False):
+        cols["head_form"].append(head_form)
+        cols["transitive"].append(head_obj or xcomp_nsubj)
+        cols["head_to"].append(head_to)
+        cols["head_aux"].append(head_aux)
+        cols["xcomp_lemma"].append(xcomp_lemma)
+        cols["bare_inf"].append(not xcomp_to)
+        cols["xcomp_transitive"].append(xcomp_obj or xcomp_ccomp)
+        cols["distance"].append(distance)
+        cols["doc_id"].append(doc_id)
+        cols["sent_id"].append(sent_id)
+        cols["text"].append(text)
+    df = pl.DataFrame(cols, schema=HELP_SCHEMA)
     df.write_parquet("help.parquet")
 
 
@@ -1,15 +1,16 @@
 # import click
 import treesearch
-from collections import Counter
 
 query = """
-Go [lemma="go"];
-And [form="and"];
-V [xpos="VB"];
-V -[cc]-> And;
-Go -[conj]-> V;
-Go < And;
-And < V;
+MATCH {
+    Go [lemma="go"];
+    And [form="and"];
+    V [xpos="VB"];
+    V -[cc]-> And;
+    Go -[conj]-> V;
+    Go < And;
+    And < V;
+}
 """
 
 # query = """
@@ -19,45 +20,40 @@ And < V;
 # """
 
 query = """
-Help [lemma="help"];
-To [form="to"];
-V [xpos="VB"];
-Help << To;
-To << V;
+MATCH {
+    Help [lemma="help"];
+    To [form="to"];
+    V [xpos="VB"];
+    Help << To;
+    To << V;
+}
 """
 
 
 def main():
-    count = Counter()
-    examples = dict()
     path = "/Volumes/Corpora/COHA/conll/*.conllu.gz"
     pattern = treesearch.compile_query(query)
-    # for filename in tqdm(list(Path(path).rglob("*.conllu.gz"))):
-    for tree, match in treesearch.search_files(path, pattern):
-        dep_path1 = tree.find_path(tree.get_word(match["Help"]), tree.get_word(match["V"]))
-        if dep_path1:
-            dep_path2 = tree.find_path(tree.get_word(match["V"]), tree.get_word(match["To"]))
-            if dep_path2:
-                dep_path = (
-                    tuple([w.deprel for w in dep_path1[1:]]),
-                    tuple([w.deprel for w in dep_path2[1:]]),
-                )
-                count[dep_path] += 1
-                examples[dep_path] = tree.sentence_text
-            # print(dep_path)
-            # print(tree.find_path(tree.get_word(match['Help']),
-            #                     tree.get_word(match['V'])))
-    #
-    #
-    # print(tree.sentence_text)
-    # print()
-    # print(tree.get_word(match['Go']).form, tree.get_word(match['V']).form)
-    # print(tree.get_word(match['Go']))
-    # print(tree.get_word(match['And']))
-    # p#rint(tree.get_word(match['V']))
-    for k, v in count.most_common(25):
-        print(v, k)
-        print(examples[k])
+    paths = ["path(Help, V)", "path(V, To)"]
+    # Tally path pairs in Rust; Python only sees one entry per distinct pair
+    counts = treesearch.count(path, pattern, paths)
+    top = sorted(
+        ((n, key) for key, n in counts.items() if None not in key),
+        reverse=True,
+    )[:25]
+    # The top pairs are frequent, so an example of each turns up early
+    examples = {}
+    wanted = {key for _, key in top}
+    rows = treesearch.project(path, pattern, paths + ["text"], ordered=False)
+    for path1, path2, sentence in rows:
+        key = (path1, path2)
+        if key in wanted:
+            examples[key] = sentence
+            wanted.discard(key)
+            if not wanted:
+                break
+    for n, (path1, path2) in top:
+        print(n, path1, path2)
+        print(examples[(path1, path2)])
         print()
 
 
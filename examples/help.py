@@ -1,5 +1,7 @@
 import treesearch
 import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
 import time
 
 def xcomps():
@@ -11,25 +13,48 @@ def xcomps():
     }
     """
 
-    data = []
+    cols = {"head_lemma": [], "xcomp_lemma": []}
     path = "/Volumes/Corpora/CCOHA/conll/*.conllu.gz"
     pattern = treesearch.compile_query(xcomp_query)
+    # Resolve variable slots once so the loop indexes matches by position
+    head_slot, xcomp_slot = pattern.slot("Head"), pattern.slot("XComp")
 
     treebank = treesearch.load(path)
     for tree, match in treebank.search(pattern, ordered=False):
-        main = tree[match["Head"]]
-        xcomp = tree[match["XComp"]]
-        data.append({"head_lemma": main.lemma, "xcomp_lemma": xcomp.lemma})
-    df = pl.DataFrame(data)
+        main = tree[match[head_slot]]
+        xcomp = tree[match[xcomp_slot]]
+        cols["head_lemma"].append(main.lemma)
+        cols["xcomp_lemma"].append(xcomp.lemma)
+    df = pl.DataFrame(cols)
     df.write_parquet("xcomps.parquet")
 
 
-def check_dep(tree, node, deprel, tag=None):
-    deps = node.children_by_deprel(deprel)
-    for dep in deps:
-        if tag is None or dep.xpos == tag:
-            return True
-    return False
+# Column types for helps(), given up front so nothing has to infer them
+HELP_SCHEMA = pa.schema(
+    [
+        ("head_form", pa.string()),
+        ("transitive", pa.bool_()),
+        ("head_to", pa.bool_()),
+        ("head_aux", pa.bool_()),
+        ("xcomp_lemma", pa.string()),
+        ("bare_inf", pa.bool_()),
+        ("xcomp_transitive", pa.bool_()),
+        ("distance", pa.int32()),
+        ("doc_id", pa.string()),
+        ("sent_id", pa.string()),
+        ("text", pa.string()),
+    ]
+)
+
+# Rows per Parquet write: peak memory is one batch of columns, not the whole result
+BATCH_SIZE = 65536
+
+
+def write_batch(writer, cols):
+    """Write the buffered columns as one record batch and empty them."""
+    writer.write_batch(pa.RecordBatch.from_pydict(cols, schema=writer.schema))
+    for col in cols.values():
+        col.clear()
 
 
 def helps():
@@ -56,34 +81,61 @@ def helps():
      """
 
     path = "/Volumes/Corpora/CCOHA/conll/*.conllu.gz"
-    data = []
+    # One list per column: avoids building (and re-hashing) a dict per match
+    cols = {name: [] for name in HELP_SCHEMA.names}
+    # Evaluated in Rust for each match, so the loop only sees plain values
+    exprs = [
+        "Head.form.lower",
+        "Head.has_child(obj)",
+        "XComp.has_child(nsubj)",
+        "HeadTo.id",
+        "Head.has_child(aux)",
+        "XComp.lemma",
+        "XCompTo.id",
+        "XComp.has_child(obj)",
+        "XComp.has_child(ccomp)",
+        "XComp.id - Head.id",
+        "meta.doc_id",
+        "meta.sent_id",
+        "text",
+    ]
     pattern = treesearch.compile_query(help_query)
 
     treebank = treesearch.load(path)
-    for tree, match in treebank.search(pattern, ordered=False):
-        head = tree[match["Head"]]
-        xcomp = tree[match["XComp"]]
-        data.append(
-            {
-                "head_form": head.form.lower(),
-                "transitive": check_dep(tree, head, "obj") or check_dep(tree, xcomp, "nsubj"),
-                #"head_to": check_dep(tree, head, "mark", tag="TO"),
-                "head_to": "HeadTo" in match,
-                "head_aux": check_dep(tree, head, "aux"),
-                "xcomp_lemma": xcomp.lemma,
-                #"bare_inf": not check_dep(tree, xcomp, "mark", tag="TO"),
-                "bare_inf": "XCompTo" not in match,
-                "xcomp_transitive": check_dep(tree, xcomp, "obj")
-                or check_dep(tree, xcomp, "ccomp"),
-                "distance": int(xcomp.id - head.id),
-                "doc_id": tree.metadata["doc_id"],
-                "sent_id": tree.metadata["sent_id"],
-                "text": tree.sentence_text,
-            }
-        )
-    df = pl.DataFrame(data)
-    print(len(df))
-    df.write_parquet("help.parquet")
+    n = 0
+    with pq.ParquetWriter("help.parquet", HELP_SCHEMA, compression="zstd") as writer:
+        for (
+            head_form,
+            head_obj,
+            xcomp_nsubj,
+            head_to,
+            head_aux,
+            xcomp_lemma,
+            xcomp_to,
+            xcomp_obj,
+            xcomp_ccomp,
+            distance,
+            doc_id,
+            sent_id,
+            text,
+        ) in treebank.project(pattern, exprs, ordered=False):
+            cols["head_form"].append(head_form)
+            cols["transitive"].append(head_obj or xcomp_nsubj)
+            cols["head_to"].append(head_to is not None)
+            cols["head_aux"].append(head_aux)
+            cols["xcomp_lemma"].append(xcomp_lemma)
+            cols["bare_inf"].append(xcomp_to is None)
+            cols["xcomp_transitive"].append(xcomp_obj or xcomp_ccomp)
+            cols["distance"].append(distance)
+            cols["doc_id"].append(doc_id)
+            cols["sent_id"].append(sent_id)
+            cols["text"].append(text)
+            n += 1
+            if len(cols["text"]) == BATCH_SIZE:
+                write_batch(writer, cols)
+        if cols["text"]:
+            write_batch(writer, cols)
+    print(n)
 
 
 if __name__ == "__main__":
@@ -2,24 +2,29 @@
 
 from __future__ import annotations
 
-import glob
+import functools
+import os
+from collections.abc import Mapping
 from importlib.metadata import version
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Iterable
 
 __version__ = version("treesearch-ud")
 
 try:
     from .treesearch import (
+        BatchMatchIterator,
+        Match,
         MatchIterator,
         Pattern,
+        ProjectionIterator,
         Tree,
         Treebank,
         TreeIterator,
         Word,
-        compile_query,
         py_search_trees,
     )
+    from .treesearch import compile_query as _compile_query
 except ImportError:
     import sys
 
@@ -30,35 +35,126 @@ except ImportError:
     )
     raise
 
+# Treebank constructors bound once, so load() and from_string() don't look
+# them up on the class on every call
+_from_file = Treebank.from_file
+_from_files = Treebank.from_files
+_from_glob = Treebank.from_glob
+_from_string = Treebank.from_string
+_fspath = os.fspath
+
+# Match supports the read-only mapping protocol, so code written against the
+# old dict results (``dict(match)``, ``match.get(...)``) keeps working
+Mapping.register(Match)
 
 __all__ = [
     "Tree",
     "Word",
     "Pattern",
+    "Match",
     "Treebank",
     "TreeIterator",
     "MatchIterator",
+    "BatchMatchIterator",
+    "ProjectionIterator",
     "compile_query",
-    "search",
+    "precompile",
     "load",
     "from_string",
     "trees",
     "search",
+    "search_many",
+    "search_unordered",
+    "project",
+    "count",
     "search_trees",
     "to_displacy",
     "render",
 ]
 
 
+@functools.lru_cache(maxsize=1024)
+def compile_query(query: str) -> Pattern:
+    """Compile a query string into a Pattern.
+
+    Compiled patterns are cached on the query text (the last 1024 distinct
+    strings), so compiling the same string again returns the same Pattern
+    without parsing it. Patterns are immutable, so one can be shared freely,
+    including across threads. ``compile_query.cache_info()`` and
+    ``compile_query.cache_clear()`` inspect and empty the cache.
+
+    Args:
+        query: Query string in treesearch query language
+
+    Returns:
+        Compiled Pattern object
+
+    Raises:
+        ValueError: If query syntax is invalid
+    """
+    return _compile_query(query)
+
+
+def precompile(queries: Mapping[str, str]) -> dict[str, Pattern]:
+    """Compile a set of named queries up front.
+
+    Each query goes through the compile_query() cache, so later searches
+    passing the same query strings reuse these Patterns.
+
+    Args:
+        queries: Mapping of names to query strings
+
+    Returns:
+        Dict mapping each name to its compiled Pattern
+
+    Raises:
+        ValueError: If any query's syntax is invalid
+
+    Example:
+        >>> patterns = treesearch.precompile({
+        ...     "subj": "MATCH { V []; S []; V -[nsubj]-> S; }",
+        ...     "obj": "MATCH { V []; O []; V -[obj]-> O; }",
+        ... })
+        >>> hits = treesearch.count("corpus.conllu", patterns["obj"])
+    """
+    return {name: compile_query(query) for name, query in queries.items()}
+
+
+def _as_pattern(query: str | Pattern) -> Pattern:
+    """Compile a query string (reusing earlier compilations), or pass a Pattern through."""
+    return compile_query(query) if isinstance(query, str) else query
+
+
+def _load_str(source: str) -> Treebank:
+    # Only strings with wildcards go through glob expansion
+    if any(c in source for c in "*?["):
+        return _from_glob(source)
+    return _from_file(source)
+
+
+def _load_pathlike(source: os.PathLike) -> Treebank:
+    # Path objects are always taken literally, never as patterns
+    return _from_file(_fspath(source))
+
+
+# load() handlers for the common source types, looked up by exact type; other
+# types (subclasses, other PathLikes, iterables) go through isinstance checks
+_LOAD_DISPATCH = {str: _load_str, type(Path()): _load_pathlike}
+
+
 def load(source: str | Path | Iterable[str | Path]) -> Treebank:
     """Open a treebank from a file or glob pattern.
 
-    Automatically detects whether the path is a glob pattern (contains * or ?)
-    and uses the appropriate method to create a Treebank.
+    Automatically detects whether the path is a glob pattern (a string
+    containing *, ? or [) and uses the appropriate method to create a
+    Treebank. A plain path is opened as given, so a missing file raises
+    OSError when the treebank is iterated; a glob that matches nothing
+    gives an empty treebank.
 
     Args:
         source: Path to a CoNLL-U file or glob pattern (str or pathlib.Path)
-              e.g., "data/*.conllu" or Path("corpus.conllu")
+              e.g., "data/*.conllu" or Path("corpus.conllu"); ``**`` matches
+              any number of directories. Globs are expanded lazily in Rust.
 
     Returns:
         Treebank object
@@ -74,14 +170,17 @@ def load(source: str | Path | Iterable[str | Path]) -> Treebank:
         ...     print(tree.sentence_text)
     """
 
-    if isinstance(source, str):
-        paths = list(glob.glob(source, recursive=True))
-        return Treebank.from_files(paths)
-    elif isinstance(source, Path):
-        return Treebank.from_file(str(source))
-    elif isinstance(source, Iterable):
-        source_list = [str(path) for path in source]
-        return Treebank.from_files(source_list)
+    loader = _LOAD_DISPATCH.get(type(source))
+    if loader is not None:
+        return loader(source)
+    elif isinstance(source, str):
+        return _load_str(source)
+    elif isinstance(source, os.PathLike):
+        return _load_pathlike(source)
+    elif hasattr(source, "__iter__"):
+        # Paths are pulled from the iterable in Rust, without a list copy here;
+        # a plain protocol check avoids the ABC machinery on every call
+        return _from_files(source)
     else:
         raise ValueError("source must be str, Path, or Iterable[str | Path]")
 
@@ -105,7 +204,7 @@ def from_string(text: str) -> Treebank:
         >>> for tree in tb.trees():
         ...     print(tree.sentence_text)
     """
-    return Treebank.from_string(text)
+    return _from_string(text)
 
 
 def trees(source: str | Path | Iterable[str | Path], ordered: bool = True) -> TreeIterator:
@@ -116,10 +215,10 @@ def trees(source: str | Path | Iterable[str | Path], ordered: bool = True) -> Tr
         ordered: If True (default), return trees in deterministic order
 
     Returns:
-        Iterator over Tree objects
+        Iterator over Tree objects. The intermediate Treebank only holds the
+        path or glob pattern; nothing is opened until iteration starts.
     """
-    treebank = load(source)
-    return treebank.trees(ordered=ordered)
+    return load(source).trees(ordered=ordered)
 
 
 def search(
@@ -135,10 +234,114 @@ def search(
         ordered: If True (default), return matches in deterministic order
 
     Returns:
-        Iterator over (Tree, match_dict) tuples
+        Iterator over (Tree, Match) tuples. Nothing is read until it is
+        iterated; files are then parsed and searched in Rust worker threads
+        and matches are handed over in batches, with the GIL released while
+        each batch is produced.
+    """
+    pattern = _as_pattern(query)
+    return load(source).search(pattern, ordered=ordered)
+
+
+def search_unordered(
+    source: str | Path | Iterable[str | Path],
+    query: str | Pattern,
+) -> MatchIterator:
+    """Search one or more files for pattern matches, in whatever order they are found.
+
+    Same as ``search(source, query, ordered=False)``: each worker thread hands
+    its matches over as soon as it has them, with no reordering by file.
+    Use it when matches are only counted or aggregated.
+
+    Args:
+        source: Path to a single file or glob pattern
+        query: Query string or compiled Pattern
+
+    Returns:
+        Iterator over (Tree, Match) tuples
+    """
+    return search(source, query, ordered=False)
+
+
+def search_many(
+    source: str | Path | Iterable[str | Path],
+    queries: Iterable[str | Pattern],
+    ordered: bool = True,
+) -> BatchMatchIterator:
+    """Search one or more files for several patterns in a single pass.
+
+    Each tree is read once and matched against every query, so running N
+    queries costs one parse of the corpus rather than N.
+
+    Args:
+        source: Path to a single file or glob pattern
+        queries: Query strings or compiled Patterns
+        ordered: If True (default), return matches in deterministic order
+            (by tree, then by query)
+
+    Returns:
+        Iterator over (index, Tree, Match) tuples, where index is the
+        position of the matching query in queries
+
+    Example:
+        >>> queries = ["MATCH { V [upos='VERB']; }", "MATCH { N [upos='NOUN']; }"]
+        >>> for i, tree, match in treesearch.search_many("corpus/*.conllu", queries):
+        ...     print(i, tree.sentence_text)
+    """
+    patterns = [_as_pattern(query) for query in queries]
+    return load(source).search_batch(patterns, ordered=ordered)
+
+
+def project(
+    source: str | Path | Iterable[str | Path],
+    query: str | Pattern,
+    exprs: list[str],
+    ordered: bool = True,
+) -> ProjectionIterator:
+    """Search one or more files and project each match to a tuple of values.
+
+    Args:
+        source: Path to a single file or glob pattern
+        query: Query string or compiled Pattern
+        exprs: Projection expressions, e.g. ["Head.lemma", "Head.has_child(obj)"]
+        ordered: If True (default), return rows in deterministic order
+
+    Returns:
+        Iterator over tuples, one value per expression
+
+    Example:
+        >>> for lemma, dist in treesearch.project(
+        ...     "corpus.conllu", query, ["Head.lemma", "XComp.id - Head.id"]
+        ... ):
+        ...     print(lemma, dist)
+    """
+    pattern = _as_pattern(query)
+    return load(source).project(pattern, exprs, ordered=ordered)
+
+
+def count(
+    source: str | Path | Iterable[str | Path],
+    query: str | Pattern,
+    key: str | list[str] | None = None,
+) -> int | dict[Any, int]:
+    """Search one or more files and count matches, in total or by projected value.
+
+    Args:
+        source: Path to a single file or glob pattern
+        query: Query string or compiled Pattern
+        key: Projection expression, a list of expressions for tuple keys, or
+            None to count all matches
+
+    Returns:
+        The number of matches if key is None, otherwise a dict mapping each
+        value (or tuple of values) to its match count
+
+    Example:
+        >>> n = treesearch.count("corpus/*.conllu", "MATCH { V [upos='VERB']; }")
+        >>> verbs = treesearch.count("corpus/*.conllu", "MATCH { V [upos='VERB']; }", "V.lemma")
     """
-    treebank = load(source)
-    return treebank.search(query, ordered=ordered)
+    pattern = _as_pattern(query)
+    return load(source).count(pattern, key)
 
 
 def search_trees(
@@ -152,13 +355,13 @@ def search_trees(
         query: Query string or compiled Pattern
 
     Returns:
-        Iterator over (Tree, match_dict) tuples
+        Iterator over (Tree, Match) tuples. An iterable of trees is consumed
+        lazily, a small batch at a time, so a generator is never collected
+        into a list first.
     """
     if isinstance(source, Tree):
-        source = [source]
-    else:
-        source = list(source)
-    return py_search_trees(source, query)
+        source = (source,)
+    return py_search_trees(source, _as_pattern(query))
 
 
 def to_displacy(tree: Tree) -> dict:
@@ -176,34 +379,16 @@ def to_displacy(tree: Tree) -> dict:
         >>> from spacy import displacy
         >>> displacy.render(data, style="dep", manual=True)
     """
-    words = []
+    forms, tags, heads, deprels = tree.displacy_columns()
+    words = [{"text": form, "tag": tag} for form, tag in zip(forms, tags)]
     arcs = []
-
-    for i in range(len(tree)):
-        word = tree.word(i)
-        words.append({"text": word.form, "tag": word.upos})
-
-        if word.head is not None:
-            head_idx = word.head
-            dep_idx = word.id
-            if head_idx < dep_idx:
-                arcs.append(
-                    {
-                        "start": head_idx,
-                        "end": dep_idx,
-                        "label": word.deprel,
-                        "dir": "right",
-                    }
-                )
-            else:
-                arcs.append(
-                    {
-                        "start": dep_idx,
-                        "end": head_idx,
-                        "label": word.deprel,
-                        "dir": "left",
-                    }
-                )
+    for dep_idx, (head_idx, deprel) in enumerate(zip(heads, deprels)):
+        if head_idx is None:
+            continue
+        if head_idx < dep_idx:
+            arcs.append({"start": head_idx, "end": dep_idx, "label": deprel, "dir": "right"})
+        else:
+            arcs.append({"start": dep_idx, "end": head_idx, "label": deprel, "dir": "left"})
     return {"words": words, "arcs": arcs}
 
 
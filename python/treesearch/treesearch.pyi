@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from typing import Iterator, Optional
+import os
+from typing import Any, Iterable, Iterator, Optional, overload
 
 class Tree:
     """Represents a dependency tree."""
@@ -17,6 +18,11 @@ class Tree:
         """Tree metadata from CoNLL-U comment lines."""
         ...
 
+    @property
+    def root(self) -> Optional[Word]:
+        """The root word (the word with no head), or None for an empty tree."""
+        ...
+
     def word(self, id: int) -> Word:
         """Get word by ID (0-based index).
 
@@ -45,6 +51,27 @@ class Tree:
         """
         ...
 
+    def find_path(self, x: Word, y: Word) -> list[Word] | None:
+        """Find the dependency path from x down to its descendant y.
+
+        Args:
+            x: Ancestor word
+            y: Descendant word
+
+        Returns:
+            Words on the path, starting with x and ending with y, or None if
+            y is not a descendant of x
+        """
+        ...
+
+    def displacy_columns(self) -> tuple[list[str], list[str], list[int | None], list[str]]:
+        """Word forms, UPOS tags, heads and deprels as four parallel lists.
+
+        Fetches everything to_displacy() needs in one call instead of going
+        through a Word object for each word.
+        """
+        ...
+
     def __len__(self) -> int:
         """Number of words in tree."""
         ...
@@ -128,11 +155,89 @@ class Word:
         """
         ...
 
+    def has_child(self, deprel: str, xpos: str | None = None) -> bool:
+        """Check for a child with a specific dependency relation.
+
+        Args:
+            deprel: Dependency relation of the child
+            xpos: If given, the child must also have this XPOS tag
+
+        Returns:
+            True if any child matches
+        """
+        ...
+
     def __repr__(self) -> str: ...
 
 class Pattern:
     """Compiled query pattern."""
 
+    def slot(self, name: str) -> int:
+        """Get the integer slot for a variable name.
+
+        Resolve slots once, outside the loop, and index matches with them:
+        ``match[slot]`` skips the name lookup that ``match["Name"]`` does.
+
+        Args:
+            name: Variable name from the MATCH or an OPTIONAL block
+
+        Returns:
+            Slot index for the variable
+
+        Raises:
+            KeyError: If the pattern has no such variable
+        """
+        ...
+
+    @property
+    def shape(self) -> str:
+        """Structural class of the pattern.
+
+        "single_node" (one variable, no edges), "single_edge" (two variables
+        joined by one positive child edge, solved in a single pass) or
+        "general". EXCEPT and OPTIONAL blocks make a pattern "general".
+        """
+        ...
+
+    def __repr__(self) -> str: ...
+
+class Match:
+    """Variable bindings for a single match.
+
+    Indexed by a slot from Pattern.slot() or by variable name, and yields the
+    id of the bound word. OPTIONAL variables that did not match are unbound.
+
+    Matches can be pickled; to_dict() converts one to a plain dict.
+    """
+
+    def __init__(self, slots: list[str], ids: list[int | None]) -> None:
+        """Rebuild a match from its slot names and the word id bound to each."""
+        ...
+
+    def __getitem__(self, key: int | str) -> int: ...
+    def get(self, key: int | str) -> int | None:
+        """Get the word id bound to a slot or variable name, or None if unbound."""
+        ...
+
+    def __contains__(self, key: int | str) -> bool: ...
+    def __len__(self) -> int: ...
+    def __iter__(self) -> Iterator[str]: ...
+    def keys(self) -> list[str]:
+        """Names of the bound variables."""
+        ...
+
+    def values(self) -> list[int]:
+        """Word ids of the bound variables."""
+        ...
+
+    def items(self) -> list[tuple[str, int]]:
+        """(name, word id) pairs for the bound variables."""
+        ...
+
+    def to_dict(self) -> dict[str, int]:
+        """The bindings as a plain dict of variable names to word ids."""
+        ...
+
     def __repr__(self) -> str: ...
 
 class Treebank:
@@ -163,14 +268,36 @@ class Treebank:
         ...
 
     @classmethod
-    def from_files(cls, file_paths: list[str]) -> Treebank:
+    def from_files(cls, file_paths: Iterable[str | os.PathLike[str]]) -> Treebank:
         """Create treebank from multiple CoNLL-U files.
 
         Args:
-            file_paths: List of paths to CoNLL-U files
+            file_paths: Iterable of paths to CoNLL-U files; read directly,
+                without copying it into a list first
 
         Returns:
             Treebank object
+
+        Raises:
+            TypeError: If file_paths is a single string or yields a non-path
+        """
+        ...
+
+    @classmethod
+    def from_glob(cls, pattern: str) -> Treebank:
+        """Create treebank from CoNLL-U files matching a glob pattern.
+
+        The pattern is expanded each time the treebank is iterated, and files
+        are parsed as soon as they are found.
+
+        Args:
+            pattern: Glob pattern (e.g., "data/*.conllu.gz")
+
+        Returns:
+            Treebank object
+
+        Raises:
+            ValueError: If the glob pattern is invalid
         """
         ...
 
@@ -195,7 +322,68 @@ class Treebank:
                     If False, matches may arrive in any order for better performance.
 
         Returns:
-            Iterator over (Tree, match_dict) tuples
+            Iterator over (Tree, Match) tuples
+        """
+        ...
+
+    def search_batch(
+        self, patterns: list[Pattern | str], ordered: bool = True
+    ) -> BatchMatchIterator:
+        """Search for several patterns in a single pass over the treebank.
+
+        Each tree is parsed once and matched against every pattern.
+
+        Args:
+            patterns: Compiled Patterns or query strings
+            ordered: If True (default), return matches in deterministic order
+                    (by tree, then by pattern). If False, matches may arrive in
+                    any order for better performance.
+
+        Returns:
+            Iterator over (index, Tree, Match) tuples, where index is the
+            position of the matching pattern in patterns
+        """
+        ...
+
+    def project(
+        self, pattern: Pattern | str, exprs: list[str], ordered: bool = True
+    ) -> ProjectionIterator:
+        """Search for pattern matches and project each one to a tuple of values.
+
+        Args:
+            pattern: Compiled Pattern or query string
+            exprs: Projection expressions, e.g. ["Head.lemma", "Head.has_child(obj)"]
+            ordered: If True (default), return rows in deterministic order.
+                    If False, rows may arrive in any order for better performance.
+
+        Returns:
+            Iterator over tuples, one value per expression
+
+        Raises:
+            ValueError: If an expression is invalid or names a variable not in the query
+        """
+        ...
+
+    @overload
+    def count(self, pattern: Pattern | str, key: None = None) -> int: ...
+    @overload
+    def count(self, pattern: Pattern | str, key: str | list[str]) -> dict[Any, int]: ...
+    def count(
+        self, pattern: Pattern | str, key: str | list[str] | None = None
+    ) -> int | dict[Any, int]:
+        """Count pattern matches, optionally grouped by projected values.
+
+        Args:
+            pattern: Compiled Pattern or query string
+            key: A projection expression, a list of expressions, or None
+
+        Returns:
+            The number of matches if key is None, otherwise a dict mapping each
+            value (or tuple of values, if key is a list) to the number of
+            matches that produced it
+
+        Raises:
+            ValueError: If an expression is invalid or names a variable not in the query
         """
         ...
 
@@ -207,11 +395,37 @@ class TreeIterator(Iterator[Tree]):
     def __iter__(self) -> TreeIterator: ...
     def __next__(self) -> Tree: ...
 
-class MatchIterator(Iterator[tuple[Tree, dict[str, int]]]):
-    """Iterator over (Tree, match_dict) tuples."""
+class MatchIterator(Iterator[tuple[Tree, Match]]):
+    """Iterator over (Tree, Match) tuples."""
 
     def __iter__(self) -> MatchIterator: ...
-    def __next__(self) -> tuple[Tree, dict[str, int]]: ...
+    def __next__(self) -> tuple[Tree, Match]: ...
+    def next_batch(self, size: int = 1024) -> list[tuple[Tree, Match]]:
+        """Return the next batch of up to size (tree, match) tuples.
+
+        The batch is produced with the GIL released once. Returns an empty
+        list when the iterator is exhausted.
+        """
+        ...
+
+class BatchMatchIterator(Iterator[tuple[int, Tree, Match]]):
+    """Iterator over (index, Tree, Match) tuples from Treebank.search_batch()."""
+
+    def __iter__(self) -> BatchMatchIterator: ...
+    def __next__(self) -> tuple[int, Tree, Match]: ...
+
+class ProjectionIterator(Iterator[tuple[Any, ...]]):
+    """Iterator over tuples of projected values."""
+
+    def __iter__(self) -> ProjectionIterator: ...
+    def __next__(self) -> tuple[Any, ...]: ...
+    def next_batch(self, size: int = 1024) -> list[tuple[Any, ...]]:
+        """Return the next batch of up to size rows.
+
+        The batch is produced with the GIL released once. Returns an empty
+        list when the iterator is exhausted.
+        """
+        ...
 
 def compile_query(query: str) -> Pattern:
     """Compile query string into Pattern object.
@@ -227,15 +441,17 @@ def compile_query(query: str) -> Pattern:
     """
     ...
 
-def py_search_trees(trees: list[Tree], pattern: Pattern | str) -> MatchIterator:
-    """Search a list of trees for pattern matches.
+def py_search_trees(trees: Iterable[Tree], pattern: Pattern | str) -> MatchIterator:
+    """Search trees for pattern matches.
+
+    Trees are taken from the iterable lazily, a small batch at a time.
 
     Args:
-        trees: List of trees to search
+        trees: Iterable of trees to search
         pattern: Compiled Pattern or query string
 
     Returns:
-        Iterator over (Tree, match_dict) tuples from all trees
+        Iterator over (Tree, Match) tuples from all trees
     """
     ...
 
@@ -28,6 +28,19 @@ impl BytestringPool {
         self.0.lock().unwrap().get_or_intern(bytes)
     }
 
+    /// Intern several strings under a single lock, e.g. all the fields of a word
+    #[inline]
+    pub fn get_or_intern_all<const N: usize>(&mut self, items: [&[u8]; N]) -> [Sym; N] {
+        let mut interner = self.0.lock().unwrap();
+        items.map(|bytes| interner.get_or_intern(bytes))
+    }
+
+    /// Look up the symbol for `bytes` without interning it
+    #[inline]
+    pub fn get(&self, bytes: &[u8]) -> Option<Sym> {
+        self.0.lock().unwrap().get(bytes)
+    }
+
     #[inline]
     pub fn resolve(&self, sym: Sym) -> Arc<[u8]> {
         self.0.lock().unwrap().resolve(sym)
@@ -105,6 +118,11 @@ impl ByteInterner {
         }
     }
 
+    #[inline]
+    pub fn get(&self, bytes: &[u8]) -> Option<Sym> {
+        self.map.get(bytes).copied()
+    }
+
     #[inline]
     pub fn resolve(&self, sym: Sym) -> Arc<[u8]> {
         self.slab[(sym.0.get() - 1) as usize].clone()
@@ -134,13 +152,30 @@ pub fn bs_split_once(bytes: &[u8], delim: u8) -> Option<(&[u8], &[u8])> {
     Some((pair.next()?, pair.next()?))
 }
 
+/// Longest run of decimal digits that always fits in a `usize`
+const ATOI_SAFE_DIGITS: usize = usize::MAX.ilog10() as usize;
+
+/// Parse a non-empty run of ASCII decimal digits, or `None` if `bytes` is
+/// empty, has any other byte, or overflows a `usize`
 #[inline]
 pub fn bs_atoi(bytes: &[u8]) -> Option<usize> {
     let mut n: usize = 0;
 
-    // Fast path: empty slice -> Some(0)? (You can change this if you prefer None.)
     if bytes.is_empty() {
-        return Some(0);
+        return None;
+    }
+
+    // Fast path: IDs and heads are a few digits, too short to overflow, so
+    // only the digit check is needed
+    if bytes.len() <= ATOI_SAFE_DIGITS {
+        for &b in bytes {
+            let d = (b.wrapping_sub(b'0')) as usize;
+            if d > 9 {
+                return None;
+            }
+            n = n * 10 + d;
+        }
+        return Some(n);
     }
 
     for &b in bytes {
@@ -178,6 +213,17 @@ mod tests {
         assert_ne!(sym1, sym2); // Different strings get different Syms
     }
 
+    #[test]
+    fn test_interner_get_or_intern_all() {
+        let mut pool = BytestringPool::new();
+        let the = pool.get_or_intern(b"the");
+        let [a, b, c] = pool.get_or_intern_all([b"the", b"dog", b"the"]);
+
+        assert_eq!(a, the);
+        assert_eq!(c, the);
+        assert_eq!(*pool.resolve(b), *b"dog");
+    }
+
     #[test]
     fn test_interner_resolve() {
         let mut pool = BytestringPool::new();
@@ -187,6 +233,16 @@ mod tests {
         assert_eq!(*resolved, *b"test");
     }
 
+    #[test]
+    fn test_interner_get() {
+        let mut pool = BytestringPool::new();
+        let sym = pool.get_or_intern(b"obj");
+
+        assert_eq!(pool.get(b"obj"), Some(sym));
+        assert_eq!(pool.get(b"nsubj"), None);
+        assert_eq!(pool.get(b"obj"), Some(sym)); // get does not intern
+    }
+
     #[test]
     fn test_interner_empty_string() {
         let mut pool = BytestringPool::new();
@@ -318,14 +374,12 @@ mod tests {
         assert_eq!(bs_atoi(b"42"), Some(42));
         assert_eq!(bs_atoi(b"123456"), Some(123456));
 
-        // Empty string returns Some(0)
-        assert_eq!(bs_atoi(b""), Some(0));
-
         // Leading zeros
         assert_eq!(bs_atoi(b"007"), Some(7));
         assert_eq!(bs_atoi(b"00000"), Some(0));
 
-        // Large numbers
+        // Large numbers, on either side of the unchecked fast path
+        assert_eq!(bs_atoi(b"9999999999999999999"), Some(9999999999999999999));
         assert_eq!(bs_atoi(b"18446744073709551615"), Some(usize::MAX));
     }
 
@@ -348,6 +402,7 @@ mod tests {
         assert_eq!(bs_atoi(b" 42"), None);
         assert_eq!(bs_atoi(b"42 "), None);
         assert_eq!(bs_atoi(b" "), None);
+        assert_eq!(bs_atoi(b""), None);
 
         // Overflow
         assert_eq!(bs_atoi(b"18446744073709551616"), None); // usize::MAX + 1
@@ -8,13 +8,27 @@
 
 use crate::bytes::{BytestringPool, bs_atoi, bs_split_once};
 use crate::tree::{Dep, Features, Misc, TokenId, Tree, WordId};
-use flate2::read::GzDecoder;
+use flate2::bufread::MultiGzDecoder;
+use memmap2::Mmap;
+use rustc_hash::FxBuildHasher;
 use std::collections::HashMap;
 use std::fs::File;
-use std::io::{BufRead, BufReader, Read};
+use std::io::{BufRead, BufReader, Cursor, Read, Seek};
 use std::path::Path;
+use std::sync::mpsc::{Receiver, SyncSender, sync_channel};
+use std::thread;
 use thiserror::Error;
 
+/// Read buffer size for file input (1 MiB): large reads keep syscall overhead
+/// negligible next to decompression and parsing
+const READ_BUFFER_SIZE: usize = 1 << 20;
+
+/// Inflated chunks a gzip reader's background thread may run ahead of parsing
+const INFLATE_AHEAD_CHUNKS: usize = 2;
+
+/// Distinct FEATS fields a reader remembers before starting over
+const FEATURE_CACHE_CAPACITY: usize = 4096;
+
 /// Error during CoNLL-U parsing
 #[derive(Debug, Error)]
 pub enum ParseError {
@@ -66,61 +80,87 @@ pub enum ParseError {
 }
 
 /// CoNLL-U reader that iterates over sentences
+///
+/// Lines are never read into a fresh `String`: each one is parsed as a slice
+/// of the reader's own buffer (the memory map, for plain files), and only a
+/// line cut by a buffer refill is copied, into `line_buffer`, which lives as
+/// long as the reader. Sentence breaks are the empty slices between two
+/// newlines, so no line is split twice.
 pub struct TreeIterator<R: BufRead> {
     reader: R,
     line_num: usize,
     string_pool: BytestringPool,
+    /// Holds a line that straddles a buffer refill; kept between trees so its
+    /// capacity is reused instead of reallocated for each such line
+    line_buffer: Vec<u8>,
+    feature_cache: FeatureCache,
+}
+
+/// FEATS fields already parsed by a reader, keyed by their raw text
+///
+/// A treebank uses a small set of feature bundles (`Number=Sing|Person=3|...`)
+/// over and over, so most words get their features from one lookup and a
+/// copy instead of splitting the field and interning every key and value.
+/// MISC is not cached: it often holds per-token values that never repeat.
+#[derive(Default)]
+struct FeatureCache(HashMap<Box<[u8]>, Features, FxBuildHasher>);
+
+impl FeatureCache {
+    fn parse(
+        &mut self,
+        string_pool: &mut BytestringPool,
+        s: &[u8],
+    ) -> Result<Features, ParseError> {
+        if let Some(feats) = self.0.get(s) {
+            return Ok(feats.clone());
+        }
+        let feats = parse_features(string_pool, s)?;
+        if self.0.len() >= FEATURE_CACHE_CAPACITY {
+            self.0.clear();
+        }
+        self.0.insert(s.into(), feats.clone());
+        Ok(feats)
+    }
 }
 
 impl<R: BufRead> TreeIterator<R> {
     /// Parse a single CoNLL-U line into a Word
     /// Skips multiword tokens (not yet supported), errors on empty nodes
     fn parse_line(
-        &mut self,
         tree: &mut Tree,
+        feature_cache: &mut FeatureCache,
         line: &[u8],
         word_id: WordId,
     ) -> Result<(), ParseError> {
-        let mut fields = line.split(|b| *b == b'\t');
-        let mut field_num = 0;
-
-        // Helper macro to consume the next field with error handling
-        macro_rules! next_field {
-            () => {{
-                let result = fields.next().ok_or_else(|| {
-                    let num = field_num;
-                    field_num += 1;
-                    ParseError::MissingField { field_num: num }
-                })?;
-                field_num += 1;
-                let _ = field_num;
-                result
-            }};
-        }
-
-        let token_id_field = next_field!();
-
-        // Skip multiword tokens (e.g., "1-2")
-        if token_id_field.contains(&b'-') {
+        // Skip multiword tokens (e.g., "1-2") before checking their fields
+        let id_end = memchr::memchr(b'\t', line).unwrap_or(line.len());
+        if line[..id_end].contains(&b'-') {
             return Ok(());
         }
 
+        let [
+            token_id_field,
+            form,
+            lemma,
+            upos,
+            xpos,
+            feats_field,
+            head_field,
+            deprel,
+            deps,
+            misc_field,
+        ] = split_fields(line)?;
+
         let token_id = parse_id(token_id_field)?;
-        let form = next_field!();
-        let lemma = next_field!();
-        let upos = next_field!();
-        let xpos = next_field!();
-        let feats = self.parse_features(next_field!())?;
-        let head = parse_head(next_field!())?;
-        let deprel = next_field!();
-        if next_field!() != b"_" {
+        let feats = match feats_field {
+            b"_" => Features::new(),
+            field => feature_cache.parse(&mut tree.string_pool, field)?,
+        };
+        let head = parse_head(head_field)?;
+        if deps != b"_" {
             return Err(ParseError::UnsupportedExtendedDeprels);
         }
-        let misc = self.parse_features(next_field!())?;
-
-        if fields.next().is_some() {
-            return Err(ParseError::TooManyFields);
-        }
+        let misc = parse_features(&mut tree.string_pool, misc_field)?;
 
         tree.add_word(
             word_id, token_id, form, lemma, upos, xpos, feats, head, deprel, misc,
@@ -128,29 +168,6 @@ impl<R: BufRead> TreeIterator<R> {
         Ok(())
     }
 
-    /// Parse FEATS field (key=value|key=value)
-    fn parse_features(&mut self, s: &[u8]) -> Result<Features, ParseError> {
-        if s == b"_" {
-            return Ok(Features::new());
-        }
-
-        let mut feats = Features::new();
-        for pair in s.split(|b| *b == b'|') {
-            //            let mut kv = pair.split(|b| *b == b'=');
-            //            let (Some(k), Some(v)) = (kv.next(), kv.next()) else {
-            let Some((k, v)) = bs_split_once(pair, b'=') else {
-                return Err(ParseError::InvalidFeatsPair {
-                    pair: str::from_utf8(pair)?.to_string(),
-                });
-            };
-            feats.push((
-                self.string_pool.get_or_intern(k),
-                self.string_pool.get_or_intern(v),
-            ));
-        }
-        Ok(feats)
-    }
-
     /// Parse DEPS field (head:deprel|head:deprel)
     fn _parse_deps(&mut self, s: &[u8]) -> Result<Vec<Dep>, ParseError> {
         let mut deps = Vec::new();
@@ -184,37 +201,65 @@ impl<R: BufRead> TreeIterator<R> {
     }
 }
 
-impl TreeIterator<BufReader<Box<dyn Read + Send>>> {
+impl TreeIterator<Box<dyn BufRead + Send>> {
     /// Create a reader from a file path (transparently handles gzip compression)
+    ///
+    /// Plain files are memory-mapped and parsed in place, straight out of the
+    /// page cache; gzipped files (and anything that can't be mapped, such as a
+    /// pipe) are read through a buffer.
     pub fn from_file(path: &Path) -> std::io::Result<Self> {
-        let file = File::open(path)?;
-        let mut reader = BufReader::new(file);
-
-        // Peek at the magic bytes to detect gzip
-        let buf = reader.fill_buf()?;
-        let reader: Box<dyn Read + Send> = if buf.starts_with(&[0x1f, 0x8b]) {
-            Box::new(GzDecoder::new(reader))
+        let mut file = File::open(path)?;
+
+        // Peek at the magic bytes to detect gzip, then start over
+        let mut magic = Vec::with_capacity(2);
+        (&mut file).take(2).read_to_end(&mut magic)?;
+        file.rewind()?;
+
+        let reader: Box<dyn BufRead + Send> = if magic == [0x1f, 0x8b] {
+            // bufread::MultiGzDecoder inflates straight out of its input buffer
+            // instead of copying through an internal one, and keeps going past
+            // the end of the first member of concatenated (e.g. `cat a.gz b.gz`)
+            // files
+            let compressed = BufReader::with_capacity(READ_BUFFER_SIZE, file);
+            Box::new(InflateAhead::spawn(MultiGzDecoder::new(compressed)))
         } else {
-            Box::new(reader)
+            // SAFETY: the map is only read. As with any mmap, a file truncated
+            // by another process while it is being read can fault; corpora are
+            // not expected to change underneath a search.
+            match unsafe { Mmap::map(&file) } {
+                Ok(map) => {
+                    #[cfg(unix)]
+                    let _ = map.advise(memmap2::Advice::Sequential);
+                    // The whole file is one buffer, so no line is ever copied
+                    // out for straddling a refill
+                    Box::new(Cursor::new(map))
+                }
+                Err(_) => Box::new(BufReader::with_capacity(READ_BUFFER_SIZE, file)),
+            }
         };
 
         Ok(Self {
-            reader: BufReader::new(reader),
+            reader,
             line_num: 0,
             string_pool: BytestringPool::new(),
+            line_buffer: Vec::new(),
+            feature_cache: FeatureCache::default(),
         })
     }
 }
 
-impl TreeIterator<BufReader<std::io::Cursor<String>>> {
+impl<'a> TreeIterator<&'a [u8]> {
     /// Create a reader from a string
-    pub fn from_string(text: &str) -> Self {
-        let cursor = std::io::Cursor::new(text.to_string());
-        let reader = BufReader::new(cursor);
+    ///
+    /// The text is read in place: every line is parsed straight out of `text`
+    /// without being copied into a buffer first.
+    pub fn from_string(text: &'a str) -> Self {
         Self {
-            reader,
+            reader: text.as_bytes(),
             line_num: 0,
             string_pool: BytestringPool::new(),
+            line_buffer: Vec::new(),
+            feature_cache: FeatureCache::default(),
         }
     }
 }
@@ -225,52 +270,66 @@ impl<R: BufRead> Iterator for TreeIterator<R> {
     fn next(&mut self) -> Option<Self::Item> {
         let mut tree = Tree::with_metadata(&self.string_pool, None, HashMap::new());
         let mut word_id: WordId = 0;
-        let mut buffer: Vec<u8> = Vec::with_capacity(100);
         let mut has_content = false;
 
         // Read lines until we hit a blank line (sentence boundary) or EOF
         loop {
             self.line_num += 1;
-            buffer.clear(); // Reuse buffer allocation
 
-            match self.reader.read_until(b'\n', &mut buffer) {
-                Err(e) => {
-                    return Some(Err(ParseError::IoError(e)));
-                }
-                Ok(0) => break, // EOF - always break
-                Ok(_) => {
-                    // Optimization: read_until includes '\n' at end, use O(1) suffix check
-                    // instead of O(n) scan through entire buffer
-                    let line = buffer.strip_suffix(b"\n").unwrap_or(&buffer);
-
-                    if line.is_empty() {
-                        // Blank line = sentence boundary if we have content
-                        if has_content {
-                            break;
-                        }
-                        // Skip leading/multiple blank lines
-                        continue;
+            let available = match self.reader.fill_buf() {
+                Ok(available) => available,
+                Err(e) => return Some(Err(ParseError::IoError(e))),
+            };
+            if available.is_empty() {
+                break; // EOF - always break
+            }
+
+            // Parse the line in place in the reader's buffer; only a line that
+            // straddles a buffer refill (or ends the input without a newline)
+            // is copied out
+            let (line, consumed) = match memchr::memchr(b'\n', available) {
+                Some(end) => (&available[..end], end + 1),
+                None => {
+                    let buffer = &mut self.line_buffer;
+                    buffer.clear();
+                    if let Err(e) = self.reader.read_until(b'\n', buffer) {
+                        return Some(Err(ParseError::IoError(e)));
                     }
+                    (buffer.strip_suffix(b"\n").unwrap_or(buffer), 0)
+                }
+            };
 
-                    if buffer[0] == b'#' {
-                        // Comment/metadata line
-                        parse_comment(line, &mut tree);
-                    } else {
-                        // Regular token line - parse immediately
-                        has_content = true;
-                        if let Err(e) = self.parse_line(&mut tree, line, word_id) {
-                            // Wrap error with line context
-                            let enriched_error = ParseError::LineError {
-                                line_num: self.line_num,
-                                line_content: String::from_utf8_lossy(line).to_string(),
-                                message: e.to_string(),
-                            };
-                            return Some(Err(enriched_error));
-                        }
-                        word_id += 1;
+            let mut error = None;
+            // Blank line = sentence boundary if we have content; leading or
+            // repeated blank lines are skipped
+            let end_of_sentence = line.is_empty() && has_content;
+            if line.is_empty() {
+            } else if line[0] == b'#' {
+                // Comment/metadata line
+                parse_comment(line, &mut tree);
+            } else {
+                // Regular token line - parse immediately
+                has_content = true;
+                match Self::parse_line(&mut tree, &mut self.feature_cache, line, word_id) {
+                    Ok(()) => word_id += 1,
+                    // Wrap error with line context
+                    Err(e) => {
+                        error = Some(ParseError::LineError {
+                            line_num: self.line_num,
+                            line_content: String::from_utf8_lossy(line).to_string(),
+                            message: e.to_string(),
+                        })
                     }
                 }
             }
+
+            self.reader.consume(consumed);
+            if let Some(e) = error {
+                return Some(Err(e));
+            }
+            if end_of_sentence {
+                break;
+            }
         }
 
         // Return None if we broke on EOF with no content
@@ -284,12 +343,238 @@ impl<R: BufRead> Iterator for TreeIterator<R> {
     }
 }
 
+/// A reader that runs another one on a background thread, a chunk ahead
+///
+/// Used for gzip input: the thread reads and inflates the next
+/// `READ_BUFFER_SIZE` chunk while the parser works through the current one,
+/// so decompression overlaps parsing instead of alternating with it. Spent
+/// chunks are sent back for reuse, and dropping the reader stops the thread
+/// at its next send.
+struct InflateAhead {
+    chunks: Receiver<std::io::Result<Vec<u8>>>,
+    spent: SyncSender<Vec<u8>>,
+    current: Vec<u8>,
+    pos: usize,
+}
+
+impl InflateAhead {
+    fn spawn(mut inner: impl Read + Send + 'static) -> Self {
+        let (chunk_tx, chunks) = sync_channel(INFLATE_AHEAD_CHUNKS);
+        let (spent, spent_rx) = sync_channel::<Vec<u8>>(INFLATE_AHEAD_CHUNKS + 1);
+        thread::spawn(move || {
+            loop {
+                let mut chunk = spent_rx
+                    .try_recv()
+                    .unwrap_or_else(|_| Vec::with_capacity(READ_BUFFER_SIZE));
+                chunk.clear();
+                match (&mut inner)
+                    .take(READ_BUFFER_SIZE as u64)
+                    .read_to_end(&mut chunk)
+                {
+                    // End of input: the closed channel tells the reader
+                    Ok(0) => return,
+                    Ok(_) => {
+                        if chunk_tx.send(Ok(chunk)).is_err() {
+                            return;
+                        }
+                    }
+                    Err(e) => {
+                        let _ = chunk_tx.send(Err(e));
+                        return;
+                    }
+                }
+            }
+        });
+        InflateAhead {
+            chunks,
+            spent,
+            current: Vec::new(),
+            pos: 0,
+        }
+    }
+}
+
+impl Read for InflateAhead {
+    fn read(&mut self, buf: &mut [u8]) -> std::io::Result<usize> {
+        let available = self.fill_buf()?;
+        let n = available.len().min(buf.len());
+        buf[..n].copy_from_slice(&available[..n]);
+        self.consume(n);
+        Ok(n)
+    }
+}
+
+impl BufRead for InflateAhead {
+    fn fill_buf(&mut self) -> std::io::Result<&[u8]> {
+        if self.pos == self.current.len() {
+            if let Ok(next) = self.chunks.recv() {
+                let spent = std::mem::replace(&mut self.current, next?);
+                self.pos = 0;
+                let _ = self.spent.try_send(spent);
+            }
+        }
+        Ok(&self.current[self.pos..])
+    }
+
+    fn consume(&mut self, amt: usize) {
+        self.pos = (self.pos + amt).min(self.current.len());
+    }
+}
+
+/// Bytes of a line compared against `\t` per bitmask in `split_tabs`
+const TAB_LANES: usize = 64;
+
+/// Bitmask of the tabs among eight bytes, computed in a general-purpose register
+///
+/// XORing with a run of tabs turns each tab into a zero byte; the zero bytes
+/// are found exactly (no false positives from borrows) and their high bits
+/// gathered into the low byte with one multiply.
+#[inline]
+fn tab_lanes_swar(bytes: [u8; 8]) -> u64 {
+    const TABS: u64 = 0x0909_0909_0909_0909;
+    const LOW7: u64 = 0x7f7f_7f7f_7f7f_7f7f;
+    let x = u64::from_le_bytes(bytes) ^ TABS;
+    let zeros = !(((x & LOW7) + LOW7) | x | LOW7);
+    (zeros >> 7).wrapping_mul(0x0102_0408_1020_4080) >> 56
+}
+
+/// Bitmask of the tabs in `block` (at most `TAB_LANES` bytes).
+///
+/// On x86_64 each 16 bytes take one SSE2 compare and `movemask` (SSE2 is part
+/// of the baseline, so no runtime detection is needed). Other targets, and
+/// the x86_64 tail, go eight bytes at a time with `tab_lanes_swar`; only the
+/// last few bytes are checked one by one.
+fn tab_mask(block: &[u8]) -> u64 {
+    let mut mask = 0u64;
+    let mut i = 0;
+    #[cfg(target_arch = "x86_64")]
+    {
+        use std::arch::x86_64::{
+            __m128i, _mm_cmpeq_epi8, _mm_loadu_si128, _mm_movemask_epi8, _mm_set1_epi8,
+        };
+        while i + 16 <= block.len() {
+            // SAFETY: SSE2 is always available on x86_64, and the unaligned
+            // load reads block[i..i + 16], which the loop condition keeps in
+            // bounds
+            let lanes = unsafe {
+                let bytes = _mm_loadu_si128(block.as_ptr().add(i) as *const __m128i);
+                _mm_movemask_epi8(_mm_cmpeq_epi8(bytes, _mm_set1_epi8(b'\t' as i8)))
+            };
+            mask |= (lanes as u32 as u64) << i;
+            i += 16;
+        }
+    }
+    while let Some(bytes) = block.get(i..i + 8) {
+        mask |= tab_lanes_swar(bytes.try_into().unwrap()) << i;
+        i += 8;
+    }
+    for (j, &b) in block.iter().enumerate().skip(i) {
+        mask |= ((b == b'\t') as u64) << j;
+    }
+    mask
+}
+
+/// Fields in a CoNLL-U token line
+const FIELD_COUNT: usize = 10;
+
+/// Split a token line into exactly its ten fields.
+///
+/// A line that fits in one `TAB_LANES` block (most do) is validated with a
+/// single popcount of its tab mask and cut at the mask's set bits; longer or
+/// malformed lines go through `split_tabs`, which also finds which field is
+/// missing.
+fn split_fields(line: &[u8]) -> Result<[&[u8]; FIELD_COUNT], ParseError> {
+    let mut fields = [&line[..0]; FIELD_COUNT];
+    if line.len() <= TAB_LANES {
+        let mut mask = tab_mask(line);
+        if mask.count_ones() as usize == FIELD_COUNT - 1 {
+            let mut start = 0;
+            for field in &mut fields[..FIELD_COUNT - 1] {
+                let tab = mask.trailing_zeros() as usize;
+                mask &= mask - 1;
+                *field = &line[start..tab];
+                start = tab + 1;
+            }
+            fields[FIELD_COUNT - 1] = &line[start..];
+            return Ok(fields);
+        }
+    }
+
+    let mut split = split_tabs(line);
+    for (field_num, field) in fields.iter_mut().enumerate() {
+        *field = split.next().ok_or(ParseError::MissingField { field_num })?;
+    }
+    if split.next().is_some() {
+        return Err(ParseError::TooManyFields);
+    }
+    Ok(fields)
+}
+
+/// Split a line into its tab-separated fields.
+///
+/// The line is scanned a block at a time into a bitmask of tab positions and
+/// fields are cut at its set bits, found with `trailing_zeros`. A CoNLL-U
+/// line usually fits in one or two blocks, so this is one pass over the
+/// line instead of a separate memchr call for each of its ten fields.
+fn split_tabs(line: &[u8]) -> impl Iterator<Item = &[u8]> {
+    // `mask` holds the tabs not yet cut at in the block starting at
+    // `block_start`; everything before `scanned` has been folded into a mask
+    let mut mask = 0u64;
+    let mut block_start = 0;
+    let mut scanned = 0;
+    let mut field_start = 0;
+    let mut finished = false;
+    std::iter::from_fn(move || {
+        loop {
+            if mask != 0 {
+                let tab = block_start + mask.trailing_zeros() as usize;
+                mask &= mask - 1;
+                let field = &line[field_start..tab];
+                field_start = tab + 1;
+                return Some(field);
+            }
+            if scanned < line.len() {
+                block_start = scanned;
+                scanned = line.len().min(scanned + TAB_LANES);
+                mask = tab_mask(&line[block_start..scanned]);
+                continue;
+            }
+            if finished {
+                return None;
+            }
+            finished = true;
+            return Some(&line[field_start..]);
+        }
+    })
+}
+
+/// Parse FEATS or MISC field (key=value|key=value)
+fn parse_features(string_pool: &mut BytestringPool, s: &[u8]) -> Result<Features, ParseError> {
+    if s == b"_" {
+        return Ok(Features::new());
+    }
+
+    let mut feats = Features::new();
+    for pair in s.split(|b| *b == b'|') {
+        //            let mut kv = pair.split(|b| *b == b'=');
+        //            let (Some(k), Some(v)) = (kv.next(), kv.next()) else {
+        let Some((k, v)) = bs_split_once(pair, b'=') else {
+            return Err(ParseError::InvalidFeatsPair {
+                pair: str::from_utf8(pair)?.to_string(),
+            });
+        };
+        let [k, v] = string_pool.get_or_intern_all([k, v]);
+        feats.push((k, v));
+    }
+    Ok(feats)
+}
+
 /// Parse a comment line (starts with #)
 fn parse_comment(line: &[u8], tree: &mut Tree) {
-    // TODO: deal with bytestring stuff here
+    // Borrowed unless the line is invalid UTF-8
+    let line = String::from_utf8_lossy(line);
 
     // Check for key = value format
-    let line = str::from_utf8(line).unwrap().to_string();
     if let Some((key, value)) = line[1..].split_once("=") {
         let key = key.trim();
         let value = value.trim();
@@ -304,33 +589,32 @@ fn parse_comment(line: &[u8], tree: &mut Tree) {
 
 /// Parse ID field (single integer only)
 fn parse_id(s: &[u8]) -> Result<TokenId, ParseError> {
-    // Check for empty nodes (containing '.')
+    if let Some(id) = bs_atoi(s) {
+        return Ok(id);
+    }
+    // Only a field that isn't a plain number is checked for an empty node
+    // (containing '.'), so ordinary IDs are scanned once
+    let token_id = str::from_utf8(s)?.to_string();
     if s.contains(&b'.') {
-        return Err(ParseError::UnsupportedToken {
-            token_id: str::from_utf8(s)?.to_string(),
-        });
+        Err(ParseError::UnsupportedToken { token_id })
+    } else {
+        Err(ParseError::InvalidTokenId { token_id })
     }
-
-    let Some(id) = bs_atoi(s) else {
-        return Err(ParseError::InvalidTokenId {
-            token_id: str::from_utf8(s)?.to_string(),
-        });
-    };
-    Ok(id)
 }
 
 /// Parse HEAD field (0 or integer)
 fn parse_head(s: &[u8]) -> Result<Option<WordId>, ParseError> {
-    if s == b"0" || s == b"_" {
-        Ok(None) // Root word
-    } else {
-        let Some(head) = bs_atoi(s) else {
-            return Err(ParseError::InvalidHead {
-                head: str::from_utf8(s)?.to_string(),
-            });
-        };
+    if s == b"_" {
+        return Ok(None);
+    }
+    match bs_atoi(s) {
+        // Root word
+        Some(0) => Ok(None),
         // HEAD is 1-indexed in CoNLL-U, convert to 0-indexed WordIds
-        Ok(Some(head - 1))
+        Some(head) => Ok(Some(head - 1)),
+        None => Err(ParseError::InvalidHead {
+            head: str::from_utf8(s)?.to_string(),
+        }),
     }
 }
 
@@ -384,7 +668,47 @@ mod tests {
         // assert_eq!(*tree.string_pool.resolve(tree.words[0].deprel), b"det");
         // assert_eq!(tree.words[2].form, "runs");
         assert_eq!(tree.words[2].head, None); // root
-        assert_eq!(tree.words[2].children.len(), 2); // dog, . (The is child of dog, not runs)
+        assert_eq!(tree.children_of(2).len(), 2); // dog, . (The is child of dog, not runs)
+    }
+
+    #[test]
+    fn test_split_tabs() {
+        let fields: Vec<&[u8]> = split_tabs(b"1\tdog\t\tNOUN").collect();
+        assert_eq!(fields, [&b"1"[..], b"dog", b"", b"NOUN"]);
+        assert_eq!(split_tabs(b"").collect::<Vec<_>>(), [&b""[..]]);
+        assert_eq!(split_tabs(b"a\t").collect::<Vec<_>>(), [&b"a"[..], b""]);
+        assert_eq!(split_tabs(b"abc").collect::<Vec<_>>(), [&b"abc"[..]]);
+
+        // Fields and tabs on both sides of block boundaries
+        for len in [63, 64, 65, 127, 128, 130] {
+            let line: Vec<u8> = (0..len)
+                .map(|i| {
+                    if i % 7 == 6 || i == 63 || i == 64 {
+                        b'\t'
+                    } else {
+                        b'x'
+                    }
+                })
+                .collect();
+            let expected: Vec<&[u8]> = line.split(|&b| b == b'\t').collect();
+            assert_eq!(split_tabs(&line).collect::<Vec<_>>(), expected, "len {len}");
+        }
+    }
+
+    #[test]
+    fn test_parse_comment_invalid_utf8() {
+        let conllu = b"# text = caf\xe9\n# sent_id = 1\n1\tcaf\xc3\xa9\tcaf\xc3\xa9\tNOUN\tNN\t_\t0\troot\t_\t_\n\n";
+        let mut reader = TreeIterator {
+            reader: &conllu[..],
+            line_num: 0,
+            string_pool: BytestringPool::new(),
+            line_buffer: Vec::new(),
+            feature_cache: FeatureCache::default(),
+        };
+        let tree = reader.next().unwrap().unwrap();
+
+        assert_eq!(tree.sentence_text, Some("caf\u{fffd}".to_string()));
+        assert_eq!(tree.metadata.get("sent_id"), Some(&"1".to_string()));
     }
 
     /*
@@ -428,6 +752,14 @@ mod tests {
         // Empty nodes are not supported
         assert!(parse_id(b"2.1").is_err());
         assert!(parse_id(b"10.5").is_err());
+        assert!(matches!(
+            parse_id(b""),
+            Err(ParseError::InvalidTokenId { .. })
+        ));
+        assert!(matches!(
+            parse_id(b"1x"),
+            Err(ParseError::InvalidTokenId { .. })
+        ));
     }
 
     #[test]
@@ -467,6 +799,27 @@ mod tests {
         assert!(first.unwrap().is_err());
     }
 
+    #[test]
+    fn test_repeated_feats_share_parsed_pairs() {
+        let conllu = "1\tdogs\tdog\tNOUN\tNNS\tNumber=Plur\t2\tnsubj\t_\t_\n\
+                      2\tcats\tcat\tNOUN\tNNS\tNumber=Plur\t0\troot\t_\t_\n\n\
+                      1\tmice\tmouse\tNOUN\tNNS\tNumber=Plur\t0\troot\t_\t_\n\
+                      2\tx\tx\tX\tX\tNumber\t1\tdep\t_\t_\n\n";
+        let mut reader = TreeIterator::from_string(conllu);
+        let first = reader.next().unwrap().unwrap();
+        let pair = (
+            first.string_pool.get(b"Number").unwrap(),
+            first.string_pool.get(b"Plur").unwrap(),
+        );
+        assert_eq!(first.words[0].feats, vec![pair]);
+        assert_eq!(first.words[1].feats, vec![pair]);
+
+        // A cached bundle is reused across trees; a bad one is still an error
+        let second = reader.next().unwrap();
+        assert!(second.is_err());
+        assert_eq!(reader.feature_cache.0.len(), 1);
+    }
+
     #[test]
     fn test_parse_misc() {
         let conllu = "1\tword\tlemma\tUPOS\tXPOS\tNumber=Plur\t0\troot\t_\tSpaceAfter=No\n\n";
@@ -492,6 +845,9 @@ mod tests {
         assert_eq!(parse_head(b"0").unwrap(), None);
         assert_eq!(parse_head(b"1").unwrap(), Some(0)); // 1-indexed to 0-indexed
         assert_eq!(parse_head(b"5").unwrap(), Some(4));
+        assert_eq!(parse_head(b"_").unwrap(), None);
+        assert!(parse_head(b"").is_err());
+        assert!(parse_head(b"x").is_err());
     }
 
     // Error handling tests
@@ -526,6 +882,49 @@ mod tests {
         assert!(err.to_string().contains("line 1"));
     }
 
+    #[test]
+    fn test_tab_masks() {
+        let naive = |bytes: &[u8]| {
+            bytes
+                .iter()
+                .enumerate()
+                .fold(0u64, |mask, (i, &b)| mask | (((b == b'\t') as u64) << i))
+        };
+        // Bytes next to 0x09 in value, and high-bit bytes, must not count
+        let alphabet = [b'\t', 0x08, 0x0a, 0x00, 0x01, 0x80, 0x89, 0xff, b'a'];
+        let block: Vec<u8> = (0..TAB_LANES)
+            .map(|i| alphabet[(i * 7 + i / 3) % alphabet.len()])
+            .collect();
+        for start in 0..8 {
+            let bytes: [u8; 8] = block[start..start + 8].try_into().unwrap();
+            assert_eq!(tab_lanes_swar(bytes), naive(&bytes));
+        }
+        for len in 0..=TAB_LANES {
+            assert_eq!(tab_mask(&block[..len]), naive(&block[..len]), "len {len}");
+        }
+    }
+
+    #[test]
+    fn test_split_fields() {
+        let short = b"1\tThe\tthe\tDET\tDT\t_\t2\tdet\t_\t_";
+        let long = b"12\tunderstanding\tunderstand\tVERB\tVBG\t\
+                     Tense=Pres|VerbForm=Part\t3\tadvcl\t_\tSpaceAfter=No";
+        assert!(long.len() > TAB_LANES);
+        for line in [&short[..], &long[..]] {
+            let expected: Vec<_> = line.split(|&b| b == b'\t').collect();
+            assert_eq!(split_fields(line).unwrap().to_vec(), expected);
+        }
+
+        assert!(matches!(
+            split_fields(b"1\tword\tlemma"),
+            Err(ParseError::MissingField { field_num: 3 })
+        ));
+        assert!(matches!(
+            split_fields(b"1\ta\tb\tc\td\te\tf\tg\th\ti\tj"),
+            Err(ParseError::TooManyFields)
+        ));
+    }
+
     #[test]
     fn test_error_too_many_fields() {
         // 11 fields - all valid until we check field count
@@ -538,13 +937,8 @@ mod tests {
 
     #[test]
     fn test_error_invalid_feats_pair() {
-        let pool = BytestringPool::new();
-        let mut reader = TreeIterator {
-            reader: BufReader::new(std::io::Cursor::new("")),
-            line_num: 0,
-            string_pool: pool,
-        };
-        let err = reader.parse_features(b"InvalidPair").unwrap_err();
+        let mut pool = BytestringPool::new();
+        let err = parse_features(&mut pool, b"InvalidPair").unwrap_err();
         assert!(matches!(err, ParseError::InvalidFeatsPair { .. }));
         assert!(err.to_string().contains("InvalidPair"));
     }
@@ -583,6 +977,149 @@ abc	invalid	lemma	NOUN	NN	_	0	root	_	_
         assert!(err_str.contains("abc")); // Line content in error
     }
 
+    #[test]
+    fn test_lines_straddling_buffer_refills() {
+        // No trailing newline on the last line, and a bad line mid-input
+        let conllu = "# text = The dog runs.\n\
+            1\tThe\tthe\tDET\tDT\t_\t2\tdet\t_\t_\n\
+            2\tdog\tdog\tNOUN\tNN\t_\t3\tnsubj\t_\t_\n\
+            3\truns\trun\tVERB\tVBZ\t_\t0\troot\t_\t_\n\
+            \n\
+            1\tbad\n\
+            \n\
+            1\tCats\tcat\tNOUN\tNNS\t_\t2\tnsubj\t_\t_\n\
+            2\tsleep\tsleep\tVERB\tVBP\t_\t0\troot\t_\t_";
+
+        let read_all = |capacity| {
+            let reader = TreeIterator {
+                reader: BufReader::with_capacity(capacity, std::io::Cursor::new(conllu)),
+                line_num: 0,
+                string_pool: BytestringPool::new(),
+                line_buffer: Vec::new(),
+                feature_cache: FeatureCache::default(),
+            };
+            reader
+                .map(|result| {
+                    result.map(|tree| {
+                        let forms: Vec<_> = tree
+                            .words
+                            .iter()
+                            .map(|w| tree.string_pool.resolve(w.form).to_vec())
+                            .collect();
+                        (tree.sentence_text.clone(), forms)
+                    })
+                })
+                .map(|result| result.map_err(|e| e.to_string()))
+                .collect::<Vec<_>>()
+        };
+
+        let expected = read_all(1 << 16);
+        assert_eq!(expected.len(), 3);
+        assert_eq!(
+            expected[0].as_ref().unwrap().0.as_deref(),
+            Some("The dog runs.")
+        );
+        assert!(expected[1].as_ref().unwrap_err().contains("line 6"));
+        assert_eq!(
+            expected[2].as_ref().unwrap().1,
+            vec![b"Cats".to_vec(), b"sleep".to_vec()]
+        );
+
+        for capacity in [1, 7, 16, 33] {
+            assert_eq!(read_all(capacity), expected, "buffer capacity {}", capacity);
+        }
+    }
+
+    #[test]
+    fn test_from_file_plain_and_gzip() {
+        use flate2::Compression;
+        use flate2::write::GzEncoder;
+        use std::io::Write;
+
+        let conllu = "1\tThe\tthe\tDET\tDT\t_\t2\tdet\t_\t_\n\
+                      2\tdog\tdog\tNOUN\tNN\t_\t0\troot\t_\t_\n\n\
+                      1\tCats\tcat\tNOUN\tNNS\t_\t0\troot\t_\t_\n\n";
+        let dir = tempfile::tempdir().unwrap();
+
+        let plain_path = dir.path().join("test.conllu");
+        std::fs::write(&plain_path, conllu).unwrap();
+
+        let gz_path = dir.path().join("test.conllu.gz");
+        let mut encoder = GzEncoder::new(File::create(&gz_path).unwrap(), Compression::default());
+        encoder.write_all(conllu.as_bytes()).unwrap();
+        encoder.finish().unwrap();
+
+        for path in [plain_path, gz_path] {
+            let trees: Vec<_> = TreeIterator::from_file(&path)
+                .unwrap()
+                .collect::<Result<_, _>>()
+                .unwrap();
+            assert_eq!(trees.len(), 2);
+            assert_eq!(trees[0].words.len(), 2);
+            assert_eq!(trees[1].words.len(), 1);
+        }
+    }
+
+    #[test]
+    fn test_from_file_shorter_than_magic() {
+        let dir = tempfile::tempdir().unwrap();
+        let path = dir.path().join("empty.conllu");
+        std::fs::write(&path, "").unwrap();
+        assert_eq!(TreeIterator::from_file(&path).unwrap().count(), 0);
+    }
+
+    #[test]
+    fn test_inflate_ahead_reads_everything() {
+        // Several chunks' worth, with lines cut at the chunk boundaries
+        let data: Vec<u8> = (0..READ_BUFFER_SIZE * 5 / 2)
+            .map(|i| {
+                if i % 37 == 36 {
+                    b'\n'
+                } else {
+                    b'a' + (i % 26) as u8
+                }
+            })
+            .collect();
+        let mut reader = InflateAhead::spawn(Cursor::new(data.clone()));
+        let mut read_back = Vec::new();
+        reader.read_to_end(&mut read_back).unwrap();
+        assert_eq!(read_back, data);
+        assert!(reader.fill_buf().unwrap().is_empty());
+
+        // Dropping a reader part-way releases its thread instead of blocking
+        let mut reader = InflateAhead::spawn(Cursor::new(data));
+        let mut line = Vec::new();
+        reader.read_until(b'\n', &mut line).unwrap();
+        assert_eq!(line.len(), 37);
+        drop(reader);
+    }
+
+    #[test]
+    fn test_from_file_concatenated_gzip() {
+        use flate2::Compression;
+        use flate2::write::GzEncoder;
+        use std::io::Write;
+
+        let dir = tempfile::tempdir().unwrap();
+        let gz_path = dir.path().join("test.conllu.gz");
+        let mut file = File::create(&gz_path).unwrap();
+        for sentence in [
+            "1\tThe\tthe\tDET\tDT\t_\t2\tdet\t_\t_\n2\tdog\tdog\tNOUN\tNN\t_\t0\troot\t_\t_\n\n",
+            "1\tCats\tcat\tNOUN\tNNS\t_\t0\troot\t_\t_\n\n",
+        ] {
+            let mut encoder = GzEncoder::new(&mut file, Compression::default());
+            encoder.write_all(sentence.as_bytes()).unwrap();
+            encoder.finish().unwrap();
+        }
+
+        let trees: Vec<_> = TreeIterator::from_file(&gz_path)
+            .unwrap()
+            .collect::<Result<_, _>>()
+            .unwrap();
+        assert_eq!(trees.len(), 2);
+        assert_eq!(trees[1].words.len(), 1);
+    }
+
     /*
         #[test]
         fn test_parse_deps() {
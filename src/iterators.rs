@@ -5,14 +5,18 @@
 //! - Searching patterns across trees from a string, file, or glob pattern
 //! - Sequential and parallel iteration via standard traits
 
+use crate::bytes::Sym;
 use crate::conllu::{ParseError, TreeIterator};
 use crate::pattern::Pattern;
-use crate::searcher::{Match, search_tree, tree_matches};
-use crate::tree::Tree;
+use crate::projection::{Projection, Value};
+use crate::searcher::{Match, search_shared_tree, search_tree, tree_matches};
+use crate::tree::{Tree, Word};
 use rayon::prelude::*;
+use std::collections::HashMap;
 use std::path::{Path, PathBuf};
-use std::sync::mpsc::sync_channel;
+use std::sync::{Arc, LazyLock, Mutex};
 use std::thread;
+use std::time::SystemTime;
 use thiserror::Error;
 
 /// Errors that can occur during treebank iteration
@@ -80,7 +84,7 @@ impl<T> BatchAccumulator<T> {
 
 /// Process trees from a string source with batching (for match_iter and filter)
 fn process_string_source_batched<T, F>(
-    text: &str,
+    text: &Arc<str>,
     tx: &crossbeam_channel::Sender<Vec<Result<T, TreebankError>>>,
     process_tree: F,
 ) where
@@ -88,7 +92,7 @@ fn process_string_source_batched<T, F>(
     F: Fn(Tree) -> Vec<Result<T, TreebankError>>,
 {
     let mut batch = BatchAccumulator::new(MATCH_BATCH_SIZE);
-    for result in TreeIterator::from_string(text) {
+    for result in open_text(text) {
         let items = match result {
             Ok(tree) => process_tree(tree),
             Err(e) => vec![Err(TreebankError::from(e))],
@@ -106,9 +110,253 @@ fn process_string_source_batched<T, F>(
     }
 }
 
+/// Number of files to parse concurrently in ordered mode.
+///
+/// One file per worker thread keeps every core busy; chunks are still
+/// processed in order, so results stay deterministic.
+fn ordered_chunk_size() -> usize {
+    rayon::current_num_threads().max(2)
+}
+
+/// Trees of one file, parsed as they are read or replayed from `PARSED_CACHE`
+type FileTrees = Box<dyn Iterator<Item = Result<Tree, ParseError>> + Send>;
+
+/// Environment variable that turns on `PARSED_CACHE` when set to `1`
+const PARSED_CACHE_ENV: &str = "TREESEARCH_CACHE";
+
+/// Rough memory budget for `PARSED_CACHE`, in bytes
+const PARSED_CACHE_CAPACITY: usize = 1 << 30;
+
+/// Trees of files (and in-memory texts) that have already been read in full,
+/// so reading an unchanged file again (a dashboard re-running queries on the
+/// same treebank, say) skips parsing. Off unless `TREESEARCH_CACHE=1`, since
+/// it keeps whole files in memory.
+static PARSED_CACHE: LazyLock<Option<Mutex<ParsedCache>>> = LazyLock::new(|| {
+    let enabled = std::env::var_os(PARSED_CACHE_ENV).is_some_and(|value| value == "1");
+    enabled.then(|| Mutex::new(ParsedCache::new(PARSED_CACHE_CAPACITY)))
+});
+
+/// What a `PARSED_CACHE` entry was parsed from
+#[derive(Debug, Clone, PartialEq, Eq, Hash)]
+enum ParsedKey {
+    /// One version of a file: a cached parse is only reused while the file's
+    /// modification time and size are unchanged
+    File {
+        path: PathBuf,
+        modified: SystemTime,
+        len: u64,
+    },
+    /// In-memory CoNLL-U text, shared with the treebank holding it, so equal
+    /// texts hit the same entry whichever treebank they came from
+    Text(Arc<str>),
+}
+
+impl ParsedKey {
+    /// Key for the file's current version, or `None` if it can't be stat'ed.
+    ///
+    /// The path is canonicalized, so relative paths and symlinks to the same
+    /// file share an entry.
+    fn of(path: &Path) -> Option<Self> {
+        let path = std::fs::canonicalize(path).ok()?;
+        let metadata = std::fs::metadata(&path).ok()?;
+        Some(Self::File {
+            path,
+            modified: metadata.modified().ok()?,
+            len: metadata.len(),
+        })
+    }
+
+    /// Whether `other` is a later version of the same file
+    fn is_superseded_by(&self, other: &ParsedKey) -> bool {
+        match (self, other) {
+            (ParsedKey::File { path, .. }, ParsedKey::File { path: other, .. }) => path == other,
+            _ => false,
+        }
+    }
+
+    /// Bytes the key itself keeps alive
+    fn held_bytes(&self) -> usize {
+        match self {
+            ParsedKey::File { .. } => 0,
+            ParsedKey::Text(text) => text.len(),
+        }
+    }
+}
+
+/// A cached file's trees with their estimated size and last use
+struct ParsedEntry {
+    trees: Arc<Vec<Tree>>,
+    bytes: usize,
+    last_used: u64,
+}
+
+/// Parsed files, evicted least recently used first once their estimated
+/// size passes the capacity
+struct ParsedCache {
+    files: HashMap<ParsedKey, ParsedEntry>,
+    bytes: usize,
+    capacity: usize,
+    clock: u64,
+}
+
+impl ParsedCache {
+    fn new(capacity: usize) -> Self {
+        Self {
+            files: HashMap::new(),
+            bytes: 0,
+            capacity,
+            clock: 0,
+        }
+    }
+
+    fn get(&mut self, key: &ParsedKey) -> Option<Arc<Vec<Tree>>> {
+        self.clock += 1;
+        let entry = self.files.get_mut(key)?;
+        entry.last_used = self.clock;
+        Some(Arc::clone(&entry.trees))
+    }
+
+    fn insert(&mut self, key: ParsedKey, trees: Arc<Vec<Tree>>) {
+        // Older versions of the same file can never be hit again
+        let stale: Vec<_> = self
+            .files
+            .keys()
+            .filter(|k| k.is_superseded_by(&key))
+            .cloned()
+            .collect();
+        for k in stale {
+            self.remove(&k);
+        }
+        let bytes = estimated_size(&trees) + key.held_bytes();
+        if bytes > self.capacity {
+            return;
+        }
+        while self.bytes + bytes > self.capacity {
+            let Some(oldest) = self
+                .files
+                .iter()
+                .min_by_key(|(_, entry)| entry.last_used)
+                .map(|(k, _)| k.clone())
+            else {
+                break;
+            };
+            self.remove(&oldest);
+        }
+        self.clock += 1;
+        self.bytes += bytes;
+        let last_used = self.clock;
+        self.files.insert(
+            key,
+            ParsedEntry {
+                trees,
+                bytes,
+                last_used,
+            },
+        );
+    }
+
+    fn remove(&mut self, key: &ParsedKey) {
+        if let Some(entry) = self.files.remove(key) {
+            self.bytes -= entry.bytes;
+        }
+    }
+}
+
+/// Approximate heap footprint of parsed trees: words, feature pairs, packed
+/// columns and child index. Strings live in the shared pool and aren't counted.
+fn estimated_size(trees: &[Tree]) -> usize {
+    let sym_pair = size_of::<(Sym, Sym)>();
+    trees
+        .iter()
+        .map(|tree| {
+            let features: usize = tree
+                .words
+                .iter()
+                .map(|w| w.feats.len() + w.misc.len())
+                .sum();
+            let words = tree.words.len();
+            size_of::<Tree>()
+                + words * (size_of::<Word>() + 6 * size_of::<u32>() + 2 * size_of::<usize>())
+                + features * sym_pair
+                + tree.sentence_text.as_ref().map_or(0, String::len)
+        })
+        .sum()
+}
+
+/// Open a file's trees, replaying them from `PARSED_CACHE` when it's enabled
+/// and holds the file's current version.
+///
+/// On a miss with the cache enabled the whole file is parsed up front; it is
+/// cached only if every tree parsed cleanly, so errors are reported again on
+/// the next read.
+fn open_file(path: &Path) -> std::io::Result<FileTrees> {
+    let (Some(cache), Some(key)) = (PARSED_CACHE.as_ref(), ParsedKey::of(path)) else {
+        return Ok(Box::new(TreeIterator::from_file(path)?));
+    };
+    if let Some(trees) = cache.lock().unwrap().get(&key) {
+        return Ok(replay(trees));
+    }
+    Ok(parse_into_cache(cache, key, TreeIterator::from_file(path)?))
+}
+
+/// Trees of in-memory text, replayed from `PARSED_CACHE` when it's enabled
+/// and has seen the same text before
+fn open_text(text: &Arc<str>) -> Box<dyn Iterator<Item = Result<Tree, ParseError>> + Send + '_> {
+    let Some(cache) = PARSED_CACHE.as_ref() else {
+        return Box::new(TreeIterator::from_string(text));
+    };
+    let key = ParsedKey::Text(Arc::clone(text));
+    if let Some(trees) = cache.lock().unwrap().get(&key) {
+        return replay(trees);
+    }
+    parse_into_cache(cache, key, TreeIterator::from_string(text))
+}
+
+/// Parse every tree up front, caching them under `key` if all parsed cleanly
+/// (so errors are reported again on the next read)
+fn parse_into_cache(
+    cache: &Mutex<ParsedCache>,
+    key: ParsedKey,
+    trees: impl Iterator<Item = Result<Tree, ParseError>>,
+) -> FileTrees {
+    let results: Vec<_> = trees.collect();
+    if !results.iter().all(Result::is_ok) {
+        return Box::new(results.into_iter());
+    }
+    let trees: Arc<Vec<Tree>> = Arc::new(results.into_iter().filter_map(Result::ok).collect());
+    cache.lock().unwrap().insert(key, Arc::clone(&trees));
+    replay(trees)
+}
+
+/// Yield copies of cached trees, which callers consume by value
+fn replay(trees: Arc<Vec<Tree>>) -> FileTrees {
+    Box::new((0..trees.len()).map(move |i| Ok(trees[i].clone())))
+}
+
+/// Open a chunk of files in parallel.
+///
+/// Opening a file also reads its first buffer (to detect gzip), so a chunk
+/// opened ahead of time has its open and first-read latency already paid.
+fn open_files(paths: &[PathBuf]) -> Vec<Result<FileTrees, TreebankError>> {
+    paths
+        .par_iter()
+        .map(|path| {
+            open_file(path).map_err(|e| TreebankError::FileOpen {
+                path: path.clone(),
+                source: e,
+            })
+        })
+        .collect()
+}
+
 /// Process files in ordered mode with chunking (for match_iter and filter)
+///
+/// The next chunk is parsed while the previous one is being drained by the
+/// consumer, so decompression and parsing never wait on the caller. Files in
+/// the chunk after that are opened while the current chunk is parsed, so
+/// slow opens (e.g. on network volumes) overlap with parsing.
 fn process_files_ordered_batched<T, F>(
-    paths: Vec<PathBuf>,
+    mut paths: PathStream,
     tx: &crossbeam_channel::Sender<Vec<Result<T, TreebankError>>>,
     process_tree: F,
     chunk_size: usize,
@@ -116,74 +364,184 @@ fn process_files_ordered_batched<T, F>(
     T: Send,
     F: Fn(Tree) -> Vec<Result<T, TreebankError>> + Send + Sync,
 {
-    for chunk in paths.chunks(chunk_size) {
-        // Compute per-path results in parallel, keeping them grouped by path
-        let per_path: Vec<Vec<Result<T, TreebankError>>> = chunk
-            .par_iter()
-            .map(|path| match TreeIterator::from_file(path) {
-                Ok(it) => it
-                    .flat_map(|result| match result {
-                        Ok(tree) => process_tree(tree),
-                        Err(e) => vec![Err(TreebankError::from(e))],
-                    })
-                    .collect(),
-                Err(e) => vec![Err(TreebankError::FileOpen {
-                    path: path.clone(),
-                    source: e,
-                })],
-            })
-            .collect();
+    let (chunk_tx, chunk_rx) = crossbeam_channel::bounded::<Vec<Vec<Result<T, TreebankError>>>>(1);
+    let process_tree = &process_tree;
+
+    thread::scope(|scope| {
+        scope.spawn(move || {
+            let mut next_chunk =
+                || open_files(&paths.by_ref().take(chunk_size).collect::<Vec<_>>());
+            let mut opened = next_chunk();
+            while !opened.is_empty() {
+                let readers = opened;
+                // Compute per-path results in parallel, keeping them grouped by path,
+                // while the next chunk's paths are listed and its files opened
+                let (per_path, next_opened) = rayon::join(
+                    || {
+                        readers
+                            .into_par_iter()
+                            .map(|reader| match reader {
+                                Ok(it) => it
+                                    .flat_map(|result| match result {
+                                        Ok(tree) => process_tree(tree),
+                                        Err(e) => vec![Err(TreebankError::from(e))],
+                                    })
+                                    .collect(),
+                                Err(e) => vec![Err(e)],
+                            })
+                            .collect::<Vec<Vec<Result<T, TreebankError>>>>()
+                    },
+                    &mut next_chunk,
+                );
+                if chunk_tx.send(per_path).is_err() {
+                    return;
+                }
+                opened = next_opened;
+            }
+        });
 
         // Send batches in deterministic order: path order, then result order within each path
-        for batch in per_path {
-            if !batch.is_empty() && tx.send(batch).is_err() {
-                return;
+        for per_path in chunk_rx {
+            for batch in per_path {
+                if !batch.is_empty() && tx.send(batch).is_err() {
+                    return;
+                }
             }
         }
-    }
+    });
 }
 
+/// Trees read from one file before they are searched together in unordered mode
+const UNORDERED_TREE_CHUNK: usize = 64;
+
 /// Process files in unordered mode with full parallelism (for match_iter and filter)
+///
+/// Files are spread over the rayon pool, and within a file each chunk of
+/// parsed trees is searched in parallel too, so a corpus of a few large
+/// files still keeps every worker busy. Once the consumer hangs up no
+/// further files are opened.
 fn process_files_unordered_batched<T, F>(
-    paths: Vec<PathBuf>,
+    paths: PathStream,
     tx: crossbeam_channel::Sender<Vec<Result<T, TreebankError>>>,
     process_tree: F,
 ) where
     T: Send,
     F: Fn(Tree) -> Vec<Result<T, TreebankError>> + Send + Sync,
 {
-    paths.par_iter().for_each(|path| {
-        let tx = tx.clone();
-        match TreeIterator::from_file(path) {
-            Ok(reader) => {
-                let mut batch = BatchAccumulator::new(MATCH_BATCH_SIZE);
-                for result in reader {
-                    let items = match result {
-                        Ok(tree) => process_tree(tree),
-                        Err(e) => vec![Err(TreebankError::from(e))],
-                    };
-                    for item in items {
-                        if let Some(full_batch) = batch.push(item) {
-                            if tx.send(full_batch).is_err() {
-                                return;
-                            }
-                        }
-                    }
-                }
-                if let Some(final_batch) = batch.flush() {
-                    let _ = tx.send(final_batch);
-                }
-            }
+    let _ = paths.par_bridge().try_for_each(|path| {
+        let mut reader = match open_file(&path) {
+            Ok(reader) => reader,
             Err(e) => {
-                let _ = tx.send(vec![Err(TreebankError::FileOpen {
-                    path: path.clone(),
-                    source: e,
-                })]);
+                let error = vec![Err(TreebankError::FileOpen { path, source: e })];
+                return tx.send(error).map_err(drop);
             }
+        };
+        let mut batch = BatchAccumulator::new(MATCH_BATCH_SIZE);
+        loop {
+            let chunk: Vec<_> = reader.by_ref().take(UNORDERED_TREE_CHUNK).collect();
+            if chunk.is_empty() {
+                break;
+            }
+            let per_tree: Vec<_> = chunk
+                .into_par_iter()
+                .map(|result| match result {
+                    Ok(tree) => process_tree(tree),
+                    Err(e) => vec![Err(TreebankError::from(e))],
+                })
+                .collect();
+            for item in per_tree.into_iter().flatten() {
+                if let Some(full_batch) = batch.push(item) {
+                    tx.send(full_batch).map_err(drop)?;
+                }
+            }
+        }
+        match batch.flush() {
+            Some(final_batch) => tx.send(final_batch).map_err(drop),
+            None => Ok(()),
         }
     });
 }
 
+/// Fold a stream of trees into one value, a chunk of `UNORDERED_TREE_CHUNK`
+/// trees at a time, with each chunk's trees folded in parallel on the rayon
+/// pool as in unordered search, so a single large file (or in-memory text)
+/// still keeps every worker busy
+fn fold_trees_chunked<A, I, F, M>(
+    mut trees: impl Iterator<Item = Result<Tree, ParseError>>,
+    identity: I,
+    fold: F,
+    merge: M,
+) -> Result<A, TreebankError>
+where
+    A: Send,
+    I: Fn() -> A + Send + Sync,
+    F: Fn(A, Tree) -> A + Send + Sync,
+    M: Fn(A, A) -> A + Send + Sync,
+{
+    let mut total = identity();
+    loop {
+        let chunk: Vec<_> = trees.by_ref().take(UNORDERED_TREE_CHUNK).collect();
+        if chunk.is_empty() {
+            return Ok(total);
+        }
+        let folded = chunk
+            .into_par_iter()
+            .try_fold(&identity, |acc, tree| {
+                Ok::<_, TreebankError>(fold(acc, tree?))
+            })
+            .try_reduce(&identity, |a, b| Ok(merge(a, b)))?;
+        total = merge(total, folded);
+    }
+}
+
+/// Add the tallies in `b` to those in `a`
+fn merge_counts(
+    mut a: HashMap<Vec<Value>, usize>,
+    mut b: HashMap<Vec<Value>, usize>,
+) -> HashMap<Vec<Value>, usize> {
+    if a.len() < b.len() {
+        std::mem::swap(&mut a, &mut b);
+    }
+    for (key, n) in b {
+        *a.entry(key).or_insert(0) += n;
+    }
+    a
+}
+
+/// Tally projected values over every match in a stream of trees
+fn count_projected(
+    trees: impl Iterator<Item = Result<Tree, ParseError>>,
+    pattern: &Pattern,
+    projection: &Projection,
+) -> Result<HashMap<Vec<Value>, usize>, TreebankError> {
+    fold_trees_chunked(
+        trees,
+        HashMap::new,
+        |mut counts, tree| {
+            for m in search_tree(tree, pattern) {
+                *counts
+                    .entry(projection.evaluate(&m.tree, &m.bindings))
+                    .or_insert(0) += 1;
+            }
+            counts
+        },
+        merge_counts,
+    )
+}
+
+/// Count the matches in a stream of trees
+fn count_matches(
+    trees: impl Iterator<Item = Result<Tree, ParseError>>,
+    pattern: &Pattern,
+) -> Result<usize, TreebankError> {
+    fold_trees_chunked(
+        trees,
+        || 0,
+        |total, tree| total + search_tree(tree, pattern).len(),
+        |a, b| a + b,
+    )
+}
+
 /// Build a parallel iterator with batching (for match_iter and filter)
 fn build_parallel_iter_batched<T, F>(
     source: TreeSource,
@@ -201,7 +559,8 @@ where
         TreeSource::String(text) => {
             process_string_source_batched(&text, &tx, process_tree);
         }
-        TreeSource::Files(paths) => {
+        TreeSource::Files(files) => {
+            let paths = files.paths();
             if ordered {
                 process_files_ordered_batched(paths, &tx, process_tree, chunk_size);
             } else {
@@ -217,9 +576,45 @@ where
 #[derive(Debug, Clone)]
 enum TreeSource {
     /// In-memory CoNLL-U text
-    String(String),
+    String(Arc<str>),
     /// Multiple file paths (from glob or explicit path(s))
-    Files(Vec<PathBuf>),
+    Files(FileList),
+}
+
+/// Paths of a treebank's files, in iteration order
+type PathStream = Box<dyn Iterator<Item = PathBuf> + Send>;
+
+/// The files making up a treebank
+#[derive(Debug, Clone)]
+enum FileList {
+    /// Explicit file paths
+    Paths(Vec<PathBuf>),
+    /// A glob pattern, expanded afresh each time the treebank is iterated
+    Glob(String),
+}
+
+impl FileList {
+    /// Stream the file paths.
+    ///
+    /// Glob matches are yielded as their directories are read, so the first
+    /// files are being parsed while the rest of the pattern is still being
+    /// expanded. Like Python's `glob`, wildcards don't match a leading `.`.
+    fn paths(self) -> PathStream {
+        match self {
+            FileList::Paths(paths) => Box::new(paths.into_iter()),
+            FileList::Glob(pattern) => {
+                let options = glob::MatchOptions {
+                    require_literal_leading_dot: true,
+                    ..glob::MatchOptions::new()
+                };
+                match glob::glob_with(&pattern, options) {
+                    Ok(paths) => Box::new(paths.filter_map(Result::ok)),
+                    // Patterns are validated when the treebank is created
+                    Err(_) => Box::new(std::iter::empty()),
+                }
+            }
+        }
+    }
 }
 
 ///
@@ -256,7 +651,7 @@ impl Treebank {
     /// Create from an in-memory CoNLL-U string
     pub fn from_string(text: &str) -> Self {
         Self {
-            source: TreeSource::String(text.to_string()),
+            source: TreeSource::String(Arc::from(text)),
         }
     }
 
@@ -269,17 +664,21 @@ impl Treebank {
     /// Create from explicit file paths
     pub fn from_paths(file_paths: Vec<PathBuf>) -> Self {
         Self {
-            source: TreeSource::Files(file_paths),
+            source: TreeSource::Files(FileList::Paths(file_paths)),
         }
     }
 
     /// Create from a glob pattern
     ///
-    /// Files are processed in sorted order for deterministic results.
+    /// The pattern is checked here but expanded lazily each time the treebank
+    /// is iterated, so parsing starts as soon as the first file is found.
+    /// Matches within a directory are visited in sorted order, so ordered
+    /// iteration is deterministic.
     pub fn from_glob(pattern: &str) -> Result<Self, glob::PatternError> {
-        let mut file_paths: Vec<PathBuf> = glob::glob(pattern)?.filter_map(Result::ok).collect();
-        file_paths.sort();
-        Ok(Self::from_paths(file_paths))
+        glob::Pattern::new(pattern)?;
+        Ok(Self {
+            source: TreeSource::Files(FileList::Glob(pattern.to_string())),
+        })
     }
 
     /// Iterate over trees with optional ordering.
@@ -311,84 +710,11 @@ impl Treebank {
     /// }
     /// ```
     pub fn tree_iter(self, ordered: bool) -> impl Iterator<Item = Result<Tree, TreebankError>> {
-        if ordered {
-            // Ordered mode: maintain deterministic ordering via chunking
-            // Smaller chunks (2 files) improve load balancing for heterogeneous file sizes
-            let (tx, rx) = sync_channel(64); // larger buffer for better pipelining
-
-            thread::spawn(move || match self.source {
-                TreeSource::String(text) => {
-                    for result in TreeIterator::from_string(&text) {
-                        let result = result.map_err(TreebankError::from);
-                        if tx.send(result).is_err() {
-                            return;
-                        }
-                    }
-                }
-                TreeSource::Files(paths) => {
-                    for chunk in paths.chunks(2) {
-                        let results: Vec<_> = chunk
-                            .par_iter()
-                            .flat_map_iter(|path| {
-                                let file_results: Vec<Result<Tree, TreebankError>> =
-                                    match TreeIterator::from_file(path) {
-                                        Ok(iter) => {
-                                            iter.map(|r| r.map_err(TreebankError::from)).collect()
-                                        }
-                                        Err(e) => vec![Err(TreebankError::FileOpen {
-                                            path: path.clone(),
-                                            source: e,
-                                        })],
-                                    };
-                                file_results.into_iter()
-                            })
-                            .collect();
-                        for result in results {
-                            if tx.send(result).is_err() {
-                                return;
-                            }
-                        }
-                    }
-                }
-            });
-            rx.into_iter()
-        } else {
-            // Unordered mode: maximum concurrency by removing synchronization barriers
-            let (tx, rx) = sync_channel(5000); // larger buffer for higher throughput
-
-            thread::spawn(move || match self.source {
-                TreeSource::String(text) => {
-                    for result in TreeIterator::from_string(&text) {
-                        let result = result.map_err(TreebankError::from);
-                        if tx.send(result).is_err() {
-                            return;
-                        }
-                    }
-                }
-                TreeSource::Files(paths) => {
-                    paths.par_iter().for_each(|path| {
-                        let tx = tx.clone(); // Clone sender for each parallel thread
-                        match TreeIterator::from_file(path) {
-                            Ok(reader) => {
-                                for result in reader {
-                                    let result = result.map_err(TreebankError::from);
-                                    if tx.send(result).is_err() {
-                                        return;
-                                    }
-                                }
-                            }
-                            Err(e) => {
-                                let _ = tx.send(Err(TreebankError::FileOpen {
-                                    path: path.clone(),
-                                    source: e,
-                                }));
-                            }
-                        }
-                    });
-                }
-            });
-            rx.into_iter()
-        }
+        // Files are parsed on the rayon pool and trees cross to the consumer in
+        // batches, the same way matches do
+        build_parallel_iter_batched(self.source, ordered, ordered_chunk_size(), |tree| {
+            vec![Ok(tree)]
+        })
     }
 
     /// Search for pattern matches with optional ordering.
@@ -397,7 +723,7 @@ impl Treebank {
     /// or parsing are returned in the iterator rather than being silently logged.
     ///
     /// # Arguments
-    /// * `pattern` - The pattern to search for
+    /// * `pattern` - The pattern to search for (a `Pattern` or a shared `Arc<Pattern>`)
     /// * `ordered` - If true (default), maintains file and tree order for deterministic results.
     ///   If false, matches may arrive in any order for better performance.
     ///
@@ -423,15 +749,121 @@ impl Treebank {
     /// ```
     pub fn match_iter(
         self,
-        pattern: Pattern,
+        pattern: impl Into<Arc<Pattern>>,
         ordered: bool,
     ) -> impl Iterator<Item = Result<Match, TreebankError>> {
-        build_parallel_iter_batched(
-            self.source,
-            ordered,
-            4, // chunk_size for ordered mode
-            move |tree| search_tree(tree, &pattern).into_iter().map(Ok).collect(),
-        )
+        let pattern = pattern.into();
+        build_parallel_iter_batched(self.source, ordered, ordered_chunk_size(), move |tree| {
+            search_tree(tree, &pattern).into_iter().map(Ok).collect()
+        })
+    }
+
+    /// Search for several patterns in a single pass over the treebank.
+    ///
+    /// Each tree is parsed once and matched against every pattern in turn,
+    /// so K queries cost one parse of the corpus instead of K. Matches are
+    /// tagged with the index of the pattern that produced them; within a
+    /// tree, all matches of pattern 0 come before those of pattern 1, and so
+    /// on.
+    ///
+    /// # Arguments
+    /// * `patterns` - The patterns to search for
+    /// * `ordered` - If true, maintains file and tree order. If false, may be faster.
+    pub fn search_batch(
+        self,
+        patterns: Vec<Arc<Pattern>>,
+        ordered: bool,
+    ) -> impl Iterator<Item = Result<(usize, Match), TreebankError>> {
+        build_parallel_iter_batched(self.source, ordered, ordered_chunk_size(), move |tree| {
+            let tree = Arc::new(tree);
+            patterns
+                .iter()
+                .enumerate()
+                .flat_map(|(i, pattern)| {
+                    search_shared_tree(&tree, pattern)
+                        .into_iter()
+                        .map(move |m| Ok((i, m)))
+                })
+                .collect()
+        })
+    }
+
+    /// Search for pattern matches and evaluate a projection on each one.
+    ///
+    /// Projections are evaluated in the worker threads, so only the projected
+    /// values (one `Vec<Value>` per match) are sent back to the caller.
+    ///
+    /// # Arguments
+    /// * `pattern` - The pattern to search for
+    /// * `projection` - Expressions to evaluate for each match
+    /// * `ordered` - If true, maintains file and tree order. If false, may be faster.
+    pub fn project_iter(
+        self,
+        pattern: impl Into<Arc<Pattern>>,
+        projection: Projection,
+        ordered: bool,
+    ) -> impl Iterator<Item = Result<Vec<Value>, TreebankError>> {
+        let pattern = pattern.into();
+        build_parallel_iter_batched(self.source, ordered, ordered_chunk_size(), move |tree| {
+            search_tree(tree, &pattern)
+                .into_iter()
+                .map(|m| Ok(projection.evaluate(&m.tree, &m.bindings)))
+                .collect()
+        })
+    }
+
+    /// Count matches grouped by projected values.
+    ///
+    /// Evaluates `projection` for every match and tallies how often each
+    /// distinct row of values occurs. Files are counted in parallel on the
+    /// worker threads, and each file's trees are counted in parallel a chunk
+    /// at a time as in unordered search; the tables are merged at the end,
+    /// so individual matches are never sent across threads.
+    ///
+    /// # Arguments
+    /// * `pattern` - The pattern to match against
+    /// * `projection` - Expressions whose values form the grouping key
+    pub fn count(
+        self,
+        pattern: impl Into<Arc<Pattern>>,
+        projection: &Projection,
+    ) -> Result<HashMap<Vec<Value>, usize>, TreebankError> {
+        let pattern = pattern.into();
+        match self.source {
+            TreeSource::String(text) => count_projected(open_text(&text), &pattern, projection),
+            TreeSource::Files(files) => files
+                .paths()
+                .par_bridge()
+                .map(|path| {
+                    let reader = open_file(&path)
+                        .map_err(|e| TreebankError::FileOpen { path, source: e })?;
+                    count_projected(reader, &pattern, projection)
+                })
+                .try_reduce(HashMap::new, |total, counts| {
+                    Ok(merge_counts(total, counts))
+                }),
+        }
+    }
+
+    /// Count every match of a pattern.
+    ///
+    /// Like [`Treebank::count`] without a grouping key: files, and chunks of
+    /// trees within each file, are counted on the worker threads and only
+    /// the totals are summed, so no match is sent across threads.
+    pub fn match_count(self, pattern: impl Into<Arc<Pattern>>) -> Result<usize, TreebankError> {
+        let pattern = pattern.into();
+        match self.source {
+            TreeSource::String(text) => count_matches(open_text(&text), &pattern),
+            TreeSource::Files(files) => files
+                .paths()
+                .par_bridge()
+                .map(|path| {
+                    let reader = open_file(&path)
+                        .map_err(|e| TreebankError::FileOpen { path, source: e })?;
+                    count_matches(reader, &pattern)
+                })
+                .try_reduce(|| 0, |a, b| Ok(a + b)),
+        }
     }
 
     /// Filter trees that match a pattern.
@@ -445,21 +877,17 @@ impl Treebank {
     /// * `ordered` - If true, maintains file and tree order. If false, may be faster.
     pub fn filter(
         self,
-        pattern: Pattern,
+        pattern: impl Into<Arc<Pattern>>,
         ordered: bool,
     ) -> impl Iterator<Item = Result<Tree, TreebankError>> {
-        build_parallel_iter_batched(
-            self.source,
-            ordered,
-            4, // chunk_size for ordered mode
-            move |tree| {
-                if tree_matches(&tree, &pattern) {
-                    vec![Ok(tree)]
-                } else {
-                    vec![]
-                }
-            },
-        )
+        let pattern = pattern.into();
+        build_parallel_iter_batched(self.source, ordered, ordered_chunk_size(), move |tree| {
+            if tree_matches(&tree, &pattern) {
+                vec![Ok(tree)]
+            } else {
+                vec![]
+            }
+        })
     }
 }
 
@@ -489,6 +917,84 @@ mod tests {
 
 "#;
 
+    fn parsed_trees(text: &str) -> Arc<Vec<Tree>> {
+        Arc::new(
+            TreeIterator::from_string(text)
+                .map(Result::unwrap)
+                .collect(),
+        )
+    }
+
+    fn parsed_key(path: &str, len: u64) -> ParsedKey {
+        ParsedKey::File {
+            path: PathBuf::from(path),
+            modified: SystemTime::UNIX_EPOCH,
+            len,
+        }
+    }
+
+    #[test]
+    fn test_parsed_cache_evicts_least_recently_used() {
+        let trees = parsed_trees(TWO_TREE_CONLLU);
+        let size = estimated_size(&trees);
+        let mut cache = ParsedCache::new(2 * size);
+        let (a, b, c) = (parsed_key("a", 1), parsed_key("b", 1), parsed_key("c", 1));
+        cache.insert(a.clone(), Arc::clone(&trees));
+        cache.insert(b.clone(), Arc::clone(&trees));
+        assert!(cache.get(&a).is_some());
+
+        // b is now the least recently used, so it makes room for c
+        cache.insert(c.clone(), Arc::clone(&trees));
+        assert!(cache.get(&b).is_none());
+        assert!(cache.get(&a).is_some());
+        assert!(cache.get(&c).is_some());
+        assert_eq!(cache.bytes, 2 * size);
+
+        // Too big to ever fit
+        let mut small = ParsedCache::new(size - 1);
+        small.insert(a.clone(), trees);
+        assert!(small.get(&a).is_none());
+        assert_eq!(small.bytes, 0);
+    }
+
+    #[test]
+    fn test_parsed_cache_replaces_changed_file() {
+        let mut cache = ParsedCache::new(PARSED_CACHE_CAPACITY);
+        let (old, new) = (parsed_key("a", 1), parsed_key("a", 2));
+        cache.insert(old.clone(), parsed_trees(TWO_TREE_CONLLU));
+        cache.insert(new.clone(), parsed_trees(THREE_VERB_CONLLU));
+
+        assert!(cache.get(&old).is_none());
+        assert_eq!(cache.get(&new).unwrap().len(), 3);
+        assert_eq!(cache.files.len(), 1);
+    }
+
+    #[test]
+    fn test_parsed_cache_text_keys() {
+        let mut cache = ParsedCache::new(PARSED_CACHE_CAPACITY);
+        let text: Arc<str> = Arc::from(TWO_TREE_CONLLU);
+        cache.insert(ParsedKey::Text(text), parsed_trees(TWO_TREE_CONLLU));
+
+        // An equal text from another treebank hits; a file key never clashes
+        let same = ParsedKey::Text(Arc::from(TWO_TREE_CONLLU));
+        assert_eq!(cache.get(&same).unwrap().len(), 2);
+        cache.insert(parsed_key("a", 1), parsed_trees(THREE_VERB_CONLLU));
+        assert_eq!(cache.files.len(), 2);
+        assert!(cache.bytes > TWO_TREE_CONLLU.len());
+    }
+
+    #[test]
+    fn test_parsed_key_canonicalizes_path() {
+        let dir = std::env::temp_dir();
+        let path = dir.join(format!("treesearch-key-{}.conllu", std::process::id()));
+        std::fs::write(&path, TWO_TREE_CONLLU).unwrap();
+        let dotted = dir.join(".").join(path.file_name().unwrap());
+        assert_eq!(ParsedKey::of(&path), ParsedKey::of(&dotted));
+        assert!(ParsedKey::of(&path).is_some());
+        std::fs::remove_file(&path).unwrap();
+        assert!(ParsedKey::of(&path).is_none());
+    }
+
     #[test]
     fn test_treebank_from_string() {
         let trees: Vec<_> = Treebank::from_string(TWO_TREE_CONLLU)
@@ -591,6 +1097,106 @@ mod tests {
         assert_eq!(trees.len(), 0);
     }
 
+    #[test]
+    fn test_match_iter_shared_pattern() {
+        let pattern = Arc::new(compile_query("MATCH { V [upos=\"VERB\"]; }").unwrap());
+        let treebank = Treebank::from_string(THREE_VERB_CONLLU);
+
+        let first = treebank
+            .clone()
+            .match_iter(Arc::clone(&pattern), true)
+            .count();
+        let second = treebank.filter(Arc::clone(&pattern), true).count();
+
+        assert_eq!(first, 3);
+        assert_eq!(second, 3);
+    }
+
+    #[test]
+    fn test_project_iter() {
+        let pattern = compile_query("MATCH { V [upos=\"VERB\"]; }").unwrap();
+        let projection = Projection::parse(&["V.lemma", "V.has_child(obj)"]).unwrap();
+        let rows: Vec<_> = Treebank::from_string(THREE_VERB_CONLLU)
+            .project_iter(pattern, projection, true)
+            .filter_map(Result::ok)
+            .collect();
+
+        assert_eq!(
+            rows,
+            vec![
+                vec![Value::Str("help".to_string()), Value::Bool(true)],
+                vec![Value::Str("run".to_string()), Value::Bool(false)],
+                vec![Value::Str("sleep".to_string()), Value::Bool(false)],
+            ]
+        );
+    }
+
+    #[test]
+    fn test_count() {
+        let pattern = compile_query("MATCH { V [upos=\"VERB\"]; }").unwrap();
+        let projection = Projection::parse(&["V.has_child(obj)"]).unwrap();
+        let counts = Treebank::from_string(THREE_VERB_CONLLU)
+            .count(pattern, &projection)
+            .unwrap();
+
+        assert_eq!(counts.len(), 2);
+        assert_eq!(counts[&vec![Value::Bool(true)]], 1);
+        assert_eq!(counts[&vec![Value::Bool(false)]], 2);
+    }
+
+    #[test]
+    fn test_search_batch() {
+        let verbs = Arc::new(compile_query("MATCH { V [upos=\"VERB\"]; }").unwrap());
+        let objects = Arc::new(compile_query("MATCH { V []; O []; V -[obj]-> O; }").unwrap());
+        let treebank = Treebank::from_string(THREE_VERB_CONLLU);
+
+        let tagged: Vec<(usize, Match)> = treebank
+            .clone()
+            .search_batch(vec![verbs.clone(), objects.clone()], true)
+            .collect::<Result<_, _>>()
+            .unwrap();
+        for (i, pattern) in [verbs, objects].into_iter().enumerate() {
+            let expected: Vec<_> = treebank
+                .clone()
+                .match_iter(pattern, true)
+                .map(|m| m.unwrap().bindings)
+                .collect();
+            let batched: Vec<_> = tagged
+                .iter()
+                .filter(|(j, _)| *j == i)
+                .map(|(_, m)| m.bindings.clone())
+                .collect();
+            assert_eq!(batched, expected);
+        }
+    }
+
+    #[test]
+    fn test_count_many_trees_in_chunks() {
+        // Several chunks' worth of trees from one source, plus a partial chunk
+        let n = UNORDERED_TREE_CHUNK * 3 + 5;
+        let text = THREE_VERB_CONLLU.repeat(n);
+        let pattern = Arc::new(compile_query("MATCH { V [upos=\"VERB\"]; }").unwrap());
+        let treebank = Treebank::from_string(&text);
+        assert_eq!(
+            treebank.clone().match_count(pattern.clone()).unwrap(),
+            3 * n
+        );
+
+        let projection = Projection::parse(&["V.has_child(obj)"]).unwrap();
+        let counts = treebank.count(pattern, &projection).unwrap();
+        assert_eq!(counts[&vec![Value::Bool(true)]], n);
+        assert_eq!(counts[&vec![Value::Bool(false)]], 2 * n);
+    }
+
+    #[test]
+    fn test_match_count() {
+        let pattern = compile_query("MATCH { V [upos=\"VERB\"]; }").unwrap();
+        let n = Treebank::from_string(THREE_VERB_CONLLU)
+            .match_count(pattern)
+            .unwrap();
+        assert_eq!(n, 3);
+    }
+
     #[cfg(test)]
     mod multi_file {
         use super::*;
@@ -828,5 +1434,42 @@ mod tests {
             // Should get all matches, order doesn't matter
             assert_eq!(results.len(), 2);
         }
+
+        #[test]
+        fn test_count_across_files() {
+            let (_dir, paths) = create_test_files(&[
+                ("a.conllu", "1\truns\trun\tVERB\tVBZ\t_\t0\troot\t_\t_\n"),
+                ("b.conllu", "1\truns\trun\tVERB\tVBZ\t_\t0\troot\t_\t_\n"),
+                (
+                    "c.conllu",
+                    "1\tsleeps\tsleep\tVERB\tVBZ\t_\t0\troot\t_\t_\n",
+                ),
+            ]);
+
+            let pattern = compile_query("MATCH { V [upos=\"VERB\"]; }").unwrap();
+            let projection = Projection::parse(&["V.lemma"]).unwrap();
+            let counts = Treebank::from_paths(paths)
+                .count(pattern, &projection)
+                .unwrap();
+
+            assert_eq!(counts[&vec![Value::Str("run".to_string())]], 2);
+            assert_eq!(counts[&vec![Value::Str("sleep".to_string())]], 1);
+        }
+
+        #[test]
+        fn test_match_count_across_files() {
+            let (_dir, paths) = create_test_files(&[
+                ("a.conllu", "1\truns\trun\tVERB\tVBZ\t_\t0\troot\t_\t_\n"),
+                ("b.conllu", "1\tdog\tdog\tNOUN\tNN\t_\t0\troot\t_\t_\n"),
+                (
+                    "c.conllu",
+                    "1\tsleeps\tsleep\tVERB\tVBZ\t_\t0\troot\t_\t_\n",
+                ),
+            ]);
+
+            let pattern = compile_query("MATCH { V [upos=\"VERB\"]; }").unwrap();
+            let n = Treebank::from_paths(paths).match_count(pattern).unwrap();
+            assert_eq!(n, 2);
+        }
     }
 }
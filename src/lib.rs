@@ -10,6 +10,7 @@ pub mod bytes;
 pub mod conllu; // CoNLL-U file parsing
 pub mod iterators; // Iterator interfaces for trees and matches
 pub mod pattern; // Pattern AST
+pub mod projection; // Per-match value extraction
 pub mod python;
 pub mod query; // Query language parser
 pub mod searcher;
@@ -18,7 +19,10 @@ pub mod tree; // Tree data structures with full CoNLL-U support
 // Re-exports for convenience
 pub use conllu::TreeIterator;
 pub use iterators::{Treebank, TreebankError};
-pub use pattern::{Constraint, EdgeConstraint, Pattern, PatternVar, RelationType, VarId};
+pub use pattern::{
+    Constraint, EdgeConstraint, Pattern, PatternShape, PatternVar, RelationType, VarId,
+};
+pub use projection::{Projection, ProjectionError, Value};
 pub use query::compile_query;
 pub use searcher::{Match, search_tree, search_tree_query, tree_matches};
 pub use tree::{Features, TokenId, Tree, Word, WordId};
@@ -55,6 +55,65 @@ pub enum Constraint {
     HasChild(Option<String>),
 }
 
+impl ConstraintValue {
+    /// Rough relative cost of testing one string against this value
+    fn cost(&self) -> usize {
+        match self {
+            ConstraintValue::Literal(_) => 1,
+            ConstraintValue::Regex(..) => 8,
+        }
+    }
+}
+
+impl Constraint {
+    /// Rough relative cost of checking this constraint against one word
+    pub fn cost(&self) -> usize {
+        match self {
+            Constraint::Any => 0,
+            Constraint::Lemma(value)
+            | Constraint::UPOS(value)
+            | Constraint::XPOS(value)
+            | Constraint::Form(value)
+            | Constraint::DepRel(value) => value.cost(),
+            Constraint::IsChild(_) => 1,
+            Constraint::Feature(_, value) | Constraint::Misc(_, value) => 2 + value.cost(),
+            Constraint::HasChild(_) => 4,
+            Constraint::Not(inner) => inner.cost(),
+            Constraint::And(constraints) => constraints.iter().map(Constraint::cost).sum(),
+        }
+    }
+
+    /// Rewrite this constraint into an equivalent one that is cheaper to evaluate:
+    /// nested conjunctions are flattened, `Any` conjuncts and double negations
+    /// are dropped, and conjuncts are ordered cheapest first so that evaluation
+    /// short-circuits on plain tag tests before reaching regexes or child lookups.
+    pub fn specialize(self) -> Constraint {
+        match self {
+            Constraint::And(constraints) => {
+                let mut flat = Vec::with_capacity(constraints.len());
+                for constraint in constraints {
+                    match constraint.specialize() {
+                        Constraint::Any => {}
+                        Constraint::And(inner) => flat.extend(inner),
+                        constraint => flat.push(constraint),
+                    }
+                }
+                flat.sort_by_key(Constraint::cost);
+                match flat.len() {
+                    0 => Constraint::Any,
+                    1 => flat.pop().unwrap(),
+                    _ => Constraint::And(flat),
+                }
+            }
+            Constraint::Not(inner) => match inner.specialize() {
+                Constraint::Not(inner) => *inner,
+                inner => Constraint::Not(Box::new(inner)),
+            },
+            constraint => constraint,
+        }
+    }
+}
+
 pub fn merge_constraints(a: &Constraint, b: &Constraint) -> Constraint {
     match (&a, &b) {
         (&x, &Constraint::Any) | (&Constraint::Any, &x) => x.clone(),
@@ -128,7 +187,59 @@ pub struct BasePattern {
     pub in_edges: Vec<Vec<usize>>,
     pub incident_edges: Vec<Vec<DirectedEdge>>,
     pub var_constraints: Vec<Constraint>,
+    /// `var_constraints` after `Constraint::specialize`, used by the matcher
+    pub eval_constraints: Vec<Constraint>,
     pub edge_constraints: Vec<EdgeConstraint>,
+    /// `(from, to)` variable ids of each edge constraint, resolved once at
+    /// compile time so the matcher never looks up variable names
+    pub edge_vars: Vec<(VarId, VarId)>,
+}
+
+/// Structural class of a pattern, known once it is compiled
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub enum PatternShape {
+    /// One variable and no edges: matching is a scan of its candidates
+    SingleNode,
+    /// Two variables joined by one positive child edge (`A -> B`), solved in a
+    /// single pass over the child's candidates
+    SingleEdge,
+    /// Anything else, solved by the general search
+    General,
+}
+
+impl PatternShape {
+    pub fn name(self) -> &'static str {
+        match self {
+            PatternShape::SingleNode => "single_node",
+            PatternShape::SingleEdge => "single_edge",
+            PatternShape::General => "general",
+        }
+    }
+}
+
+impl Pattern {
+    /// Shape of the whole pattern; EXCEPT and OPTIONAL blocks make it general
+    pub fn shape(&self) -> PatternShape {
+        if self.except_patterns.is_empty() && self.optional_patterns.is_empty() {
+            self.match_pattern.shape()
+        } else {
+            PatternShape::General
+        }
+    }
+
+    /// Names of every variable a match can bind, indexed by slot: the MATCH
+    /// variables first, then those introduced by OPTIONAL blocks
+    pub fn slot_names(&self) -> Vec<String> {
+        let mut names = self.match_pattern.var_names.clone();
+        for optional in &self.optional_patterns {
+            for name in &optional.var_names {
+                if !self.match_pattern.var_ids.contains_key(name) {
+                    names.push(name.clone());
+                }
+            }
+        }
+        names
+    }
 }
 
 impl BasePattern {
@@ -141,7 +252,9 @@ impl BasePattern {
             out_edges: Vec::new(),
             incident_edges: Vec::new(),
             var_constraints: Vec::new(),
+            eval_constraints: Vec::new(),
             edge_constraints: Vec::new(),
+            edge_vars: Vec::new(),
         }
     }
 
@@ -168,11 +281,13 @@ impl BasePattern {
             Entry::Occupied(e) => {
                 let id = *e.get();
                 self.var_constraints[id] = merge_constraints(&self.var_constraints[id], &constr);
+                self.eval_constraints[id] = self.var_constraints[id].clone().specialize();
             }
             Entry::Vacant(e) => {
                 let var_id = self.var_constraints.len();
                 e.insert(var_id);
                 self.var_names.push(var_name.to_string());
+                self.eval_constraints.push(constr.clone().specialize());
                 self.var_constraints.push(constr);
                 self.out_edges.push(Vec::new());
                 self.in_edges.push(Vec::new());
@@ -181,6 +296,17 @@ impl BasePattern {
         }
     }
 
+    /// Shape of this block's variables and edges
+    pub fn shape(&self) -> PatternShape {
+        match (self.n_vars, self.edge_constraints.as_slice()) {
+            (1, []) => PatternShape::SingleNode,
+            (2, [edge]) if !edge.negated && edge.relation == RelationType::Child => {
+                PatternShape::SingleEdge
+            }
+            _ => PatternShape::General,
+        }
+    }
+
     /// Add an edge constraint between variables
     pub fn add_edge_constraint(&mut self, edge_constraint: EdgeConstraint) {
         let from_is_anon = edge_constraint.from == "_";
@@ -231,13 +357,14 @@ impl BasePattern {
                 }
 
                 let edge_id = self.edge_constraints.len();
-                let from_var_id = self.var_ids.get(&edge_constraint.from).unwrap();
-                let to_var_id = self.var_ids.get(&edge_constraint.to).unwrap();
+                let from_var_id = self.var_ids[&edge_constraint.from];
+                let to_var_id = self.var_ids[&edge_constraint.to];
 
-                self.out_edges[*from_var_id].push(edge_id);
-                self.in_edges[*to_var_id].push(edge_id);
-                self.incident_edges[*from_var_id].push(DirectedEdge::Out(edge_id));
-                self.incident_edges[*to_var_id].push(DirectedEdge::In(edge_id));
+                self.out_edges[from_var_id].push(edge_id);
+                self.in_edges[to_var_id].push(edge_id);
+                self.incident_edges[from_var_id].push(DirectedEdge::Out(edge_id));
+                self.incident_edges[to_var_id].push(DirectedEdge::In(edge_id));
+                self.edge_vars.push((from_var_id, to_var_id));
                 self.edge_constraints.push(edge_constraint);
             }
         }
@@ -285,6 +412,69 @@ mod tests {
         assert_eq!(pattern.var_names.len(), 2);
         assert_eq!(pattern.var_constraints.len(), 2);
         assert_eq!(pattern.edge_constraints.len(), 1);
+        assert_eq!(
+            pattern.edge_vars,
+            vec![(pattern.var_ids["verb"], pattern.var_ids["noun"])]
+        );
         // TODO: add more assertions
     }
+
+    #[test]
+    fn test_pattern_shape() {
+        use crate::query::compile_query;
+
+        let shape = |query: &str| compile_query(query).unwrap().shape();
+        assert_eq!(
+            shape("MATCH { V [upos=\"VERB\"]; }"),
+            PatternShape::SingleNode
+        );
+        assert_eq!(shape("MATCH { _ -[root]-> V; }"), PatternShape::SingleNode);
+        assert_eq!(
+            shape("MATCH { V []; O []; V -[obj]-> O; }"),
+            PatternShape::SingleEdge
+        );
+        assert_eq!(
+            shape("MATCH { V []; O []; V !-[obj]-> O; }"),
+            PatternShape::General
+        );
+        assert_eq!(
+            shape("MATCH { V []; O []; V << O; }"),
+            PatternShape::General
+        );
+        assert_eq!(
+            shape("MATCH { V []; O []; V -> O; } EXCEPT { S []; V -[nsubj]-> S; }"),
+            PatternShape::General
+        );
+    }
+
+    #[test]
+    fn test_specialize_constraint() {
+        let lemma = Constraint::Lemma(ConstraintValue::Literal("help".to_string()));
+        let has_obj = Constraint::HasChild(Some("obj".to_string()));
+        let verb_form = Constraint::Feature(
+            "VerbForm".to_string(),
+            ConstraintValue::Literal("Inf".to_string()),
+        );
+
+        let constraint = Constraint::And(vec![
+            has_obj.clone(),
+            Constraint::Any,
+            Constraint::And(vec![verb_form.clone(), lemma.clone()]),
+            Constraint::Not(Box::new(Constraint::Not(Box::new(Constraint::Any)))),
+        ]);
+        assert_eq!(
+            constraint.specialize(),
+            Constraint::And(vec![lemma.clone(), verb_form, has_obj])
+        );
+
+        // Trivial conjunctions collapse
+        assert_eq!(
+            Constraint::And(vec![Constraint::Any, lemma.clone()]).specialize(),
+            lemma
+        );
+        assert_eq!(
+            Constraint::And(vec![Constraint::Any]).specialize(),
+            Constraint::Any
+        );
+    }
 }
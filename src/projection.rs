@@ -0,0 +1,528 @@
+//! Per-match projections evaluated on the Rust side
+//!
+//! A projection is a list of small expressions that are evaluated against each
+//! match as it is found, so callers get back plain values (strings, integers,
+//! booleans) instead of walking `Word` objects one attribute at a time.
+//!
+//! Supported expressions:
+//! - `Var.form`, `Var.lemma`, `Var.upos`, `Var.xpos`, `Var.deprel`
+//!   (append `.lower` for a lowercased string)
+//! - `Var.id`, `Var.head`
+//! - `Var.feats.Key`, `Var.misc.Key`
+//! - `Var.has_child(deprel)`, `Var.has_child(deprel, XPOS)`
+//! - `A.id - B.id` (signed distance between two matched words)
+//! - `path(A, B)` (deprels on the path down from A to its descendant B,
+//!   joined with `/`; null if B is not below A)
+//! - `text`, `meta.key` (sentence text and metadata)
+//!
+//! Expressions that refer to a variable left unbound by an OPTIONAL block
+//! evaluate to `Value::Null`. A variable the query doesn't have at all is
+//! caught up front by `Projection::check_vars`.
+
+use crate::bytes::Sym;
+use crate::searcher::Bindings;
+use crate::tree::{Tree, Word};
+use thiserror::Error;
+
+#[derive(Debug, Error)]
+pub enum ProjectionError {
+    #[error("Invalid projection expression: {0}")]
+    InvalidExpression(String),
+
+    #[error("Unknown attribute '{attr}' in projection expression: {expr}")]
+    UnknownAttribute { attr: String, expr: String },
+
+    #[error("unknown variable '{0}' (not in the query)")]
+    UnknownVariable(String),
+}
+
+/// A single projected value
+#[derive(Debug, Clone, PartialEq, Eq, Hash)]
+pub enum Value {
+    Null,
+    Bool(bool),
+    Int(i64),
+    Str(String),
+}
+
+/// Word attributes that resolve to strings
+#[derive(Debug, Clone, Copy, PartialEq)]
+pub enum StrAttr {
+    Form,
+    Lemma,
+    UPOS,
+    XPOS,
+    DepRel,
+}
+
+#[derive(Debug, Clone, PartialEq)]
+pub enum Expr {
+    Str {
+        var: String,
+        attr: StrAttr,
+        lower: bool,
+    },
+    Id(String),
+    Head(String),
+    Feature {
+        var: String,
+        key: String,
+    },
+    Misc {
+        var: String,
+        key: String,
+    },
+    HasChild {
+        var: String,
+        deprel: String,
+        xpos: Option<String>,
+    },
+    Distance {
+        from: String,
+        to: String,
+    },
+    Path {
+        from: String,
+        to: String,
+    },
+    Text,
+    Meta(String),
+}
+
+impl Expr {
+    /// Names of the match variables the expression reads
+    fn vars(&self) -> Vec<&str> {
+        match self {
+            Expr::Str { var, .. }
+            | Expr::Id(var)
+            | Expr::Head(var)
+            | Expr::Feature { var, .. }
+            | Expr::Misc { var, .. }
+            | Expr::HasChild { var, .. } => vec![var],
+            Expr::Distance { from, to } | Expr::Path { from, to } => vec![from, to],
+            Expr::Text | Expr::Meta(_) => Vec::new(),
+        }
+    }
+}
+
+/// A compiled list of projection expressions
+#[derive(Debug, Clone, Default)]
+pub struct Projection {
+    pub exprs: Vec<Expr>,
+}
+
+impl Projection {
+    /// Parse a list of projection expressions
+    pub fn parse<S: AsRef<str>>(exprs: &[S]) -> Result<Self, ProjectionError> {
+        let exprs = exprs
+            .iter()
+            .map(|e| parse_expr(e.as_ref()))
+            .collect::<Result<Vec<_>, _>>()?;
+        Ok(Self { exprs })
+    }
+
+    /// Check that every variable the expressions read is one of `names`, the
+    /// variables a match can bind.
+    ///
+    /// Evaluation can't tell a misspelled variable from an OPTIONAL one left
+    /// unbound, so without this check a typo silently yields null on every row.
+    pub fn check_vars(&self, names: &[String]) -> Result<(), ProjectionError> {
+        for expr in &self.exprs {
+            for var in expr.vars() {
+                if !names.iter().any(|name| name == var) {
+                    return Err(ProjectionError::UnknownVariable(var.to_string()));
+                }
+            }
+        }
+        Ok(())
+    }
+
+    pub fn len(&self) -> usize {
+        self.exprs.len()
+    }
+
+    pub fn is_empty(&self) -> bool {
+        self.exprs.is_empty()
+    }
+
+    /// Evaluate every expression against one match
+    pub fn evaluate(&self, tree: &Tree, bindings: &Bindings) -> Vec<Value> {
+        self.exprs
+            .iter()
+            .map(|expr| evaluate_expr(expr, tree, bindings))
+            .collect()
+    }
+}
+
+fn is_ident(s: &str) -> bool {
+    !s.is_empty() && s.chars().all(|c| c.is_alphanumeric() || c == '_')
+}
+
+fn parse_expr(input: &str) -> Result<Expr, ProjectionError> {
+    let expr = input.trim();
+    let invalid = || ProjectionError::InvalidExpression(input.to_string());
+
+    if expr == "text" {
+        return Ok(Expr::Text);
+    }
+    if let Some(key) = expr.strip_prefix("meta.") {
+        return if key.is_empty() {
+            Err(invalid())
+        } else {
+            Ok(Expr::Meta(key.to_string()))
+        };
+    }
+
+    // path(A, B)
+    if let Some(args) = expr.strip_prefix("path(") {
+        let args = args.strip_suffix(')').ok_or_else(invalid)?;
+        let (from, to) = args.split_once(',').ok_or_else(invalid)?;
+        let (from, to) = (from.trim(), to.trim());
+        if !is_ident(from) || !is_ident(to) {
+            return Err(invalid());
+        }
+        return Ok(Expr::Path {
+            from: from.to_string(),
+            to: to.to_string(),
+        });
+    }
+
+    // A.id - B.id
+    if let Some((lhs, rhs)) = expr.split_once('-') {
+        if let (Some(to), Some(from)) = (
+            lhs.trim().strip_suffix(".id"),
+            rhs.trim().strip_suffix(".id"),
+        ) {
+            if !is_ident(from) || !is_ident(to) {
+                return Err(invalid());
+            }
+            // `XComp.id - Head.id` is the distance from Head to XComp
+            return Ok(Expr::Distance {
+                from: from.to_string(),
+                to: to.to_string(),
+            });
+        }
+    }
+
+    let (var, rest) = expr.split_once('.').ok_or_else(invalid)?;
+    if !is_ident(var) {
+        return Err(invalid());
+    }
+    let var = var.to_string();
+
+    // Var.has_child(deprel[, XPOS])
+    if let Some(args) = rest.strip_prefix("has_child(") {
+        let args = args.strip_suffix(')').ok_or_else(invalid)?;
+        let mut parts = args.split(',').map(str::trim);
+        let deprel = parts.next().filter(|s| !s.is_empty()).ok_or_else(invalid)?;
+        let xpos = parts.next().map(str::to_string);
+        if parts.next().is_some() {
+            return Err(invalid());
+        }
+        return Ok(Expr::HasChild {
+            var,
+            deprel: deprel.to_string(),
+            xpos,
+        });
+    }
+
+    if let Some(key) = rest.strip_prefix("feats.") {
+        return Ok(Expr::Feature {
+            var,
+            key: key.to_string(),
+        });
+    }
+    if let Some(key) = rest.strip_prefix("misc.") {
+        return Ok(Expr::Misc {
+            var,
+            key: key.to_string(),
+        });
+    }
+
+    let (attr, lower) = match rest.strip_suffix(".lower") {
+        Some(attr) => (attr, true),
+        None => (rest, false),
+    };
+    let attr = match attr {
+        "form" => StrAttr::Form,
+        "lemma" => StrAttr::Lemma,
+        "upos" => StrAttr::UPOS,
+        "xpos" => StrAttr::XPOS,
+        "deprel" => StrAttr::DepRel,
+        "id" if !lower => return Ok(Expr::Id(var)),
+        "head" if !lower => return Ok(Expr::Head(var)),
+        _ => {
+            return Err(ProjectionError::UnknownAttribute {
+                attr: rest.to_string(),
+                expr: input.to_string(),
+            });
+        }
+    };
+    Ok(Expr::Str { var, attr, lower })
+}
+
+fn bound_word<'a>(tree: &'a Tree, bindings: &Bindings, var: &str) -> Option<&'a Word> {
+    bindings.get(var).and_then(|&id| tree.words.get(id))
+}
+
+fn resolve_string(tree: &Tree, word: &Word, attr: StrAttr, lower: bool) -> Value {
+    let sym = match attr {
+        StrAttr::Form => word.form,
+        StrAttr::Lemma => word.lemma,
+        StrAttr::UPOS => word.upos,
+        StrAttr::XPOS => word.xpos,
+        StrAttr::DepRel => word.deprel,
+    };
+    let bytes = tree.string_pool.resolve(sym);
+    if lower && bytes.is_ascii() {
+        // Nearly all tokens are ASCII: lowercase the bytes directly instead
+        // of decoding and re-encoding chars
+        let lowered = bytes.to_ascii_lowercase();
+        return Value::Str(String::from_utf8(lowered).expect("ASCII is valid UTF-8"));
+    }
+    let s = String::from_utf8_lossy(&bytes);
+    Value::Str(if lower {
+        s.to_lowercase()
+    } else {
+        s.into_owned()
+    })
+}
+
+fn lookup_kv(tree: &Tree, pairs: &[(Sym, Sym)], key: &str) -> Value {
+    pairs
+        .iter()
+        .find(|(k, _)| tree.string_pool.compare_bytes(*k, key.as_bytes()))
+        .map(|(_, v)| {
+            Value::Str(String::from_utf8_lossy(&tree.string_pool.resolve(*v)).into_owned())
+        })
+        .unwrap_or(Value::Null)
+}
+
+fn dependency_path(tree: &Tree, from: &Word, to: &Word) -> Value {
+    match tree.find_path(from, to) {
+        Some(path) => {
+            let deprels: Vec<String> = path[1..]
+                .iter()
+                .map(|word| {
+                    String::from_utf8_lossy(&tree.string_pool.resolve(word.deprel)).into_owned()
+                })
+                .collect();
+            Value::Str(deprels.join("/"))
+        }
+        None => Value::Null,
+    }
+}
+
+fn evaluate_expr(expr: &Expr, tree: &Tree, bindings: &Bindings) -> Value {
+    match expr {
+        Expr::Text => tree
+            .sentence_text
+            .clone()
+            .map(Value::Str)
+            .unwrap_or(Value::Null),
+        Expr::Meta(key) => tree
+            .metadata
+            .get(key)
+            .cloned()
+            .map(Value::Str)
+            .unwrap_or(Value::Null),
+        Expr::Str { var, attr, lower } => match bound_word(tree, bindings, var) {
+            Some(word) => resolve_string(tree, word, *attr, *lower),
+            None => Value::Null,
+        },
+        Expr::Id(var) => match bound_word(tree, bindings, var) {
+            Some(word) => Value::Int(word.id as i64),
+            None => Value::Null,
+        },
+        Expr::Head(var) => match bound_word(tree, bindings, var).and_then(|w| w.head) {
+            Some(head) => Value::Int(head as i64),
+            None => Value::Null,
+        },
+        Expr::Feature { var, key } => match bound_word(tree, bindings, var) {
+            Some(word) => lookup_kv(tree, &word.feats, key),
+            None => Value::Null,
+        },
+        Expr::Misc { var, key } => match bound_word(tree, bindings, var) {
+            Some(word) => lookup_kv(tree, &word.misc, key),
+            None => Value::Null,
+        },
+        Expr::HasChild { var, deprel, xpos } => match bound_word(tree, bindings, var) {
+            Some(word) => Value::Bool(word.has_child(tree, deprel, xpos.as_deref())),
+            None => Value::Null,
+        },
+        Expr::Path { from, to } => {
+            match (
+                bound_word(tree, bindings, from),
+                bound_word(tree, bindings, to),
+            ) {
+                (Some(from), Some(to)) => dependency_path(tree, from, to),
+                _ => Value::Null,
+            }
+        }
+        Expr::Distance { from, to } => {
+            match (bindings.get(from.as_str()), bindings.get(to.as_str())) {
+                (Some(&from_id), Some(&to_id)) => Value::Int(to_id as i64 - from_id as i64),
+                _ => Value::Null,
+            }
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::conllu::TreeIterator;
+    use std::collections::HashMap;
+
+    const CONLLU: &str = "# sent_id = s1
+# text = They helped us to win.
+1\tThey\tthey\tPRON\tPRP\t_\t2\tnsubj\t_\t_
+2\thelped\thelp\tVERB\tVBD\tTense=Past\t0\troot\t_\t_
+3\tus\twe\tPRON\tPRP\t_\t2\tobj\t_\t_
+4\tto\tto\tPART\tTO\t_\t5\tmark\t_\t_
+5\twin\twin\tVERB\tVB\tVerbForm=Inf\t2\txcomp\t_\tSpaceAfter=No
+
+";
+
+    fn tree() -> Tree {
+        TreeIterator::from_string(CONLLU).next().unwrap().unwrap()
+    }
+
+    #[test]
+    fn test_parse_expressions() {
+        let projection = Projection::parse(&[
+            "Head.form.lower",
+            "Head.has_child(obj)",
+            "XComp.has_child(mark, TO)",
+            "XComp.id - Head.id",
+            "meta.sent_id",
+            "text",
+        ])
+        .unwrap();
+        assert_eq!(projection.len(), 6);
+        assert_eq!(
+            projection.exprs[0],
+            Expr::Str {
+                var: "Head".to_string(),
+                attr: StrAttr::Form,
+                lower: true
+            }
+        );
+        assert_eq!(
+            projection.exprs[2],
+            Expr::HasChild {
+                var: "XComp".to_string(),
+                deprel: "mark".to_string(),
+                xpos: Some("TO".to_string())
+            }
+        );
+    }
+
+    #[test]
+    fn test_parse_errors() {
+        assert!(Projection::parse(&["Head.color"]).is_err());
+        assert!(Projection::parse(&["Head"]).is_err());
+        assert!(Projection::parse(&["Head.has_child(obj"]).is_err());
+        assert!(Projection::parse(&["Head.form - XComp.id"]).is_err());
+        assert!(Projection::parse(&["path(Head)"]).is_err());
+    }
+
+    #[test]
+    fn test_check_vars() {
+        let names = ["Head".to_string(), "XComp".to_string()];
+        let known = Projection::parse(&["Head.lemma", "XComp.id - Head.id", "text"]).unwrap();
+        assert!(known.check_vars(&names).is_ok());
+        for expr in ["Haed.lemma", "XComp.id - Hed.id", "path(Head, X)"] {
+            let projection = Projection::parse(&[expr]).unwrap();
+            assert!(matches!(
+                projection.check_vars(&names),
+                Err(ProjectionError::UnknownVariable(_))
+            ));
+        }
+    }
+
+    #[test]
+    fn test_evaluate() {
+        let tree = tree();
+        let bindings: Bindings = HashMap::from([("Head".to_string(), 1), ("XComp".to_string(), 4)]);
+        let projection = Projection::parse(&[
+            "Head.form.lower",
+            "Head.has_child(obj)",
+            "Head.has_child(aux)",
+            "XComp.has_child(mark, TO)",
+            "XComp.feats.VerbForm",
+            "XComp.misc.SpaceAfter",
+            "XComp.id - Head.id",
+            "XComp.head",
+            "meta.sent_id",
+            "text",
+        ])
+        .unwrap();
+
+        assert_eq!(
+            projection.evaluate(&tree, &bindings),
+            vec![
+                Value::Str("helped".to_string()),
+                Value::Bool(true),
+                Value::Bool(false),
+                Value::Bool(true),
+                Value::Str("Inf".to_string()),
+                Value::Str("No".to_string()),
+                Value::Int(3),
+                Value::Int(1),
+                Value::Str("s1".to_string()),
+                Value::Str("They helped us to win.".to_string()),
+            ]
+        );
+    }
+
+    #[test]
+    fn test_lowercase_non_ascii() {
+        let conllu = "1\tÉté\tété\tNOUN\tNN\t_\t0\troot\t_\t_\n\n";
+        let tree = TreeIterator::from_string(conllu).next().unwrap().unwrap();
+        let bindings: Bindings = HashMap::from([("N".to_string(), 0)]);
+        let projection = Projection::parse(&["N.form.lower", "N.upos.lower"]).unwrap();
+
+        assert_eq!(
+            projection.evaluate(&tree, &bindings),
+            vec![
+                Value::Str("été".to_string()),
+                Value::Str("noun".to_string())
+            ]
+        );
+    }
+
+    #[test]
+    fn test_evaluate_path() {
+        let tree = tree();
+        let bindings: Bindings = HashMap::from([
+            ("Help".to_string(), 1),
+            ("V".to_string(), 4),
+            ("To".to_string(), 3),
+        ]);
+        let projection =
+            Projection::parse(&["path(Help, V)", "path(Help, To)", "path(V, Help)"]).unwrap();
+
+        assert_eq!(
+            projection.evaluate(&tree, &bindings),
+            vec![
+                Value::Str("xcomp".to_string()),
+                Value::Str("xcomp/mark".to_string()),
+                Value::Null,
+            ]
+        );
+    }
+
+    #[test]
+    fn test_unbound_variable_is_null() {
+        let tree = tree();
+        let bindings: Bindings = HashMap::from([("Head".to_string(), 1)]);
+        let projection =
+            Projection::parse(&["To.lemma", "To.has_child(obj)", "To.id - Head.id"]).unwrap();
+
+        assert_eq!(
+            projection.evaluate(&tree, &bindings),
+            vec![Value::Null, Value::Null, Value::Null]
+        );
+    }
+}
@@ -6,15 +6,21 @@
 //! the Python thread state (in free-threaded Python) during expensive Rust operations,
 //! allowing better parallel performance.
 
-use pyo3::exceptions::{PyIOError, PyIndexError, PyValueError};
+use pyo3::exceptions::{PyIOError, PyIndexError, PyKeyError, PyTypeError, PyValueError};
 use pyo3::prelude::*;
+use pyo3::sync::PyOnceLock;
+use pyo3::types::{PyDict, PyIterator, PyList, PyString, PyTuple, PyType};
+use rayon::prelude::*;
+use std::collections::{HashMap, VecDeque};
 use std::path::PathBuf;
 use std::sync::Arc;
 
+use crate::bytes::Sym;
 use crate::iterators::{Treebank, TreebankError};
 use crate::pattern::Pattern as RustPattern;
+use crate::projection::{Projection, Value};
 use crate::query::compile_query;
-use crate::searcher::search_tree;
+use crate::searcher::{Bindings, search_shared_tree};
 use crate::tree::{Tree as RustTree, Word as RustWord};
 
 /// Convert TreebankError to Python exception
@@ -32,7 +38,9 @@ impl From<TreebankError> for PyErr {
     }
 }
 
-#[pyclass(name = "Tree")]
+/// Trees are immutable, so the class is frozen: taking a Tree out of a Python
+/// object (as search_trees() does for every input) skips the borrow-flag check
+#[pyclass(name = "Tree", frozen)]
 #[derive(Clone)]
 pub struct PyTree {
     pub(crate) inner: Arc<RustTree>,
@@ -44,10 +52,7 @@ impl PyTree {
         self.inner
             .words
             .get(id)
-            .map(|word| PyWord {
-                inner: word.clone(),
-                tree: Arc::clone(&self.inner),
-            })
+            .map(|_| PyWord::new(&self.inner, id))
             .ok_or_else(|| PyIndexError::new_err(format!("word index out of range: {}", id)))
     }
 
@@ -55,13 +60,43 @@ impl PyTree {
         self.word(id)
     }
 
+    /// Find the dependency path from word x down to its descendant y.
+    ///
+    /// Returns the words on the path, starting with x and ending with y, or
+    /// None if y is not a descendant of x (or is x itself).
+    fn find_path(&self, x: PyRef<PyWord>, y: PyRef<PyWord>) -> PyResult<Option<Vec<PyWord>>> {
+        let x = self.inner.word(x.id).map_err(PyIndexError::new_err)?;
+        let y = self.inner.word(y.id).map_err(PyIndexError::new_err)?;
+        Ok(self.inner.find_path(x, y).map(|path| {
+            path.into_iter()
+                .map(|word| PyWord::new(&self.inner, word.id))
+                .collect()
+        }))
+    }
+
+    /// Word forms, UPOS tags, heads and deprels as four parallel lists.
+    ///
+    /// Fetches everything to_displacy() needs in one call instead of going
+    /// through a Word object for each word.
+    fn displacy_columns(&self) -> (Vec<String>, Vec<String>, Vec<Option<usize>>, Vec<String>) {
+        let pool = &self.inner.string_pool;
+        let text = |sym| String::from_utf8_lossy(&pool.resolve(sym)).into_owned();
+        let words = &self.inner.words;
+        (
+            words.iter().map(|w| text(w.form)).collect(),
+            words.iter().map(|w| text(w.upos)).collect(),
+            words.iter().map(|w| w.head).collect(),
+            words.iter().map(|w| text(w.deprel)).collect(),
+        )
+    }
+
     fn __len__(&self) -> usize {
         self.inner.words.len()
     }
 
     #[getter]
-    fn sentence_text(&self) -> Option<String> {
-        self.inner.sentence_text.clone()
+    fn sentence_text(&self) -> Option<&str> {
+        self.inner.sentence_text.as_deref()
     }
 
     #[getter]
@@ -69,6 +104,12 @@ impl PyTree {
         self.inner.metadata.clone()
     }
 
+    /// The root word (the word without a head), found when the tree was read
+    #[getter]
+    fn root(&self) -> Option<PyWord> {
+        self.inner.root_id.map(|id| PyWord::new(&self.inner, id))
+    }
+
     fn __repr__(&self) -> String {
         let n = self.inner.words.len();
         if n == 0 {
@@ -77,7 +118,10 @@ impl PyTree {
 
         let num_to_show = n.min(3);
         let words: Vec<String> = (0..num_to_show)
-            .map(|i| self.word(i).unwrap().form())
+            .map(|i| {
+                let form = self.inner.string_pool.resolve(self.inner.words[i].form);
+                String::from_utf8_lossy(&form).into_owned()
+            })
             .collect();
 
         if n > 3 {
@@ -88,147 +132,357 @@ impl PyTree {
     }
 }
 
-#[pyclass(name = "Word")]
+/// A word is a reference into its shared tree, so creating one copies nothing
+#[pyclass(name = "Word", frozen)]
 pub struct PyWord {
-    inner: RustWord,
     tree: Arc<RustTree>,
+    id: usize,
+}
+
+impl PyWord {
+    fn new(tree: &Arc<RustTree>, id: usize) -> Self {
+        PyWord {
+            tree: Arc::clone(tree),
+            id,
+        }
+    }
+
+    fn inner(&self) -> &RustWord {
+        &self.tree.words[self.id]
+    }
+
+    /// A symbol's text as an owned Rust string (for reprs)
+    fn text(&self, sym: Sym) -> String {
+        String::from_utf8_lossy(&self.tree.string_pool.resolve(sym)).into_owned()
+    }
+
+    /// A symbol's text as a Python string, decoded straight from the pool's
+    /// bytes without an intermediate Rust `String`
+    fn py_text<'py>(&self, py: Python<'py>, sym: Sym) -> Bound<'py, PyString> {
+        bytes_to_py(py, &self.tree.string_pool.resolve(sym))
+    }
+}
+
+/// Decode bytes into a Python string, replacing invalid UTF-8 only when present
+fn bytes_to_py<'py>(py: Python<'py>, bytes: &[u8]) -> Bound<'py, PyString> {
+    match std::str::from_utf8(bytes) {
+        Ok(text) => PyString::new(py, text),
+        Err(_) => PyString::new(py, &String::from_utf8_lossy(bytes)),
+    }
 }
 
 #[pymethods]
 impl PyWord {
     #[getter]
     fn id(&self) -> usize {
-        self.inner.id
+        self.inner().id
     }
 
     #[getter]
     fn token_id(&self) -> usize {
-        self.inner.token_id
+        self.inner().token_id
     }
 
     #[getter]
-    fn form(&self) -> String {
-        String::from_utf8_lossy(&self.tree.string_pool.resolve(self.inner.form)).to_string()
+    fn form<'py>(&self, py: Python<'py>) -> Bound<'py, PyString> {
+        self.py_text(py, self.inner().form)
     }
 
     #[getter]
-    fn lemma(&self) -> String {
-        String::from_utf8_lossy(&self.tree.string_pool.resolve(self.inner.lemma)).to_string()
+    fn lemma<'py>(&self, py: Python<'py>) -> Bound<'py, PyString> {
+        self.py_text(py, self.inner().lemma)
     }
 
     #[getter]
-    fn upos(&self) -> String {
-        String::from_utf8_lossy(&self.tree.string_pool.resolve(self.inner.upos)).to_string()
+    fn upos<'py>(&self, py: Python<'py>) -> Bound<'py, PyString> {
+        self.py_text(py, self.inner().upos)
     }
 
     #[getter]
-    fn xpos(&self) -> Option<String> {
-        let resolved = self.tree.string_pool.resolve(self.inner.xpos);
+    fn xpos<'py>(&self, py: Python<'py>) -> Option<Bound<'py, PyString>> {
+        let resolved = self.tree.string_pool.resolve(self.inner().xpos);
         if *resolved == *b"_" {
             None
         } else {
-            Some(String::from_utf8_lossy(&resolved).to_string())
+            Some(bytes_to_py(py, &resolved))
         }
     }
 
     #[getter]
-    fn deprel(&self) -> String {
-        String::from_utf8_lossy(&self.tree.string_pool.resolve(self.inner.deprel)).to_string()
+    fn deprel<'py>(&self, py: Python<'py>) -> Bound<'py, PyString> {
+        self.py_text(py, self.inner().deprel)
     }
 
     #[getter]
     fn head(&self) -> Option<usize> {
-        self.inner.head
+        self.tree.head_of(self.id)
     }
 
     #[getter]
-    fn feats(&self) -> std::collections::HashMap<String, String> {
-        self.inner
-            .feats
-            .iter()
-            .map(|(k, v)| {
-                (
-                    String::from_utf8_lossy(&self.tree.string_pool.resolve(*k)).to_string(),
-                    String::from_utf8_lossy(&self.tree.string_pool.resolve(*v)).to_string(),
-                )
-            })
-            .collect()
+    fn feats<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyDict>> {
+        let dict = PyDict::new(py);
+        for &(key, value) in &self.inner().feats {
+            dict.set_item(self.py_text(py, key), self.py_text(py, value))?;
+        }
+        Ok(dict)
     }
 
     #[getter]
-    fn misc(&self) -> std::collections::HashMap<String, String> {
-        self.inner
-            .misc
-            .iter()
-            .map(|(k, v)| {
-                (
-                    String::from_utf8_lossy(&self.tree.string_pool.resolve(*k)).to_string(),
-                    String::from_utf8_lossy(&self.tree.string_pool.resolve(*v)).to_string(),
-                )
-            })
-            .collect()
+    fn misc<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyDict>> {
+        let dict = PyDict::new(py);
+        for &(key, value) in &self.inner().misc {
+            dict.set_item(self.py_text(py, key), self.py_text(py, value))?;
+        }
+        Ok(dict)
     }
 
     fn parent(&self) -> Option<PyWord> {
-        self.inner.parent(&self.tree).map(|word| PyWord {
-            inner: word.clone(),
-            tree: Arc::clone(&self.tree),
-        })
+        self.tree
+            .head_of(self.id)
+            .map(|head| PyWord::new(&self.tree, head))
     }
 
     #[getter]
     fn children_ids(&self) -> Vec<usize> {
-        self.inner.children.clone()
+        self.tree.children_of(self.id).to_vec()
     }
 
     fn children(&self) -> Vec<PyWord> {
-        self.inner
-            .children(&self.tree)
-            .into_iter()
-            .map(|word| PyWord {
-                inner: word.clone(),
-                tree: Arc::clone(&self.tree),
-            })
+        self.tree
+            .children_of(self.id)
+            .iter()
+            .map(|&child| PyWord::new(&self.tree, child))
             .collect()
     }
 
     fn children_by_deprel(&self, deprel: &str) -> Vec<PyWord> {
-        self.inner
-            .children_by_deprel(&self.tree, deprel)
-            .into_iter()
-            .map(|word| PyWord {
-                inner: word.clone(),
-                tree: Arc::clone(&self.tree),
-            })
+        // An unseen label can't match any child
+        let Some(deprel) = self.tree.string_pool.get(deprel.as_bytes()) else {
+            return Vec::new();
+        };
+        self.tree
+            .children_with_deprel(self.id, deprel)
+            .map(|child| PyWord::new(&self.tree, child))
             .collect()
     }
 
+    /// Whether this word has a child with the given deprel (and xpos, if given).
+    ///
+    /// Faster than ``bool(word.children_by_deprel(deprel))`` since no child
+    /// Word objects are created.
+    #[pyo3(signature = (deprel, xpos=None))]
+    fn has_child(&self, deprel: &str, xpos: Option<&str>) -> bool {
+        self.inner().has_child(&self.tree, deprel, xpos)
+    }
+
     // TODO: add xpos and head to these (but they're optional)
     fn __repr__(&self) -> String {
         format!(
             "<Word id={} form='{}' lemma='{}' upos='{}' deprel='{}'>",
-            self.inner.id,
-            self.form(),
-            self.lemma(),
-            self.upos(),
-            self.deprel()
+            self.inner().id,
+            self.text(self.inner().form),
+            self.text(self.inner().lemma),
+            self.text(self.inner().upos),
+            self.text(self.inner().deprel)
         )
     }
 }
 
-#[pyclass(name = "Pattern")]
+/// Compiled patterns are immutable and shared by reference count, so passing
+/// one to search() or across threads never copies the pattern itself.
+#[pyclass(name = "Pattern", frozen)]
 #[derive(Clone)]
 pub struct PyPattern {
-    pub(crate) inner: RustPattern,
+    pub(crate) inner: Arc<RustPattern>,
+    /// Variable names indexed by slot, shared with every Match the pattern yields
+    slots: Arc<[String]>,
+}
+
+impl PyPattern {
+    fn new(inner: RustPattern) -> Self {
+        let slots = inner.slot_names().into();
+        Self {
+            inner: Arc::new(inner),
+            slots,
+        }
+    }
 }
 
 #[pymethods]
 impl PyPattern {
+    /// Get the integer slot for a variable name.
+    ///
+    /// Resolve slots once, outside the loop, and index matches with them:
+    /// ``match[slot]`` skips the name lookup that ``match["Name"]`` does.
+    ///
+    /// Args:
+    ///     name: Variable name from the MATCH or an OPTIONAL block
+    ///
+    /// Returns:
+    ///     Slot index for the variable
+    ///
+    /// Raises:
+    ///     KeyError: If the pattern has no such variable
+    fn slot(&self, name: &str) -> PyResult<usize> {
+        self.slots
+            .iter()
+            .position(|slot| slot == name)
+            .ok_or_else(|| PyKeyError::new_err(name.to_string()))
+    }
+
+    /// Structural class of the pattern: "single_node" (one variable, no
+    /// edges), "single_edge" (two variables joined by one positive child edge,
+    /// solved in a single pass) or "general". EXCEPT and OPTIONAL blocks make
+    /// a pattern "general".
+    #[getter]
+    fn shape(&self) -> &'static str {
+        self.inner.shape().name()
+    }
+
     fn __repr__(&self) -> String {
         format!("Pattern({} vars)", self.inner.match_pattern.n_vars)
     }
 }
 
+/// Variable bindings for a single match.
+///
+/// Indexed by a slot from Pattern.slot() or by variable name, and yields the
+/// id of the bound word. OPTIONAL variables that did not match are unbound:
+/// looking them up raises KeyError and ``name in match`` is False.
+///
+/// Matches can be pickled; to_dict() converts one to a plain dict.
+#[pyclass(name = "Match", frozen)]
+pub struct PyMatch {
+    slots: Arc<[String]>,
+    ids: Vec<Option<usize>>,
+}
+
+/// A match key: an integer slot or a variable name
+#[derive(FromPyObject)]
+enum SlotArg {
+    Slot(usize),
+    Name(String),
+}
+
+impl PyMatch {
+    fn new(slots: Arc<[String]>, bindings: &Bindings) -> Self {
+        let ids = slots
+            .iter()
+            .map(|name| bindings.get(name).copied())
+            .collect();
+        Self { slots, ids }
+    }
+
+    fn lookup(&self, key: &SlotArg) -> Option<usize> {
+        let slot = match key {
+            SlotArg::Slot(slot) => *slot,
+            SlotArg::Name(name) => self.slots.iter().position(|slot| slot == name)?,
+        };
+        self.ids.get(slot).copied().flatten()
+    }
+
+    fn bound(&self) -> impl Iterator<Item = (&String, usize)> {
+        self.slots
+            .iter()
+            .zip(&self.ids)
+            .filter_map(|(name, id)| id.map(|id| (name, id)))
+    }
+}
+
+#[pymethods]
+impl PyMatch {
+    /// Rebuild a match from its slot names and the word id bound to each
+    /// (None if unbound), as pickle does
+    #[new]
+    fn py_new(slots: Vec<String>, ids: Vec<Option<usize>>) -> PyResult<Self> {
+        if slots.len() != ids.len() {
+            return Err(PyValueError::new_err(
+                "slots and ids must have the same length",
+            ));
+        }
+        Ok(Self {
+            slots: slots.into(),
+            ids,
+        })
+    }
+
+    fn __reduce__<'py>(
+        slf: &Bound<'py, Self>,
+    ) -> (Bound<'py, PyType>, (Vec<String>, Vec<Option<usize>>)) {
+        let this = slf.get();
+        (slf.get_type(), (this.slots.to_vec(), this.ids.clone()))
+    }
+
+    fn __getitem__(&self, key: SlotArg) -> PyResult<usize> {
+        self.lookup(&key).ok_or_else(|| match key {
+            SlotArg::Slot(slot) => PyKeyError::new_err(slot),
+            SlotArg::Name(name) => PyKeyError::new_err(name),
+        })
+    }
+
+    /// Get the word id bound to a slot or variable name, or None if unbound
+    fn get(&self, key: SlotArg) -> Option<usize> {
+        self.lookup(&key)
+    }
+
+    fn __contains__(&self, key: SlotArg) -> bool {
+        self.lookup(&key).is_some()
+    }
+
+    fn __len__(&self) -> usize {
+        self.ids.iter().flatten().count()
+    }
+
+    fn __iter__<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyIterator>> {
+        PyList::new(py, self.keys())?.try_iter()
+    }
+
+    /// Names of the bound variables
+    fn keys(&self) -> Vec<String> {
+        self.bound().map(|(name, _)| name.clone()).collect()
+    }
+
+    /// Word ids of the bound variables
+    fn values(&self) -> Vec<usize> {
+        self.bound().map(|(_, id)| id).collect()
+    }
+
+    /// (name, word id) pairs for the bound variables
+    fn items(&self) -> Vec<(String, usize)> {
+        self.bound().map(|(name, id)| (name.clone(), id)).collect()
+    }
+
+    /// The bindings as a plain dict of variable names to word ids
+    fn to_dict<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyDict>> {
+        let dict = PyDict::new(py);
+        for (name, id) in self.bound() {
+            dict.set_item(name, id)?;
+        }
+        Ok(dict)
+    }
+
+    /// Matches compare equal to other matches, or to dicts, with the same bindings
+    fn __eq__(&self, other: &Bound<'_, PyAny>) -> bool {
+        let other: std::collections::HashMap<String, usize> =
+            match other.extract::<PyRef<PyMatch>>() {
+                Ok(other) => other.items().into_iter().collect(),
+                Err(_) => match other.extract() {
+                    Ok(dict) => dict,
+                    Err(_) => return false,
+                },
+            };
+        self.__len__() == other.len() && self.bound().all(|(name, id)| other.get(name) == Some(&id))
+    }
+
+    fn __repr__(&self) -> String {
+        let items: Vec<String> = self
+            .bound()
+            .map(|(name, id)| format!("'{}': {}", name, id))
+            .collect();
+        format!("Match({{{}}})", items.join(", "))
+    }
+}
+
 /// Wrapper that accepts either a query string or compiled Pattern
 #[derive(FromPyObject)]
 enum QueryArg {
@@ -236,15 +490,50 @@ enum QueryArg {
     Pattern(PyPattern),
 }
 
+/// Wrapper that accepts either a single projection expression or a list of them
+#[derive(FromPyObject)]
+enum ExprsArg {
+    One(String),
+    Many(Vec<String>),
+}
+
+/// Parse projection expressions, checking that every variable they read can
+/// be bound by `pattern`
+fn parse_projection(exprs: &[String], pattern: &PyPattern) -> PyResult<Projection> {
+    Projection::parse(exprs)
+        .and_then(|projection| {
+            projection.check_vars(&pattern.slots)?;
+            Ok(projection)
+        })
+        .map_err(|e| PyValueError::new_err(format!("Projection error: {}", e)))
+}
+
 impl QueryArg {
     fn into_pattern(self) -> PyResult<PyPattern> {
         match self {
-            QueryArg::String(s) => py_compile_query(&s),
+            // Compiled through the package's compile_query(), so Treebank
+            // methods share its cache (and cache_clear()) with the
+            // module-level functions
+            QueryArg::String(s) => Python::attach(|py| {
+                let compile = CACHED_COMPILE_QUERY.get_or_try_init(py, || {
+                    py.import("treesearch")?
+                        .getattr("compile_query")
+                        .map(Bound::unbind)
+                })?;
+                compile
+                    .bind(py)
+                    .call1((s,))?
+                    .extract::<PyPattern>()
+                    .map_err(Into::into)
+            }),
             QueryArg::Pattern(p) => Ok(p),
         }
     }
 }
 
+/// `treesearch.compile_query`, looked up on first use
+static CACHED_COMPILE_QUERY: PyOnceLock<Py<PyAny>> = PyOnceLock::new();
+
 /// A compiled query pattern for tree matching.
 ///
 /// Created by parse_query() and used with search functions. Patterns are
@@ -253,7 +542,7 @@ impl QueryArg {
 #[pyfunction(name = "compile_query")]
 fn py_compile_query(query: &str) -> PyResult<PyPattern> {
     compile_query(query)
-        .map(|inner| PyPattern { inner })
+        .map(PyPattern::new)
         .map_err(|e| PyValueError::new_err(format!("Query parse error: {}", e)))
 }
 
@@ -301,27 +590,49 @@ impl PyTreebank {
 
     /// Create a Treebank from multiple file paths.
     ///
+    /// The paths are read straight from the iterable, so a generator such as
+    /// ``Path("corpus").rglob("*.conllu")`` is not copied into a list first.
+    ///
     /// Args:
-    ///     paths: List of paths to CoNLL-U files
+    ///     file_paths: Iterable of paths (str or os.PathLike) to CoNLL-U files
     ///
     /// Returns:
     ///     Treebank instance
     ///
+    /// Raises:
+    ///     TypeError: If file_paths is a single string or yields a non-path
+    ///
     /// Example:
-    ///     >>> tb = Treebank.from_paths(["file1.conllu", "file2.conllu"])
+    ///     >>> tb = Treebank.from_files(["file1.conllu", "file2.conllu"])
     ///     >>> for tree in tb.trees():
     ///     ...     print(tree)
     #[classmethod]
-    fn from_files(_cls: &Bound<'_, pyo3::types::PyType>, file_paths: Vec<String>) -> Self {
-        let path_bufs: Vec<PathBuf> = file_paths.iter().map(PathBuf::from).collect();
-        PyTreebank {
-            inner: Treebank::from_paths(path_bufs),
+    fn from_files(
+        _cls: &Bound<'_, pyo3::types::PyType>,
+        file_paths: &Bound<'_, PyAny>,
+    ) -> PyResult<Self> {
+        if file_paths.is_instance_of::<PyString>() {
+            return Err(PyTypeError::new_err(
+                "file_paths must be an iterable of paths, not a string",
+            ));
+        }
+        // Sized inputs (lists, tuples) are allocated for up front; each path goes
+        // through os.fspath in the extraction, with no str() round trip
+        let mut path_bufs = Vec::with_capacity(file_paths.len().unwrap_or(0));
+        for path in file_paths.try_iter()? {
+            path_bufs.push(path?.extract::<PathBuf>()?);
         }
+        Ok(PyTreebank {
+            inner: Treebank::from_paths(path_bufs),
+        })
     }
 
     /// Create a Treebank from multiple files matching a glob pattern.
     ///
-    /// Files are processed in sorted order for deterministic results.
+    /// The pattern is expanded in Rust each time the treebank is iterated,
+    /// and files are parsed as soon as they are found rather than after the
+    /// whole pattern has been listed. Matches within a directory are visited
+    /// in sorted order for deterministic results.
     ///
     /// Args:
     ///     pattern: Glob pattern (e.g., "data/*.conllu")
@@ -331,12 +642,13 @@ impl PyTreebank {
     ///
     /// Raises:
     ///     ValueError: If glob pattern is invalid
-    // #[classmethod]
-    // fn from_glob(_cls: &Bound<'_, pyo3::types::PyType>, pattern: &str) -> PyResult<Self> {
-    //     Treebank::from_glob(pattern)
-    //         .map(|inner| PyTreebank { inner })
-    //         .map_err(|e| PyValueError::new_err(format!("Glob pattern error: {}", e)))
-    // }
+    #[classmethod]
+    fn from_glob(_cls: &Bound<'_, pyo3::types::PyType>, pattern: &str) -> PyResult<Self> {
+        Treebank::from_glob(pattern)
+            .map(|inner| PyTreebank { inner })
+            .map_err(|e| PyValueError::new_err(format!("Glob pattern error: {}", e)))
+    }
+
     /// Iterate over all trees in the treebank.
     ///
     /// Can be called multiple times. Uses automatic parallel processing
@@ -358,7 +670,7 @@ impl PyTreebank {
     #[pyo3(signature = (ordered=true))]
     fn trees(&self, ordered: bool) -> PyTreeIterator {
         PyTreeIterator {
-            inner: Box::new(
+            inner: Prefetch::new(
                 self.inner
                     .clone()
                     .tree_iter(ordered)
@@ -392,16 +704,177 @@ impl PyTreebank {
     #[pyo3(signature = (pattern, ordered=true))]
     fn search(&self, pattern: QueryArg, ordered: bool) -> PyResult<PyMatchIterator> {
         let compiled = pattern.into_pattern()?;
+        let slots = compiled.slots.clone();
         Ok(PyMatchIterator {
-            inner: Box::new(
-                self.inner
-                    .clone()
-                    .match_iter(compiled.inner, ordered)
-                    .map(|result| result.map(|m| (m.tree, m.bindings))),
-            ),
+            inner: Prefetch::new(self.inner.clone().match_iter(compiled.inner, ordered).map(
+                move |result| {
+                    result
+                        .map(|m| (m.tree, PyMatch::new(slots.clone(), &m.bindings)))
+                        .map_err(PyErr::from)
+                },
+            )),
+            last_tree: None,
         })
     }
 
+    /// Search for several patterns in a single pass over the treebank.
+    ///
+    /// Each tree is parsed once and matched against every pattern, so running
+    /// K queries together costs one parse of the corpus instead of K. Matches
+    /// are yielded as (index, tree, match) tuples, where index is the position
+    /// of the pattern in ``patterns``.
+    ///
+    /// Args:
+    ///     patterns: List of compiled patterns or query strings
+    ///     ordered: If True (default), matches are returned in deterministic order
+    ///              (by tree, then by pattern). If False, they may arrive in any
+    ///              order for better performance.
+    ///
+    /// Returns:
+    ///     Iterator over (index, tree, match) tuples
+    ///
+    /// Example:
+    ///     >>> queries = ["MATCH { V [upos='VERB']; }", "MATCH { N [upos='NOUN']; }"]
+    ///     >>> counts = [0] * len(queries)
+    ///     >>> for i, tree, match in tb.search_batch(queries):
+    ///     ...     counts[i] += 1
+    #[pyo3(signature = (patterns, ordered=true))]
+    fn search_batch(
+        &self,
+        patterns: Vec<QueryArg>,
+        ordered: bool,
+    ) -> PyResult<PyBatchMatchIterator> {
+        let compiled = patterns
+            .into_iter()
+            .map(QueryArg::into_pattern)
+            .collect::<PyResult<Vec<_>>>()?;
+        let slots: Vec<Arc<[String]>> = compiled.iter().map(|p| p.slots.clone()).collect();
+        let patterns = compiled.into_iter().map(|p| p.inner).collect();
+        Ok(PyBatchMatchIterator {
+            inner: Prefetch::new(self.inner.clone().search_batch(patterns, ordered).map(
+                move |result| {
+                    result.map(|(i, m)| (i, m.tree, PyMatch::new(slots[i].clone(), &m.bindings)))
+                },
+            )),
+            last_tree: None,
+        })
+    }
+
+    /// Search for pattern matches and return projected values for each one.
+    ///
+    /// Each expression is evaluated in Rust as matches are found, so the loop
+    /// body receives plain Python values instead of Word objects. Supported
+    /// expressions:
+    ///
+    /// - ``Var.form``, ``Var.lemma``, ``Var.upos``, ``Var.xpos``, ``Var.deprel``
+    ///   (append ``.lower`` for a lowercased string)
+    /// - ``Var.id``, ``Var.head``
+    /// - ``Var.feats.Key``, ``Var.misc.Key``
+    /// - ``Var.has_child(deprel)``, ``Var.has_child(deprel, XPOS)``
+    /// - ``A.id - B.id``
+    /// - ``path(A, B)`` (deprels from A down to B, joined with ``/``)
+    /// - ``text``, ``meta.key``
+    ///
+    /// Expressions that refer to an unbound OPTIONAL variable yield None.
+    ///
+    /// Args:
+    ///     pattern: Compiled pattern from compile_query() or a query string
+    ///     exprs: List of projection expressions
+    ///     ordered: If True (default), rows are returned in deterministic order.
+    ///              If False, rows may arrive in any order for better performance.
+    ///
+    /// Returns:
+    ///     Iterator over tuples, one value per expression
+    ///
+    /// Raises:
+    ///     ValueError: If an expression is invalid or names a variable not in the query
+    ///
+    /// Example:
+    ///     >>> tb = Treebank.from_file("data.conllu")
+    ///     >>> query = "MATCH { H [upos='VERB']; X [upos='VERB']; H -[xcomp]-> X; }"
+    ///     >>> for lemma, transitive, dist in tb.project(
+    ///     ...     query, ["H.lemma", "H.has_child(obj)", "X.id - H.id"]
+    ///     ... ):
+    ///     ...     print(lemma, transitive, dist)
+    #[pyo3(signature = (pattern, exprs, ordered=true))]
+    fn project(
+        &self,
+        pattern: QueryArg,
+        exprs: Vec<String>,
+        ordered: bool,
+    ) -> PyResult<PyProjectionIterator> {
+        let compiled = pattern.into_pattern()?;
+        let projection = parse_projection(&exprs, &compiled)?;
+        Ok(PyProjectionIterator {
+            inner: Prefetch::new(self.inner.clone().project_iter(
+                compiled.inner,
+                projection,
+                ordered,
+            )),
+        })
+    }
+
+    /// Count matches, optionally grouped by projected values.
+    ///
+    /// Without ``key``, returns the total number of matches. With ``key``,
+    /// evaluates it for every match and returns how often each distinct
+    /// value occurs. Counting runs in parallel with the GIL released, so no
+    /// per-match Python objects are created. ``key`` uses the same expression
+    /// syntax as project().
+    ///
+    /// Args:
+    ///     pattern: Compiled pattern from compile_query() or a query string
+    ///     key: A projection expression, a list of expressions, or None
+    ///
+    /// Returns:
+    ///     The number of matches if key is None, otherwise a dict mapping each
+    ///     value (or tuple of values, if key is a list) to the number of
+    ///     matches that produced it
+    ///
+    /// Raises:
+    ///     ValueError: If an expression is invalid or names a variable not in the query
+    ///
+    /// Example:
+    ///     >>> tb = Treebank.from_glob("corpus/*.conllu.gz")
+    ///     >>> n = tb.count("MATCH { V [upos='VERB']; }")
+    ///     >>> verbs = tb.count("MATCH { V [upos='VERB']; }", "V.lemma")
+    ///     >>> sorted(verbs.items(), key=lambda kv: -kv[1])[:10]
+    #[pyo3(signature = (pattern, key=None))]
+    fn count(
+        &self,
+        py: Python<'_>,
+        pattern: QueryArg,
+        key: Option<ExprsArg>,
+    ) -> PyResult<Py<PyAny>> {
+        let compiled = pattern.into_pattern()?;
+        let treebank = self.inner.clone();
+        let Some(key) = key else {
+            let n = py.detach(|| treebank.match_count(compiled.inner))?;
+            return Ok(n.into_pyobject(py)?.into_any().unbind());
+        };
+        let (exprs, scalar) = match key {
+            ExprsArg::One(expr) => (vec![expr], true),
+            ExprsArg::Many(exprs) => (exprs, false),
+        };
+        let projection = parse_projection(&exprs, &compiled)?;
+        let counts = py.detach(|| treebank.count(compiled.inner, &projection))?;
+
+        let dict = PyDict::new(py);
+        for (values, n) in counts {
+            let key = if scalar {
+                value_to_py(py, values.into_iter().next().unwrap_or(Value::Null))?
+            } else {
+                let items = values
+                    .into_iter()
+                    .map(|v| value_to_py(py, v))
+                    .collect::<PyResult<Vec<_>>>()?;
+                PyTuple::new(py, items)?.into_any().unbind()
+            };
+            dict.set_item(key, n)?;
+        }
+        Ok(dict.into_any().unbind())
+    }
+
     /// Filter trees that match a pattern.
     ///
     /// Returns only trees that have at least one match for the pattern.
@@ -425,7 +898,7 @@ impl PyTreebank {
     fn filter(&self, pattern: QueryArg, ordered: bool) -> PyResult<PyTreeIterator> {
         let compiled = pattern.into_pattern()?;
         Ok(PyTreeIterator {
-            inner: Box::new(
+            inner: Prefetch::new(
                 self.inner
                     .clone()
                     .filter(compiled.inner, ordered)
@@ -440,6 +913,61 @@ impl PyTreebank {
     }
 }
 
+/// Number of results pulled from a Rust iterator per GIL release
+const PREFETCH_SIZE: usize = 1024;
+
+/// Buffer in front of a Rust result iterator.
+///
+/// Releasing and reacquiring the GIL for every item costs more than producing
+/// most items, so results are pulled in batches of up to `PREFETCH_SIZE` with
+/// the GIL released once per batch, then handed out one at a time.
+struct Prefetch<T, E = TreebankError> {
+    source: Box<dyn Iterator<Item = Result<T, E>> + Send>,
+    buffer: VecDeque<Result<T, E>>,
+}
+
+impl<T: Send, E: Send> Prefetch<T, E> {
+    fn new(source: impl Iterator<Item = Result<T, E>> + Send + 'static) -> Self {
+        Prefetch {
+            source: Box::new(source),
+            buffer: VecDeque::new(),
+        }
+    }
+
+    fn next(&mut self, py: Python) -> Option<Result<T, E>> {
+        if self.buffer.is_empty() {
+            let Prefetch { source, buffer } = self;
+            // Release GIL during expensive parsing and pattern matching
+            py.detach(|| buffer.extend(source.take(PREFETCH_SIZE)));
+        }
+        self.buffer.pop_front()
+    }
+
+    /// Take up to `size` items, releasing the GIL once while the source fills
+    /// the rest. Items before an error are returned first; the error is
+    /// reported by the following call.
+    fn next_batch(&mut self, py: Python, size: usize) -> Result<Vec<T>, E> {
+        let Prefetch { source, buffer } = self;
+        if buffer.len() < size {
+            let wanted = size - buffer.len();
+            py.detach(|| buffer.extend(source.take(wanted)));
+        }
+        let mut batch = Vec::with_capacity(buffer.len().min(size));
+        while batch.len() < size {
+            match buffer.pop_front() {
+                Some(Ok(item)) => batch.push(item),
+                Some(Err(e)) if batch.is_empty() => return Err(e),
+                Some(Err(e)) => {
+                    buffer.push_front(Err(e));
+                    break;
+                }
+                None => break,
+            }
+        }
+        Ok(batch)
+    }
+}
+
 /// Iterator over trees from a treebank.
 ///
 /// Note: Marked as unsendable because iterators have mutable state and shouldn't
@@ -447,7 +975,7 @@ impl PyTreebank {
 /// other Python threads to run in parallel.
 #[pyclass(name = "TreeIterator", unsendable)]
 struct PyTreeIterator {
-    inner: Box<dyn Iterator<Item = Result<Arc<RustTree>, TreebankError>> + Send>,
+    inner: Prefetch<Arc<RustTree>>,
 }
 
 #[pymethods]
@@ -457,8 +985,7 @@ impl PyTreeIterator {
     }
 
     fn __next__(&mut self, py: Python) -> PyResult<Option<PyTree>> {
-        // Release GIL during expensive tree parsing/iteration
-        let result = py.detach(|| self.inner.next());
+        let result = self.inner.next(py);
         match result {
             Some(Ok(tree)) => Ok(Some(PyTree { inner: tree })),
             Some(Err(e)) => Err(e.into()),
@@ -474,14 +1001,28 @@ impl PyTreeIterator {
 /// other Python threads to run in parallel.
 #[pyclass(name = "MatchIterator", unsendable)]
 struct PyMatchIterator {
-    inner: Box<
-        dyn Iterator<
-                Item = Result<
-                    (Arc<RustTree>, std::collections::HashMap<String, usize>),
-                    TreebankError,
-                >,
-            > + Send,
-    >,
+    inner: Prefetch<(Arc<RustTree>, PyMatch), PyErr>,
+    /// Python object for the tree of the last match yielded
+    last_tree: Option<Py<PyTree>>,
+}
+
+/// The Python object for `tree`, reusing `last` when it wraps the same tree.
+///
+/// Matches arrive grouped by tree, so every match after a tree's first one
+/// shares its `Tree` object instead of allocating a new one.
+fn tree_object(
+    py: Python<'_>,
+    last: &mut Option<Py<PyTree>>,
+    tree: Arc<RustTree>,
+) -> PyResult<Py<PyTree>> {
+    if let Some(object) = last {
+        if Arc::ptr_eq(&object.get().inner, &tree) {
+            return Ok(object.clone_ref(py));
+        }
+    }
+    let object = Py::new(py, PyTree { inner: tree })?;
+    *last = Some(object.clone_ref(py));
+    Ok(object)
 }
 
 #[pymethods]
@@ -490,28 +1031,227 @@ impl PyMatchIterator {
         slf
     }
 
-    fn __next__(
-        &mut self,
-        py: Python,
-    ) -> PyResult<Option<(PyTree, std::collections::HashMap<String, usize>)>> {
-        // Release GIL during expensive pattern matching
-        let result = py.detach(|| self.inner.next());
+    fn __next__(&mut self, py: Python) -> PyResult<Option<(Py<PyTree>, PyMatch)>> {
+        let result = self.inner.next(py);
         match result {
-            Some(Ok((tree, bindings))) => Ok(Some((PyTree { inner: tree }, bindings))),
+            Some(Ok((tree, m))) => Ok(Some((tree_object(py, &mut self.last_tree, tree)?, m))),
+            Some(Err(e)) => Err(e),
+            None => Ok(None),
+        }
+    }
+
+    /// Return the next batch of up to ``size`` (tree, match) tuples as a list.
+    ///
+    /// The whole batch is produced with the GIL released once, so looping over
+    /// batches crosses into Rust once per batch rather than once per match.
+    /// Returns an empty list when the iterator is exhausted.
+    ///
+    /// Example:
+    ///     >>> it = tb.search(pattern)
+    ///     >>> while batch := it.next_batch(4096):
+    ///     ...     handle(batch)
+    #[pyo3(signature = (size=PREFETCH_SIZE))]
+    fn next_batch(&mut self, py: Python, size: usize) -> PyResult<Vec<(Py<PyTree>, PyMatch)>> {
+        let batch = self.inner.next_batch(py, size)?;
+        batch
+            .into_iter()
+            .map(|(tree, m)| Ok((tree_object(py, &mut self.last_tree, tree)?, m)))
+            .collect()
+    }
+}
+
+/// Iterator over (index, tree, match) tuples from Treebank.search_batch().
+///
+/// Note: Marked as unsendable because iterators have mutable state and shouldn't
+/// be shared across threads. However, we release the GIL during iteration to allow
+/// other Python threads to run in parallel.
+#[pyclass(name = "BatchMatchIterator", unsendable)]
+struct PyBatchMatchIterator {
+    inner: Prefetch<(usize, Arc<RustTree>, PyMatch)>,
+    /// Python object for the tree of the last match yielded
+    last_tree: Option<Py<PyTree>>,
+}
+
+#[pymethods]
+impl PyBatchMatchIterator {
+    fn __iter__(slf: PyRef<Self>) -> PyRef<Self> {
+        slf
+    }
+
+    fn __next__(&mut self, py: Python) -> PyResult<Option<(usize, Py<PyTree>, PyMatch)>> {
+        let result = self.inner.next(py);
+        match result {
+            Some(Ok((i, tree, m))) => Ok(Some((i, tree_object(py, &mut self.last_tree, tree)?, m))),
+            Some(Err(e)) => Err(e.into()),
+            None => Ok(None),
+        }
+    }
+}
+
+/// Iterator over tuples of projected values from Treebank.project().
+///
+/// Note: Marked as unsendable because iterators have mutable state and shouldn't
+/// be shared across threads. However, we release the GIL during iteration to allow
+/// other Python threads to run in parallel.
+#[pyclass(name = "ProjectionIterator", unsendable)]
+struct PyProjectionIterator {
+    inner: Prefetch<Vec<Value>>,
+}
+
+fn value_to_py(py: Python<'_>, value: Value) -> PyResult<Py<PyAny>> {
+    Ok(match value {
+        Value::Null => py.None(),
+        Value::Bool(b) => b.into_pyobject(py)?.to_owned().into_any().unbind(),
+        Value::Int(i) => i.into_pyobject(py)?.into_any().unbind(),
+        Value::Str(s) => s.into_pyobject(py)?.into_any().unbind(),
+    })
+}
+
+#[pymethods]
+impl PyProjectionIterator {
+    fn __iter__(slf: PyRef<Self>) -> PyRef<Self> {
+        slf
+    }
+
+    fn __next__<'py>(&mut self, py: Python<'py>) -> PyResult<Option<Bound<'py, PyTuple>>> {
+        let result = self.inner.next(py);
+        match result {
+            Some(Ok(values)) => {
+                let items = values
+                    .into_iter()
+                    .map(|value| value_to_py(py, value))
+                    .collect::<PyResult<Vec<_>>>()?;
+                Ok(Some(PyTuple::new(py, items)?))
+            }
             Some(Err(e)) => Err(e.into()),
             None => Ok(None),
         }
     }
+
+    /// Return the next batch of up to ``size`` rows as a list of tuples.
+    ///
+    /// The whole batch is produced with the GIL released once. Returns an
+    /// empty list when the iterator is exhausted.
+    #[pyo3(signature = (size=PREFETCH_SIZE))]
+    fn next_batch<'py>(
+        &mut self,
+        py: Python<'py>,
+        size: usize,
+    ) -> PyResult<Vec<Bound<'py, PyTuple>>> {
+        let batch = self.inner.next_batch(py, size)?;
+        batch
+            .into_iter()
+            .map(|values| {
+                let items = values
+                    .into_iter()
+                    .map(|value| value_to_py(py, value))
+                    .collect::<PyResult<Vec<_>>>()?;
+                PyTuple::new(py, items)
+            })
+            .collect()
+    }
 }
 
-/// Search a list of trees for pattern matches.
+/// Number of trees taken from the Python iterator each time search_trees()
+/// reacquires the GIL
+const TREE_FEED_SIZE: usize = 64;
+
+/// Matches from trees pulled lazily out of a Python iterator.
+///
+/// Runs inside the GIL-released section of `Prefetch`: the GIL is taken back
+/// once per `TREE_FEED_SIZE` trees to pull the next batch, which is then
+/// searched without it. Only one batch of trees is held at a time.
+///
+/// Each batch is searched on the calling thread, not the rayon pool: the
+/// iterator may itself be fed by rayon workers (`trees(ordered=False)`),
+/// which block on their channel until this thread reads it again.
+struct TreeFeed {
+    /// None once the iterator is exhausted or has raised
+    trees: Option<Py<PyIterator>>,
+    pattern: PyPattern,
+    pending: VecDeque<PyResult<(Arc<RustTree>, PyMatch)>>,
+}
+
+impl TreeFeed {
+    /// Pull up to `TREE_FEED_SIZE` trees and queue their matches, followed by
+    /// any error raised while pulling them.
+    fn refill(&mut self, trees: Py<PyIterator>) {
+        let (batch, error) = Python::attach(|py| {
+            let mut iter = trees.bind(py).clone();
+            let mut batch = Vec::with_capacity(TREE_FEED_SIZE);
+            while batch.len() < TREE_FEED_SIZE {
+                let tree = iter
+                    .next()
+                    .map(|tree| tree.and_then(|t| t.extract::<PyTree>().map_err(Into::into)));
+                match tree {
+                    Some(Ok(tree)) => batch.push(tree.inner),
+                    // Dropping `trees` here, with the GIL held, ends the feed
+                    Some(Err(e)) => return (batch, Some(e)),
+                    None => return (batch, None),
+                }
+            }
+            self.trees = Some(trees);
+            (batch, None)
+        });
+        let matches = batch
+            .iter()
+            .flat_map(|tree| search_pattern_tree(tree, &self.pattern));
+        self.pending.extend(matches.map(Ok));
+        self.pending.extend(error.map(Err));
+    }
+}
+
+/// Search a batch of trees on the rayon pool, keeping matches in tree order.
+///
+/// Called with the GIL released, so the workers run alongside Python threads.
+fn search_tree_batch(
+    trees: &[Arc<RustTree>],
+    pattern: &PyPattern,
+) -> Vec<(Arc<RustTree>, PyMatch)> {
+    trees
+        .par_iter()
+        .flat_map_iter(|tree| search_pattern_tree(tree, pattern))
+        .collect()
+}
+
+/// Matches of `pattern` in one tree, paired with the tree they were found in.
+fn search_pattern_tree<'a>(
+    tree: &Arc<RustTree>,
+    pattern: &'a PyPattern,
+) -> impl Iterator<Item = (Arc<RustTree>, PyMatch)> + 'a {
+    let PyPattern { inner, slots } = pattern;
+    // Each match already holds a reference to its tree; move it out rather
+    // than taking another one and dropping the match's
+    search_shared_tree(tree, inner).into_iter().map(|m| {
+        let ids = PyMatch::new(slots.clone(), &m.bindings);
+        (m.tree, ids)
+    })
+}
+
+impl Iterator for TreeFeed {
+    type Item = PyResult<(Arc<RustTree>, PyMatch)>;
+
+    fn next(&mut self) -> Option<Self::Item> {
+        while self.pending.is_empty() {
+            let trees = self.trees.take()?;
+            self.refill(trees);
+        }
+        self.pending.pop_front()
+    }
+}
+
+/// Search trees for pattern matches.
 ///
 /// Returns an iterator over (tree, match) tuples for all matches found across
-/// all trees. Each match is a dictionary mapping variable names from the query
-/// to word IDs in the tree.
+/// all trees. Each match is a Match mapping variables from the query (by
+/// name or by Pattern.slot()) to word IDs in the tree.
+///
+/// Trees in a list or tuple are taken all at once. Other iterables are read
+/// lazily, a small batch at a time, so a generator of trees is searched as it
+/// produces them rather than being collected first.
 ///
 /// Args:
-///     trees: List of trees to search
+///     trees: Iterable of trees to search
 ///     pattern: Compiled pattern from compile_query() or a query string
 ///
 /// Returns:
@@ -521,20 +1261,34 @@ impl PyMatchIterator {
 ///     for tree, match in treesearch.search_trees([tree1, tree2], pattern):
 ///         print(match)
 #[pyfunction]
-fn py_search_trees(trees: Vec<PyTree>, pattern: QueryArg) -> PyResult<PyMatchIterator> {
-    let compiled = pattern.into_pattern()?;
-    let results: Vec<_> = trees
-        .into_iter()
-        .flat_map(|tree| {
-            let tree_arc = tree.inner.clone();
-            search_tree((*tree_arc).clone(), &compiled.inner)
-                .into_iter()
-                .map(move |m| Ok((tree_arc.clone(), m.bindings)))
-        })
-        .collect();
-
+fn py_search_trees(trees: &Bound<'_, PyAny>, pattern: QueryArg) -> PyResult<PyMatchIterator> {
+    let pattern = pattern.into_pattern()?;
+    if trees.is_instance_of::<PyList>() || trees.is_instance_of::<PyTuple>() {
+        // Already in memory: take every tree now, so the search never has to
+        // reacquire the GIL to pull more
+        let trees = trees
+            .try_iter()?
+            .map(|tree| Ok(tree?.extract::<PyTree>()?.inner))
+            .collect::<PyResult<Vec<_>>>()?;
+        // Searched a chunk at a time on the rayon pool as results are read
+        let chunks: Vec<Vec<_>> = trees.chunks(TREE_FEED_SIZE).map(<[_]>::to_vec).collect();
+        let matches = chunks
+            .into_iter()
+            .flat_map(move |chunk| search_tree_batch(&chunk, &pattern))
+            .map(Ok);
+        return Ok(PyMatchIterator {
+            inner: Prefetch::new(matches),
+            last_tree: None,
+        });
+    }
+    let feed = TreeFeed {
+        trees: Some(trees.try_iter()?.unbind()),
+        pattern,
+        pending: VecDeque::new(),
+    };
     Ok(PyMatchIterator {
-        inner: Box::new(results.into_iter()),
+        inner: Prefetch::new(feed),
+        last_tree: None,
     })
 }
 
@@ -634,9 +1388,12 @@ fn treesearch(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<PyTree>()?;
     m.add_class::<PyWord>()?;
     m.add_class::<PyPattern>()?;
+    m.add_class::<PyMatch>()?;
     m.add_class::<PyTreebank>()?;
     m.add_class::<PyTreeIterator>()?;
     m.add_class::<PyMatchIterator>()?;
+    m.add_class::<PyBatchMatchIterator>()?;
+    m.add_class::<PyProjectionIterator>()?;
 
     m.add_function(wrap_pyfunction!(py_compile_query, m)?)?;
     m.add_function(wrap_pyfunction!(py_search_trees, m)?)?;
@@ -939,6 +939,23 @@ MATCH {
         ));
     }
 
+    #[test]
+    fn test_slot_names() {
+        let query = r#"
+            MATCH { V [upos="VERB"]; N [upos="NOUN"]; V -[obj]-> N; }
+            EXCEPT { A [upos="ADV"]; V -[advmod]-> A; }
+            OPTIONAL { S []; V -[nsubj]-> S; }
+        "#;
+        let pattern = compile_query(query).unwrap();
+        let names = pattern.slot_names();
+
+        // MATCH variables keep their ids as slots; EXCEPT variables are never bound
+        assert_eq!(names.len(), 3);
+        assert_eq!(names[pattern.match_pattern.var_ids["V"]], "V");
+        assert_eq!(names[pattern.match_pattern.var_ids["N"]], "N");
+        assert_eq!(names[2], "S");
+    }
+
     #[test]
     fn test_parse_comments() {
         // Inline comment with #
@@ -8,10 +8,13 @@
 
 use crate::RelationType;
 use crate::bytes::Sym;
-use crate::pattern::{BasePattern, Constraint, ConstraintValue, EdgeConstraint, Pattern};
+use crate::pattern::{
+    BasePattern, Constraint, ConstraintValue, DirectedEdge, EdgeConstraint, Pattern, PatternShape,
+    VarId,
+};
 use crate::query::{QueryError, compile_query};
 use crate::tree::Word;
-use crate::tree::{Tree, WordId};
+use crate::tree::{NO_HEAD, Tree, WordId};
 use fastbit::{BitFixed, BitRead, BitWrite};
 use std::collections::HashMap;
 use std::sync::Arc;
@@ -84,31 +87,161 @@ fn satisfies_var_constraint(tree: &Tree, word: &Word, constraint: &Constraint) -
         }
         Constraint::HasChild(label) => {
             if let Some(required_label) = label {
-                !word.children_by_deprel(tree, required_label).is_empty()
+                word.has_child(tree, required_label, None)
             } else {
-                !word.children.is_empty()
+                !tree.children_of(word.id).is_empty()
             }
         }
     }
 }
 
+/// A node constraint lowered against one tree's string pool and tag columns.
+///
+/// Literal tag tests become symbol comparisons on a column, so checking a
+/// word compares integers instead of locking the pool to compare bytes, and
+/// child tests read the children's deprels from the column instead of their
+/// `Word`s. Literal FEATS/MISC pairs likewise become a pair of symbols. The
+/// rest (regexes) is checked against the word as before.
+enum NodeTest<'a> {
+    /// Always or never true, e.g. a literal this tree's pool has never seen
+    Const(bool),
+    /// The word's entry in a tag column is this symbol
+    Tag(&'a [Sym], Sym),
+    /// The word has a head (a packed head column)
+    HasHead(&'a [u32]),
+    /// The word has at least one child
+    HasChildren,
+    /// Some child's entry in the deprel column is this symbol
+    ChildDeprel(&'a [Sym], Sym),
+    /// The word's FEATS has this key=value pair of symbols
+    Feature(Sym, Sym),
+    /// The word's MISC has this key=value pair of symbols
+    Misc(Sym, Sym),
+    /// Checked with `satisfies_var_constraint`
+    Word(&'a Constraint),
+    And(Vec<NodeTest<'a>>),
+    Not(Box<NodeTest<'a>>),
+}
+
+impl<'a> NodeTest<'a> {
+    fn lower(tree: &'a Tree, constraint: &'a Constraint) -> Self {
+        let columns = tree.tag_columns();
+        let tag = |column: &'a [Sym], value: &'a ConstraintValue| match value {
+            ConstraintValue::Literal(literal) => tree
+                .string_pool
+                .get(literal.as_bytes())
+                .map_or(NodeTest::Const(false), |sym| NodeTest::Tag(column, sym)),
+            ConstraintValue::Regex(..) => NodeTest::Word(constraint),
+        };
+        // A key=value pair matches only if the pool has seen both strings
+        let pair = |key: &str, value: &str| {
+            Some((
+                tree.string_pool.get(key.as_bytes())?,
+                tree.string_pool.get(value.as_bytes())?,
+            ))
+        };
+        match constraint {
+            Constraint::Any => NodeTest::Const(true),
+            Constraint::Lemma(value) => tag(&columns.lemma, value),
+            Constraint::UPOS(value) => tag(&columns.upos, value),
+            Constraint::XPOS(value) => tag(&columns.xpos, value),
+            Constraint::Form(value) => tag(&columns.form, value),
+            Constraint::DepRel(value) => tag(&columns.deprel, value),
+            Constraint::IsChild(None) => NodeTest::HasHead(&columns.head),
+            Constraint::IsChild(Some(label)) => match tree.string_pool.get(label.as_bytes()) {
+                Some(sym) => NodeTest::And(vec![
+                    NodeTest::HasHead(&columns.head),
+                    NodeTest::Tag(&columns.deprel, sym),
+                ]),
+                None => NodeTest::Const(false),
+            },
+            Constraint::HasChild(None) => NodeTest::HasChildren,
+            Constraint::HasChild(Some(label)) => match tree.string_pool.get(label.as_bytes()) {
+                Some(sym) => NodeTest::ChildDeprel(&columns.deprel, sym),
+                None => NodeTest::Const(false),
+            },
+            Constraint::Feature(key, ConstraintValue::Literal(value)) => match pair(key, value) {
+                Some((key, value)) => NodeTest::Feature(key, value),
+                None => NodeTest::Const(false),
+            },
+            Constraint::Misc(key, ConstraintValue::Literal(value)) => match pair(key, value) {
+                Some((key, value)) => NodeTest::Misc(key, value),
+                None => NodeTest::Const(false),
+            },
+            Constraint::And(constraints) => NodeTest::And(
+                constraints
+                    .iter()
+                    .map(|constraint| NodeTest::lower(tree, constraint))
+                    .collect(),
+            ),
+            Constraint::Not(inner) => NodeTest::Not(Box::new(NodeTest::lower(tree, inner))),
+            _ => NodeTest::Word(constraint),
+        }
+    }
+
+    fn matches(&self, tree: &Tree, word_id: WordId) -> bool {
+        match self {
+            NodeTest::Const(result) => *result,
+            NodeTest::Tag(column, sym) => column[word_id] == *sym,
+            NodeTest::HasHead(heads) => heads[word_id] != NO_HEAD,
+            NodeTest::HasChildren => !tree.children_of(word_id).is_empty(),
+            NodeTest::ChildDeprel(deprels, sym) => tree
+                .children_of(word_id)
+                .iter()
+                .any(|&child| deprels[child] == *sym),
+            NodeTest::Feature(key, value) => tree.words[word_id].feats.contains(&(*key, *value)),
+            NodeTest::Misc(key, value) => tree.words[word_id].misc.contains(&(*key, *value)),
+            NodeTest::Word(constraint) => {
+                satisfies_var_constraint(tree, &tree.words[word_id], constraint)
+            }
+            NodeTest::And(tests) => tests.iter().all(|test| test.matches(tree, word_id)),
+            NodeTest::Not(test) => !test.matches(tree, word_id),
+        }
+    }
+}
+
+/// An edge constraint's deprel label resolved against one tree's string pool
+#[derive(Debug, Clone, Copy, PartialEq)]
+enum EdgeLabel {
+    /// The edge has no label constraint
+    Any,
+    /// The label's symbol in this tree's pool
+    Sym(Sym),
+    /// The pool has never seen the label, so no edge in this tree can carry it
+    Absent,
+}
+
+/// Resolve each edge label in `pattern` to a symbol, so arc checks during the
+/// search compare integers instead of locking the pool to compare bytes
+fn resolve_edge_labels(tree: &Tree, pattern: &BasePattern) -> Vec<EdgeLabel> {
+    pattern
+        .edge_constraints
+        .iter()
+        .map(|edge_constraint| match &edge_constraint.label {
+            None => EdgeLabel::Any,
+            Some(label) => tree
+                .string_pool
+                .get(label.as_bytes())
+                .map_or(EdgeLabel::Absent, EdgeLabel::Sym),
+        })
+        .collect()
+}
+
 fn satisfies_arc_constraint(
     tree: &Tree,
     from_word_id: WordId,
     to_word_id: WordId,
     edge_constraint: &EdgeConstraint,
+    label: EdgeLabel,
 ) -> bool {
     let satisfies_constraint = match edge_constraint.relation {
         RelationType::Child => {
             tree.check_rel(from_word_id, to_word_id)
-                && edge_constraint
-                    .label
-                    .as_ref()
-                    .is_none_or(|expected_deprel| {
-                        let actual_deprel = tree.word(to_word_id).unwrap().deprel;
-                        tree.string_pool
-                            .compare_bytes(actual_deprel, expected_deprel.as_bytes())
-                    })
+                && match label {
+                    EdgeLabel::Any => true,
+                    EdgeLabel::Sym(sym) => tree.deprel_of(to_word_id) == sym,
+                    EdgeLabel::Absent => false,
+                }
         }
         RelationType::Precedes => from_word_id < to_word_id,
         RelationType::ImmediatelyPrecedes => to_word_id == from_word_id + 1,
@@ -121,52 +254,285 @@ fn satisfies_arc_constraint(
     }
 }
 
+/// Find a literal tag or edge-label constraint that every candidate for
+/// `constraint` must satisfy, returning the matching tag column and the literal
+///
+/// In a conjunction the most selective column is scanned: a form or lemma
+/// literal leaves far fewer words to check against the other conjuncts than
+/// a UPOS tag does.
+fn column_literal<'a>(tree: &'a Tree, constraint: &'a Constraint) -> Option<(&'a [Sym], &'a str)> {
+    ranked_column_literal(tree, constraint).map(|(_, column, literal)| (column, literal))
+}
+
+/// `column_literal` with the column's selectivity rank (lower matches fewer words)
+fn ranked_column_literal<'a>(
+    tree: &'a Tree,
+    constraint: &'a Constraint,
+) -> Option<(u8, &'a [Sym], &'a str)> {
+    let columns = tree.tag_columns();
+    let (rank, column, value) = match constraint {
+        Constraint::Form(value) => (0, &columns.form, value),
+        Constraint::Lemma(value) => (0, &columns.lemma, value),
+        Constraint::XPOS(value) => (1, &columns.xpos, value),
+        Constraint::DepRel(value) => (2, &columns.deprel, value),
+        Constraint::UPOS(value) => (3, &columns.upos, value),
+        // Only a prefilter: the word must also have a head
+        Constraint::IsChild(Some(label)) => return Some((2, &columns.deprel, label)),
+        Constraint::And(constraints) => {
+            return constraints
+                .iter()
+                .filter_map(|c| ranked_column_literal(tree, c))
+                .min_by_key(|&(rank, ..)| rank);
+        }
+        _ => return None,
+    };
+    match value {
+        ConstraintValue::Literal(literal) => Some((rank, column, literal)),
+        ConstraintValue::Regex(..) => None,
+    }
+}
+
+/// Number of column entries compared per bitmask in `for_each_position`
+const SCAN_LANES: usize = 32;
+
+/// Call `f` with the index of every entry in `column` equal to `sym`, in order.
+///
+/// Entries are compared a block at a time into a bitmask with no branches in
+/// the inner loop, which the compiler turns into vector compares; set bits
+/// are then visited with `trailing_zeros`.
+fn for_each_position(column: &[Sym], sym: Sym, mut f: impl FnMut(usize)) {
+    let mut blocks = column.chunks_exact(SCAN_LANES);
+    let mut base = 0;
+    for block in &mut blocks {
+        let mut mask = block
+            .iter()
+            .enumerate()
+            .fold(0u32, |mask, (i, &tag)| mask | (((tag == sym) as u32) << i));
+        while mask != 0 {
+            f(base + mask.trailing_zeros() as usize);
+            mask &= mask - 1;
+        }
+        base += SCAN_LANES;
+    }
+    for (i, &tag) in blocks.remainder().iter().enumerate() {
+        if tag == sym {
+            f(base + i);
+        }
+    }
+}
+
+/// Fill `domain` with the unassigned words that satisfy `constraint`.
+///
+/// When the constraint includes a literal tag test, the literal is resolved to
+/// a symbol once and the tag column is scanned for it, so only the surviving
+/// candidates are checked against the full constraint. That check runs on the
+/// constraint lowered to a `NodeTest`, so its literal tests compare symbols.
+fn init_domain(
+    tree: &Tree,
+    constraint: &Constraint,
+    assigned_words: &BitFixed<u64>,
+    domain: &mut BitFixed<u64>,
+) {
+    let test = NodeTest::lower(tree, constraint);
+    fill_domain(tree, constraint, &test, assigned_words, domain);
+}
+
+/// `init_domain` with the constraint already lowered for this tree
+fn fill_domain(
+    tree: &Tree,
+    constraint: &Constraint,
+    test: &NodeTest,
+    assigned_words: &BitFixed<u64>,
+    domain: &mut BitFixed<u64>,
+) {
+    if let NodeTest::Const(false) = test {
+        return;
+    }
+    if let Some((column, literal)) = column_literal(tree, constraint) {
+        // A string the pool has never seen can't appear in this tree
+        let Some(sym) = tree.string_pool.get(literal.as_bytes()) else {
+            return;
+        };
+        let exact = !matches!(constraint, Constraint::And(_) | Constraint::IsChild(_));
+        for_each_position(column, sym, |word_id| {
+            if !assigned_words.test(word_id) && (exact || test.matches(tree, word_id)) {
+                domain.set(word_id);
+            }
+        });
+        return;
+    }
+
+    for word_id in 0..tree.words.len() {
+        if !assigned_words.test(word_id) && test.matches(tree, word_id) {
+            domain.set(word_id);
+        }
+    }
+}
+
+/// Words a variable can take given a positive child edge to a variable that
+/// is already bound: the bound word's children, or its head.
+///
+/// EXCEPT and OPTIONAL blocks usually hang off a variable bound by MATCH
+/// (`V -[advmod]-> M`), so this limits the new variable to a handful of words
+/// instead of scanning the whole tree. Returns `None` when there's no such edge.
+fn anchored_candidates(
+    tree: &Tree,
+    pattern: &BasePattern,
+    assign: &[Option<WordId>],
+    var_id: usize,
+) -> Option<Vec<WordId>> {
+    pattern.incident_edges[var_id].iter().find_map(|edge| {
+        let (edge_id, other) = match *edge {
+            DirectedEdge::Out(edge_id) => (edge_id, pattern.edge_vars[edge_id].1),
+            DirectedEdge::In(edge_id) => (edge_id, pattern.edge_vars[edge_id].0),
+        };
+        let constraint = &pattern.edge_constraints[edge_id];
+        if constraint.negated || !matches!(constraint.relation, RelationType::Child) {
+            return None;
+        }
+        let bound = assign[other]?;
+        Some(match edge {
+            DirectedEdge::Out(_) => tree.head_of(bound).into_iter().collect(),
+            DirectedEdge::In(_) => tree.children_of(bound).to_vec(),
+        })
+    })
+}
+
+/// Fill `domain` with the words among `candidates` that are unassigned and
+/// pass `test`
+fn init_domain_among(
+    tree: &Tree,
+    test: &NodeTest,
+    candidates: &[WordId],
+    assigned_words: &BitFixed<u64>,
+    domain: &mut BitFixed<u64>,
+) {
+    for &word_id in candidates {
+        if !assigned_words.test(word_id) && test.matches(tree, word_id) {
+            domain.set(word_id);
+        }
+    }
+}
+
 fn has_any_match(tree: &Tree, pattern: &BasePattern, initial_bindings: &Bindings) -> bool {
     !solve_with_bindings(tree, pattern, initial_bindings, true).is_empty()
 }
 
+/// Words bound to the variables a sub-block (EXCEPT or OPTIONAL) shares with
+/// MATCH, in the block's variable order.
+///
+/// The block's solutions depend only on these, so they key its memo.
+fn shared_words(block: &BasePattern, bindings: &Bindings) -> Vec<WordId> {
+    block
+        .var_names
+        .iter()
+        .filter_map(|name| bindings.get(name).copied())
+        .collect()
+}
+
+/// Solutions of each OPTIONAL block, by block index and shared words
+type OptionalMemo = HashMap<(usize, Vec<WordId>), Vec<Bindings>>;
+
 /// Process OPTIONAL blocks: extend base bindings with cross-product of all extensions.
-/// Each OPTIONAL is evaluated independently against base_bindings.
+/// Each OPTIONAL is evaluated independently against base_bindings, and base
+/// matches that agree on a block's shared variables reuse its solutions from `memo`.
 /// Returns all combinations of optional extensions (or just base if none match).
 fn process_optionals(
     tree: &Tree,
     base_bindings: Bindings,
     optional_patterns: &[BasePattern],
+    memo: &mut OptionalMemo,
 ) -> Vec<Bindings> {
-    let extension_sets: Vec<Vec<Bindings>> = optional_patterns
+    let keys: Vec<_> = optional_patterns
         .iter()
-        .map(|optional| solve_with_bindings(tree, optional, &base_bindings, false))
+        .enumerate()
+        .map(|(optional_id, optional)| (optional_id, shared_words(optional, &base_bindings)))
         .collect();
-
-    let mut results = vec![base_bindings];
-
-    // Compute cross-product of all extensions
-
-    for extensions in extension_sets {
-        if extensions.is_empty() {
-            // No match for this OPTIONAL - keep results unchanged
-            continue;
+    for (key, optional) in keys.iter().zip(optional_patterns) {
+        if !memo.contains_key(key) {
+            let solutions = solve_with_bindings(tree, optional, &base_bindings, false);
+            memo.insert(key.clone(), solutions);
         }
-        // Replace each current result with extended versions
-        let mut new_results = Vec::new();
-        for result in &results {
-            for ext in &extensions {
-                let mut combined = result.clone();
-                // Merge in the new bindings from this OPTIONAL
-                for (k, v) in ext {
-                    if !combined.contains_key(k) {
-                        combined.insert(k.clone(), *v);
-                    }
+    }
+    // Blocks with no solutions leave the results unchanged
+    let extension_sets: Vec<&[Bindings]> = keys
+        .iter()
+        .map(|key| memo[key].as_slice())
+        .filter(|extensions| !extensions.is_empty())
+        .collect();
+    if extension_sets.is_empty() {
+        return vec![base_bindings];
+    }
+
+    // Enumerate the cross product directly, one index per block with the last
+    // block varying fastest, so each result is built once from the base
+    // bindings instead of extending a list of partial results block by block
+    let total = extension_sets
+        .iter()
+        .map(|extensions| extensions.len())
+        .product();
+    let mut results = Vec::with_capacity(total);
+    let mut choice = vec![0; extension_sets.len()];
+    loop {
+        let mut combined = base_bindings.clone();
+        for (extensions, &i) in extension_sets.iter().zip(&choice) {
+            // Merge in the new bindings from this OPTIONAL
+            for (k, v) in &extensions[i] {
+                if !combined.contains_key(k) {
+                    combined.insert(k.clone(), *v);
                 }
-                new_results.push(combined);
             }
         }
-        results = new_results;
+        results.push(combined);
+
+        // Advance to the next combination
+        let mut block = choice.len();
+        loop {
+            if block == 0 {
+                return results;
+            }
+            block -= 1;
+            choice[block] += 1;
+            if choice[block] < extension_sets[block].len() {
+                break;
+            }
+            choice[block] = 0;
+        }
     }
+}
 
-    results
+/// A block's node tests and edge labels, lowered against one tree
+struct LoweredBlock<'a> {
+    tests: Vec<NodeTest<'a>>,
+    labels: Vec<EdgeLabel>,
 }
 
+impl<'a> LoweredBlock<'a> {
+    /// Lower every variable's constraint to symbol comparisons and resolve
+    /// every edge label. Returns `None` if a literal this tree has never seen
+    /// rules a variable out, so e.g. an EXCEPT block naming an absent lemma is
+    /// settled here without looking at any word.
+    fn new(tree: &'a Tree, pattern: &'a BasePattern) -> Option<Self> {
+        let tests: Vec<NodeTest> = pattern
+            .eval_constraints
+            .iter()
+            .map(|constraint| NodeTest::lower(tree, constraint))
+            .collect();
+        if tests
+            .iter()
+            .any(|test| matches!(test, NodeTest::Const(false)))
+        {
+            return None;
+        }
+        let labels = resolve_edge_labels(tree, pattern);
+        Some(LoweredBlock { tests, labels })
+    }
+}
+
+/// Narrows the domains of a pattern once they are all known to be non-empty,
+/// just before the search. Returns false if the tree can't match at all.
+type DomainPruner<'p> = &'p mut dyn FnMut(&mut [BitFixed<u64>]) -> bool;
+
 /// Search with pre-bound variables from initial_bindings.
 /// Returns all possible bindings (including initial bindings), or just the first if first_only.
 fn solve_with_bindings(
@@ -174,72 +540,338 @@ fn solve_with_bindings(
     pattern: &BasePattern,
     initial_bindings: &Bindings,
     first_only: bool,
+) -> Vec<Bindings> {
+    let Some(block) = LoweredBlock::new(tree, pattern) else {
+        return Vec::new();
+    };
+    let pre_bound: Vec<(VarId, WordId)> = initial_bindings
+        .iter()
+        .filter_map(|(var_name, &word_id)| Some((*pattern.var_ids.get(var_name)?, word_id)))
+        .collect();
+    solve_lowered(tree, pattern, &block, &pre_bound, None, first_only)
+}
+
+/// `solve_with_bindings` for a block already lowered against `tree`, with
+/// the variables in `pre_bound` bound to their words. If given, `prune` is
+/// applied to the domains once they are built and none is empty.
+fn solve_lowered(
+    tree: &Tree,
+    pattern: &BasePattern,
+    block: &LoweredBlock,
+    pre_bound: &[(VarId, WordId)],
+    prune: Option<DomainPruner>,
+    first_only: bool,
 ) -> Vec<Bindings> {
     let num_words = tree.words.len();
     let mut assign: Vec<Option<WordId>> = vec![None; pattern.n_vars];
     let mut assigned_words: BitFixed<u64> = BitFixed::new(num_words);
+    let LoweredBlock { tests, labels } = block;
+
+    // Pre-assign and validate constraints on pre-bound variables
+    for &(var_id, word_id) in pre_bound {
+        // Check that pre-bound variable satisfies its constraints in this pattern
+        if !tests[var_id].matches(tree, word_id) {
+            return Vec::new(); // Pre-bound variable fails constraint, no solutions possible
+        }
+        assign[var_id] = Some(word_id);
+        assigned_words.set(word_id);
+    }
 
-    // Pre-assign from initial_bindings and validate constraints on pre-bound variables
-    for (var_name, &word_id) in initial_bindings {
-        if let Some(&var_id) = pattern.var_ids.get(var_name) {
-            // Check that pre-bound variable satisfies its constraints in this pattern
-            let word = &tree.words[word_id];
-            let constr = &pattern.var_constraints[var_id];
-            if !satisfies_var_constraint(tree, word, constr) {
-                return Vec::new(); // Pre-bound variable fails constraint, no solutions possible
+    // The search only checks edges as it binds their variables, so edges
+    // between two pre-bound variables are settled here
+    for (edge_id, &(from, to)) in pattern.edge_vars.iter().enumerate() {
+        if let (Some(from_word), Some(to_word)) = (assign[from], assign[to]) {
+            let edge_constraint = &pattern.edge_constraints[edge_id];
+            if !satisfies_arc_constraint(tree, from_word, to_word, edge_constraint, labels[edge_id])
+            {
+                return Vec::new();
             }
-            assign[var_id] = Some(word_id);
-            assigned_words.set(word_id);
+        }
+    }
+
+    // The usual EXCEPT/OPTIONAL block once MATCH has bound the rest: a single
+    // free variable hanging off a bound word. Its few candidates are checked
+    // directly, without domain bitsets or the general search.
+    let mut free_vars = (0..pattern.n_vars).filter(|&var_id| assign[var_id].is_none());
+    if let (Some(var_id), None, None) = (free_vars.next(), free_vars.next(), &prune) {
+        if let Some(candidates) = anchored_candidates(tree, pattern, &assign, var_id) {
+            return solve_anchored_var(
+                tree,
+                pattern,
+                labels,
+                &assign,
+                &assigned_words,
+                var_id,
+                &tests[var_id],
+                &candidates,
+                first_only,
+            );
         }
     }
 
     // Initialize domains (node consistency)
     let mut domains: Vec<BitFixed<u64>> = vec![BitFixed::new(num_words); pattern.n_vars];
-    for (var_id, constr) in pattern.var_constraints.iter().enumerate() {
+    for (var_id, constr) in pattern.eval_constraints.iter().enumerate() {
         if assign[var_id].is_some() {
             continue; // Already validated above
         }
-        for (word_id, word) in tree.words.iter().enumerate() {
-            if !assigned_words.test(word_id) && satisfies_var_constraint(tree, word, constr) {
-                domains[var_id].set(word_id);
-            }
+        match anchored_candidates(tree, pattern, &assign, var_id) {
+            Some(candidates) => init_domain_among(
+                tree,
+                &tests[var_id],
+                &candidates,
+                &assigned_words,
+                &mut domains[var_id],
+            ),
+            None => fill_domain(
+                tree,
+                constr,
+                &tests[var_id],
+                &assigned_words,
+                &mut domains[var_id],
+            ),
         }
         if domains[var_id].count_ones() == 0 {
             return Vec::new(); // no solution possible
         }
     }
+    if let Some(prune) = prune {
+        if !prune(&mut domains) || domains.iter().any(|domain| domain.count_ones() == 0) {
+            return Vec::new();
+        }
+    }
 
+    let specialized = match pattern.shape() {
+        PatternShape::SingleNode => solve_single_node(pattern, &assign, &domains, first_only),
+        PatternShape::SingleEdge => solve_single_edge(tree, pattern, &assign, &domains, first_only),
+        PatternShape::General => None,
+    };
+    if let Some(solutions) = specialized {
+        return solutions;
+    }
+
+    let mut solutions = Vec::new();
     dfs(
         tree,
         pattern,
-        &assign,
+        labels,
+        &mut assign,
         &domains,
-        &assigned_words,
+        &mut assigned_words,
         first_only,
+        &mut solutions,
+    );
+    solutions
+}
+
+/// Solve for the only unbound variable given its `anchored_candidates`: each
+/// candidate that passes its node test and its edges to the bound variables
+/// completes a solution, in the word order `dfs` would produce.
+#[allow(clippy::too_many_arguments)]
+fn solve_anchored_var(
+    tree: &Tree,
+    pattern: &BasePattern,
+    labels: &[EdgeLabel],
+    assign: &[Option<WordId>],
+    assigned_words: &BitFixed<u64>,
+    var_id: usize,
+    test: &NodeTest,
+    candidates: &[WordId],
+    first_only: bool,
+) -> Vec<Bindings> {
+    let mut solutions = Vec::new();
+    for &word_id in candidates {
+        if assigned_words.test(word_id)
+            || !test.matches(tree, word_id)
+            || !check_arc_consistency(tree, pattern, labels, assign, var_id, word_id)
+        {
+            continue;
+        }
+        let mut solution: Bindings = pattern
+            .var_names
+            .iter()
+            .zip(assign)
+            .filter_map(|(name, word)| Some((name.clone(), (*word)?)))
+            .collect();
+        solution.insert(pattern.var_names[var_id].clone(), word_id);
+        solutions.push(solution);
+        if first_only {
+            break;
+        }
+    }
+    solutions
+}
+
+/// Closed-form solve for a lone variable with no edges: its domain already
+/// holds exactly the words that satisfy it, so each one is a solution, in
+/// the word order `dfs` would produce. Returns None if the pattern has any
+/// other shape or the variable is already bound.
+fn solve_single_node(
+    pattern: &BasePattern,
+    assign: &[Option<WordId>],
+    domains: &[BitFixed<u64>],
+    first_only: bool,
+) -> Option<Vec<Bindings>> {
+    if pattern.shape() != PatternShape::SingleNode || assign[0].is_some() {
+        return None;
+    }
+    let name = &pattern.var_names[0];
+    let limit = if first_only { 1 } else { usize::MAX };
+    Some(
+        domains[0]
+            .iter()
+            .take(limit)
+            .map(|word_id| Bindings::from([(name.clone(), word_id)]))
+            .collect(),
     )
 }
 
+/// Closed-form solve for the common `A -> B` shape: two unbound variables
+/// joined by one positive child edge. Every candidate child's head is read
+/// from the head column, so this is one pass over B's domain instead of a
+/// search. A labelled edge needs no check here, since its label is already
+/// part of B's constraint and so of B's domain.
+///
+/// Solutions come out in the order `dfs` would produce them. Returns None if
+/// the pattern has any other shape.
+fn solve_single_edge(
+    tree: &Tree,
+    pattern: &BasePattern,
+    assign: &[Option<WordId>],
+    domains: &[BitFixed<u64>],
+    first_only: bool,
+) -> Option<Vec<Bindings>> {
+    if pattern.shape() != PatternShape::SingleEdge || assign.iter().any(Option::is_some) {
+        return None;
+    }
+    let (from_var, to_var) = pattern.edge_vars[0];
+
+    let mut pairs: Vec<(WordId, WordId)> = domains[to_var]
+        .iter()
+        .filter_map(|child| {
+            let head = tree.head_of(child)?;
+            (head != child && domains[from_var].test(head)).then_some((head, child))
+        })
+        .collect();
+    // dfs binds the variable with the smaller domain (the first on a tie) first
+    let from_first =
+        (domains[from_var].count_ones(), from_var) < (domains[to_var].count_ones(), to_var);
+    if from_first {
+        pairs.sort_by_key(|&(head, _)| head);
+    }
+    if first_only {
+        pairs.truncate(1);
+    }
+
+    Some(
+        pairs
+            .into_iter()
+            .map(|(head, child)| {
+                Bindings::from([
+                    (pattern.var_names[from_var].clone(), head),
+                    (pattern.var_names[to_var].clone(), child),
+                ])
+            })
+            .collect(),
+    )
+}
+
+/// MATCH variables an EXCEPT (or OPTIONAL) block shares with MATCH
+fn shared_vars(pattern: &Pattern, block: &BasePattern) -> Vec<VarId> {
+    block
+        .var_names
+        .iter()
+        .filter_map(|name| pattern.match_pattern.var_ids.get(name).copied())
+        .collect()
+}
+
+/// Settle EXCEPT blocks that share at most one variable with MATCH once
+/// MATCH's domains are built, before MATCH is solved.
+///
+/// Such a block's verdict depends on one word (or none), so it is computed
+/// for each word in the shared variable's domain, and the rejected words are
+/// removed from the domain so no base match is ever built around them. Each
+/// block is lowered once for the whole tree. Returns false if a block sharing
+/// no variables matches, which rejects the whole tree.
+fn prune_except_words(tree: &Tree, pattern: &Pattern, domains: &mut [BitFixed<u64>]) -> bool {
+    for except in &pattern.except_patterns {
+        let shared = shared_vars(pattern, except);
+        if shared.len() > 1 {
+            continue;
+        }
+        // A block with a literal the tree has never seen rejects nothing
+        let Some(block) = LoweredBlock::new(tree, except) else {
+            continue;
+        };
+        let Some(&var_id) = shared.first() else {
+            if !solve_lowered(tree, except, &block, &[], None, true).is_empty() {
+                return false;
+            }
+            continue;
+        };
+        let except_var = except.var_ids[&pattern.match_pattern.var_names[var_id]];
+        let rejected: Vec<WordId> = domains[var_id]
+            .iter()
+            .filter(|&word_id| {
+                !solve_lowered(tree, except, &block, &[(except_var, word_id)], None, true)
+                    .is_empty()
+            })
+            .collect();
+        for word_id in rejected {
+            domains[var_id].reset(word_id);
+        }
+    }
+    true
+}
+
 pub fn find_all_matches(tree: Tree, pattern: &Pattern) -> Vec<Match> {
-    find_matches_impl(tree, pattern, false)
+    find_matches_impl(Arc::new(tree), pattern, false)
 }
 
 /// Check if a tree has at least one match
 pub fn tree_matches(tree: &Tree, pattern: &Pattern) -> bool {
-    !find_matches_impl(tree.clone(), pattern, true).is_empty()
+    !find_matches_impl(Arc::new(tree.clone()), pattern, true).is_empty()
 }
 
-fn find_matches_impl(tree: Tree, pattern: &Pattern, first_only: bool) -> Vec<Match> {
-    let tree = Arc::new(tree);
-    let empty_bindings = Bindings::new();
-    let base_matches =
-        solve_with_bindings(&tree, &pattern.match_pattern, &empty_bindings, first_only);
+fn find_matches_impl(tree: Arc<Tree>, pattern: &Pattern, first_only: bool) -> Vec<Match> {
+    // An EXCEPT verdict depends only on the words bound to the variables the
+    // block shares with MATCH, so base matches that agree on those reuse it
+    let mut except_memo: HashMap<(usize, Vec<WordId>), bool> = HashMap::new();
+    let mut optional_memo = OptionalMemo::new();
+
+    // Blocks sharing at most one variable with MATCH are settled while
+    // MATCH's domains are pruned, so they never need checking per match
+    let pruned: Vec<bool> = pattern
+        .except_patterns
+        .iter()
+        .map(|except| shared_vars(pattern, except).len() <= 1)
+        .collect();
+    let base_matches = match LoweredBlock::new(&tree, &pattern.match_pattern) {
+        Some(block) => solve_lowered(
+            &tree,
+            &pattern.match_pattern,
+            &block,
+            &[],
+            Some(&mut |domains: &mut [BitFixed<u64>]| prune_except_words(&tree, pattern, domains)),
+            // Stopping at the first base match is only safe once no EXCEPT
+            // block can still reject it
+            first_only && pruned.iter().all(|&pruned| pruned),
+        ),
+        None => Vec::new(),
+    };
 
     let mut results = Vec::new();
     for base_bindings in base_matches {
         let rejected = pattern
             .except_patterns
             .iter()
-            .any(|except| has_any_match(&tree, except, &base_bindings));
+            .enumerate()
+            .filter(|&(except_id, _)| !pruned[except_id])
+            .any(|(except_id, except)| {
+                *except_memo
+                    .entry((except_id, shared_words(except, &base_bindings)))
+                    .or_insert_with(|| has_any_match(&tree, except, &base_bindings))
+            });
 
         if rejected {
             continue;
@@ -254,8 +886,12 @@ fn find_matches_impl(tree: Tree, pattern: &Pattern, first_only: bool) -> Vec<Mat
             return results;
         }
 
-        let extended_solutions =
-            process_optionals(&tree, base_bindings, &pattern.optional_patterns);
+        let extended_solutions = process_optionals(
+            &tree,
+            base_bindings,
+            &pattern.optional_patterns,
+            &mut optional_memo,
+        );
 
         for bindings in extended_solutions {
             results.push(Match {
@@ -268,95 +904,125 @@ fn find_matches_impl(tree: Tree, pattern: &Pattern, first_only: bool) -> Vec<Mat
     results
 }
 
+/// Set of variable ids, one bit per variable
+type VarSet = u64;
+
+/// Conflict set that blocks backjumping: returned once a subtree has produced
+/// a solution, and by any variable too large for a `VarSet` bit
+const ALL_VARS: VarSet = VarSet::MAX;
+
+fn var_bit(var_id: usize) -> VarSet {
+    if var_id < VarSet::BITS as usize {
+        1 << var_id
+    } else {
+        ALL_VARS
+    }
+}
+
+/// Depth-first search over the unassigned variables, appending each complete
+/// assignment to `solutions`.
+///
+/// `assign` and `assigned_words` are one scratch state shared by the whole
+/// search: each binding is made in place and undone on backtrack, so nothing
+/// is allocated per candidate.
+///
+/// Returns the conflict set of the subtree: the assigned variables whose
+/// values caused every candidate below to fail (through an edge or a word
+/// already taken), or `ALL_VARS` if a solution was found. When a child's
+/// conflict set doesn't include the variable just bound, no other value for
+/// it can help either, so its remaining candidates are skipped and the search
+/// jumps straight back to the most recent variable in the set
+/// (conflict-directed backjumping).
+#[allow(clippy::too_many_arguments)]
 fn dfs(
     tree: &Tree,
     pattern: &BasePattern,
-    assign: &[Option<WordId>],
+    labels: &[EdgeLabel],
+    assign: &mut [Option<WordId>],
     domains: &[BitFixed<u64>],
-    assigned_words: &BitFixed<u64>,
+    assigned_words: &mut BitFixed<u64>,
     first_only: bool,
-) -> Vec<Bindings> {
-    // No more variables to assign
-    if assign.iter().all(|word_id| word_id.is_some()) {
+    solutions: &mut Vec<Bindings>,
+) -> VarSet {
+    // Select an unassigned variable, preferring ones with an edge to an assigned
+    // variable (so arc checks prune their candidates right away, as in VF2++),
+    // then Minimum Remaining Values (MRV)
+    let Some(next_var) = (0..pattern.n_vars)
+        .filter(|&var_id| assign[var_id].is_none())
+        .min_by_key(|&var_id| {
+            (
+                !has_assigned_neighbor(pattern, assign, var_id),
+                domains[var_id].count_ones(),
+            )
+        })
+    else {
+        // No more variables to assign
         let mut solution = Bindings::new();
         for (var_id, word_id) in assign.iter().copied().flatten().enumerate() {
             solution.insert(pattern.var_names[var_id].clone(), word_id);
         }
-        return vec![solution];
-    }
-
-    // Select an unassigned variable with Minimum Remaining Values (MRV)
-    let next_var = (0..pattern.n_vars)
-        .filter(|&var_id| assign[var_id].is_none())
-        .min_by_key(|&var_id| domains[var_id].count_ones())
-        .unwrap();
+        solutions.push(solution);
+        return ALL_VARS;
+    };
 
-    let mut solutions: Vec<Bindings> = Vec::new();
+    let neighbors = assigned_neighbors(pattern, assign, next_var);
+    let mut conflict: VarSet = 0;
 
     // Try each candidate word for this variable (iterate over set bits in the domain bitset)
     for word_id in domains[next_var].iter() {
         // AllDifferent: Check if word_id is already assigned to another variable using bitset (O(1))
         if assigned_words.test(word_id) {
+            if let Some(owner) = assign.iter().position(|&w| w == Some(word_id)) {
+                conflict |= var_bit(owner);
+            }
             continue;
         }
 
         // Early prune: Check arc consistency with already-assigned neighbors
-        if !check_arc_consistency(tree, pattern, assign, next_var, word_id) {
+        if !check_arc_consistency(tree, pattern, labels, assign, next_var, word_id) {
+            conflict |= neighbors;
             continue;
         }
 
-        let mut new_assign = assign.to_vec();
-        //let mut new_domains = domains.to_vec();
-        let new_domains = domains;
-
-        // Assign var <- word_id and update bitset
-        new_assign[next_var] = Some(word_id);
-        let mut new_assigned_words = assigned_words.clone();
-        new_assigned_words.set(word_id);
-
-        // AllDifferent: Remove word_id from all other unassigned variable domains
-        // for domain in &mut new_domains {
-        //     domain.set(word_id, false);
-        // }
-        // if !(0..pattern.n_vars)
-        //     .all(|var_id| new_assign[var_id].is_some() || new_domains[var_id].count_ones(..) > 0)
-        // {
-        //     continue;
-        // }
-
-        // Forward-check: Propagate along edge constraints touching next_var
-        // if !forward_check(
-        //     tree,
-        //     pattern,
-        //     next_var,
-        //     word_id,
-        //     &mut new_assign,
-        //     &mut new_domains,
-        // ) {
-        //     continue;
-        // }
-
-        // Recurse - go on to next variable
-        solutions.extend(dfs(
+        // Assign var <- word_id, recurse to the next variable, then undo
+        assign[next_var] = Some(word_id);
+        assigned_words.set(word_id);
+        let below = dfs(
             tree,
             pattern,
-            &new_assign,
-            new_domains,
-            &new_assigned_words,
+            labels,
+            assign,
+            domains,
+            assigned_words,
             first_only,
-        ));
+            solutions,
+        );
+        assign[next_var] = None;
+        assigned_words.reset(word_id);
 
         if first_only && !solutions.is_empty() {
-            return solutions;
+            return ALL_VARS;
         }
+        if below & var_bit(next_var) == 0 {
+            // The failure below doesn't depend on next_var: backjump
+            return below;
+        }
+        conflict |= below;
+    }
+    // A variable without a VarSet bit can't be masked out of the conflict
+    // set, so it blocks backjumping instead
+    if conflict == ALL_VARS || var_bit(next_var) == ALL_VARS {
+        ALL_VARS
+    } else {
+        conflict & !var_bit(next_var)
     }
-    solutions
 }
 
 #[allow(dead_code)]
 fn forward_check(
     tree: &Tree,
     pattern: &BasePattern,
+    labels: &[EdgeLabel],
     next_var: usize,
     word_id: WordId,
     new_assign: &mut [Option<WordId>],
@@ -365,13 +1031,13 @@ fn forward_check(
     // Propagate along edge constraints incident to next_var
     for &edge_idx in &pattern.out_edges[next_var] {
         let edge_constraint = &pattern.edge_constraints[edge_idx];
-        let target_var_id = pattern.var_ids[&edge_constraint.to];
+        let target_var_id = pattern.edge_vars[edge_idx].1;
         if new_assign[target_var_id].is_some() {
             continue;
         }
         // Remove words from domain that don't satisfy the arc constraint
         for w in new_domains[target_var_id].iter().collect::<Vec<_>>() {
-            if !satisfies_arc_constraint(tree, word_id, w, edge_constraint) {
+            if !satisfies_arc_constraint(tree, word_id, w, edge_constraint, labels[edge_idx]) {
                 new_domains[target_var_id].reset(w);
             }
         }
@@ -382,12 +1048,12 @@ fn forward_check(
 
     for &edge_idx in &pattern.in_edges[next_var] {
         let edge_constraint = &pattern.edge_constraints[edge_idx];
-        let source_var_id = pattern.var_ids[&edge_constraint.from];
+        let source_var_id = pattern.edge_vars[edge_idx].0;
         if new_assign[source_var_id].is_some() {
             continue;
         }
         for w in new_domains[source_var_id].iter().collect::<Vec<_>>() {
-            if !satisfies_arc_constraint(tree, w, word_id, edge_constraint) {
+            if !satisfies_arc_constraint(tree, w, word_id, edge_constraint, labels[edge_idx]) {
                 new_domains[source_var_id].reset(w);
             }
         }
@@ -398,33 +1064,68 @@ fn forward_check(
     true
 }
 
+/// Assigned variables that share an edge with `var_id`
+fn assigned_neighbors(pattern: &BasePattern, assign: &[Option<WordId>], var_id: usize) -> VarSet {
+    pattern.incident_edges[var_id]
+        .iter()
+        .map(|edge| {
+            let (from, to) = match *edge {
+                DirectedEdge::Out(edge_id) | DirectedEdge::In(edge_id) => {
+                    pattern.edge_vars[edge_id]
+                }
+            };
+            let other = if from == var_id { to } else { from };
+            if assign[other].is_some() {
+                var_bit(other)
+            } else {
+                0
+            }
+        })
+        .fold(0, |set, bit| set | bit)
+}
+
+/// Whether `var_id` shares an edge with a variable that is already assigned
+fn has_assigned_neighbor(pattern: &BasePattern, assign: &[Option<WordId>], var_id: usize) -> bool {
+    pattern.incident_edges[var_id].iter().any(|edge| {
+        let (from, to) = match *edge {
+            DirectedEdge::Out(edge_id) | DirectedEdge::In(edge_id) => pattern.edge_vars[edge_id],
+        };
+        assign[from].is_some() || assign[to].is_some()
+    })
+}
+
 fn check_arc_consistency(
     tree: &Tree,
     pattern: &BasePattern,
+    labels: &[EdgeLabel],
     assign: &[Option<WordId>],
     next_var: usize,
     word_id: WordId,
 ) -> bool {
     // Check arc consistency with already-assigned neighbors (early prune)
-    for &edge_id in &pattern.out_edges[next_var] {
-        let edge_constraint = &pattern.edge_constraints[edge_id];
-        let target_var_id = pattern.var_ids[&edge_constraint.to];
-        if assign[target_var_id].is_some_and(|target_word_id| {
-            !satisfies_arc_constraint(tree, word_id, target_word_id, edge_constraint)
-        }) {
-            return false;
-        }
-    }
-    for &edge_id in &pattern.in_edges[next_var] {
-        let edge_constraint = &pattern.edge_constraints[edge_id];
-        let source_var_id = pattern.var_ids[&edge_constraint.from];
-        if assign[source_var_id].is_some_and(|source_word_id| {
-            !satisfies_arc_constraint(tree, source_word_id, word_id, edge_constraint)
-        }) {
-            return false;
-        }
-    }
-    true
+    pattern.incident_edges[next_var].iter().all(|edge| {
+        let (edge_id, from, to) = match *edge {
+            DirectedEdge::Out(edge_id) => {
+                let Some(target_word_id) = assign[pattern.edge_vars[edge_id].1] else {
+                    return true;
+                };
+                (edge_id, word_id, target_word_id)
+            }
+            DirectedEdge::In(edge_id) => {
+                let Some(source_word_id) = assign[pattern.edge_vars[edge_id].0] else {
+                    return true;
+                };
+                (edge_id, source_word_id, word_id)
+            }
+        };
+        satisfies_arc_constraint(
+            tree,
+            from,
+            to,
+            &pattern.edge_constraints[edge_id],
+            labels[edge_id],
+        )
+    })
 }
 
 /// Search a tree with a pre-compiled pattern
@@ -432,6 +1133,12 @@ pub fn search_tree(tree: Tree, pattern: &Pattern) -> Vec<Match> {
     find_all_matches(tree, pattern)
 }
 
+/// Search a shared tree with a pre-compiled pattern, so several patterns can
+/// be matched against one parsed tree
+pub fn search_shared_tree(tree: &Arc<Tree>, pattern: &Pattern) -> Vec<Match> {
+    find_matches_impl(Arc::clone(tree), pattern, false)
+}
+
 /// Search a tree with a query string
 pub fn search_tree_query(tree: Tree, query: &str) -> Result<Vec<Match>, QueryError> {
     let pattern = compile_query(query)?;
@@ -441,6 +1148,7 @@ pub fn search_tree_query(tree: Tree, query: &str) -> Result<Vec<Match>, QueryErr
 #[cfg(test)]
 mod tests {
     use super::*;
+    use crate::bytes::BytestringPool;
 
     macro_rules! hashmap {
         ( $( $key:expr => $val:expr ),* $(,)? ) => {{
@@ -485,6 +1193,208 @@ mod tests {
         tree
     }
 
+    #[test]
+    fn test_for_each_position() {
+        let mut pool = BytestringPool::new();
+        let verb = pool.get_or_intern(b"VERB");
+        let noun = pool.get_or_intern(b"NOUN");
+        // Long enough to cover full blocks and a remainder
+        let column: Vec<Sym> = (0..75)
+            .map(|i| if i % 7 == 0 { verb } else { noun })
+            .collect();
+
+        let mut found = Vec::new();
+        for_each_position(&column, verb, |i| found.push(i));
+        let expected: Vec<usize> = (0..75).filter(|i| i % 7 == 0).collect();
+        assert_eq!(found, expected);
+    }
+
+    #[test]
+    fn test_node_test_agrees_with_constraint() {
+        for tree in [
+            build_test_tree(),
+            build_coord_tree(),
+            build_multi_verb_tree(),
+        ] {
+            for query in [
+                "MATCH { A [upos=\"VERB\" & lemma=\"help\"]; }",
+                "MATCH { A [upos!=\"NOUN\"]; }",
+                "MATCH { A [lemma=\"unseen\"]; }",
+                "MATCH { A [form=/.*s/ & upos=\"VERB\"]; }",
+                "MATCH { _ -[obj]-> A; }",
+                "MATCH { _ !-> A; }",
+                "MATCH { A -[nsubj]-> _; }",
+                "MATCH { A -[unseen]-> _; }",
+                "MATCH { A -> _; }",
+                "MATCH { A [feats.Tense=\"Past\"]; }",
+                "MATCH { A [feats.Tense!=\"Past\" & misc.SpaceAfter=\"No\"]; }",
+                "MATCH { A [feats.Unseen=\"Past\"]; }",
+            ] {
+                let pattern = compile_query(query).unwrap().match_pattern;
+                let constraint = &pattern.eval_constraints[0];
+                let test = NodeTest::lower(&tree, constraint);
+                for word in &tree.words {
+                    assert_eq!(
+                        test.matches(&tree, word.id),
+                        satisfies_var_constraint(&tree, word, constraint),
+                        "{query} on word {}",
+                        word.id
+                    );
+                }
+            }
+        }
+    }
+
+    #[test]
+    fn test_column_literal() {
+        let tree = build_test_tree();
+        let columns = tree.tag_columns();
+        let obj = Constraint::IsChild(Some("obj".to_string()));
+        let (column, literal) = column_literal(&tree, &obj).unwrap();
+        assert_eq!(column, &columns.deprel[..]);
+        assert_eq!(literal, "obj");
+        assert!(column_literal(&tree, &Constraint::IsChild(None)).is_none());
+
+        // A conjunction scans its most selective literal column
+        let pattern = compile_query("MATCH { A [upos=\"VERB\" & lemma=\"help\"]; }").unwrap();
+        let (column, literal) =
+            column_literal(&tree, &pattern.match_pattern.eval_constraints[0]).unwrap();
+        assert_eq!(column, &columns.lemma[..]);
+        assert_eq!(literal, "help");
+
+        // The root's deprel passes the column scan but it has no head
+        let root = Constraint::IsChild(Some("root".to_string()));
+        let mut domain = BitFixed::new(tree.words.len());
+        init_domain(&tree, &root, &BitFixed::new(tree.words.len()), &mut domain);
+        assert_eq!(domain.count_ones(), 0);
+    }
+
+    #[test]
+    fn test_solve_single_edge_matches_dfs() {
+        for tree in [
+            build_test_tree(),
+            build_coord_tree(),
+            build_multi_verb_tree(),
+        ] {
+            for query in [
+                "MATCH { A []; B []; A -> B; }",
+                "MATCH { A []; B []; B -> A; }",
+                "MATCH { A [upos=\"VERB\"]; B []; A -[xcomp]-> B; }",
+                "MATCH { A []; B [upos=\"NOUN\"]; A -[conj]-> B; }",
+            ] {
+                let pattern = compile_query(query).unwrap().match_pattern;
+                let n = tree.words.len();
+                let assign = vec![None; pattern.n_vars];
+                let assigned_words = BitFixed::new(n);
+                let mut domains = vec![BitFixed::new(n); pattern.n_vars];
+                for (var_id, constr) in pattern.eval_constraints.iter().enumerate() {
+                    init_domain(&tree, constr, &assigned_words, &mut domains[var_id]);
+                }
+                let labels = resolve_edge_labels(&tree, &pattern);
+                let mut expected = Vec::new();
+                dfs(
+                    &tree,
+                    &pattern,
+                    &labels,
+                    &mut assign.clone(),
+                    &domains,
+                    &mut assigned_words.clone(),
+                    false,
+                    &mut expected,
+                );
+                let fast = solve_single_edge(&tree, &pattern, &assign, &domains, false);
+                assert_eq!(fast, Some(expected), "{query}");
+            }
+        }
+
+        // Other shapes take the general search
+        let pattern = compile_query("MATCH { A []; B []; A !-> B; }")
+            .unwrap()
+            .match_pattern;
+        let tree = build_test_tree();
+        let domains = vec![BitFixed::new(tree.words.len()); 2];
+        assert!(solve_single_edge(&tree, &pattern, &[None, None], &domains, false).is_none());
+    }
+
+    #[test]
+    fn test_solve_single_node_matches_dfs() {
+        for tree in [build_test_tree(), build_multi_verb_tree()] {
+            for query in [
+                "MATCH { A []; }",
+                "MATCH { A [upos=\"VERB\"]; }",
+                "MATCH { A [lemma=/h.*/ & upos!=\"NOUN\"]; }",
+            ] {
+                let pattern = compile_query(query).unwrap().match_pattern;
+                let n = tree.words.len();
+                let mut domains = vec![BitFixed::new(n)];
+                init_domain(
+                    &tree,
+                    &pattern.eval_constraints[0],
+                    &BitFixed::new(n),
+                    &mut domains[0],
+                );
+                let mut expected = Vec::new();
+                dfs(
+                    &tree,
+                    &pattern,
+                    &[],
+                    &mut vec![None],
+                    &domains,
+                    &mut BitFixed::new(n),
+                    false,
+                    &mut expected,
+                );
+                let fast = solve_single_node(&pattern, &[None], &domains, false);
+                assert_eq!(fast, Some(expected.clone()), "{query}");
+                let first = solve_single_node(&pattern, &[None], &domains, true);
+                assert_eq!(
+                    first.unwrap(),
+                    expected.into_iter().take(1).collect::<Vec<_>>()
+                );
+            }
+        }
+
+        // A bound variable is left to the general search
+        let pattern = compile_query("MATCH { A []; }").unwrap().match_pattern;
+        let domains = vec![BitFixed::new(3)];
+        assert!(solve_single_node(&pattern, &[Some(0)], &domains, false).is_none());
+    }
+
+    #[test]
+    fn test_has_assigned_neighbor() {
+        let pattern = compile_query("MATCH { A []; B []; C []; A -> B; }").unwrap();
+        let pattern = &pattern.match_pattern;
+        let (a, b, c) = (
+            pattern.var_ids["A"],
+            pattern.var_ids["B"],
+            pattern.var_ids["C"],
+        );
+        let mut assign = vec![None; pattern.n_vars];
+        assert!(!has_assigned_neighbor(pattern, &assign, b));
+        assign[a] = Some(0);
+        assert!(has_assigned_neighbor(pattern, &assign, b));
+        assert!(!has_assigned_neighbor(pattern, &assign, c));
+    }
+
+    #[test]
+    fn test_resolve_edge_labels() {
+        let tree = build_test_tree();
+        let pattern =
+            compile_query("MATCH { V []; W []; X []; V -[obj]-> W; V -> X; V -[nmod]-> X; }")
+                .unwrap();
+        let labels = resolve_edge_labels(&tree, &pattern.match_pattern);
+        let obj = tree.string_pool.get(b"obj").unwrap();
+        assert_eq!(
+            labels,
+            vec![EdgeLabel::Sym(obj), EdgeLabel::Any, EdgeLabel::Absent]
+        );
+
+        // A negated edge whose label never occurs in the tree always holds
+        let matches =
+            search_tree_query(tree, "MATCH { V [lemma=\"help\"]; V !-[nmod]-> _; }").unwrap();
+        assert_eq!(matches.len(), 1);
+    }
+
     #[test]
     fn test_search_single_var_constraints() {
         let tree = build_test_tree();
@@ -1223,6 +2133,156 @@ mod tests {
         assert_eq!(matches.len(), 0);
     }
 
+    #[test]
+    fn test_except_shared_across_base_matches() {
+        // Both matches binding V to "saw" share one EXCEPT verdict
+        let tree = build_multi_verb_tree();
+        let matches = search_tree_query(
+            tree,
+            r#"MATCH { V [upos="VERB"]; D []; V -> D; }
+               EXCEPT { N []; V -[nsubj]-> N; }"#,
+        )
+        .unwrap();
+        assert_eq!(matches.len(), 1);
+        assert_eq!(matches[0].bindings, hashmap! { "V" => 2, "D" => 3 });
+    }
+
+    #[test]
+    fn test_optional_shared_across_base_matches() {
+        // Both matches binding V to "saw" reuse one solve of the OPTIONAL block
+        let tree = build_multi_verb_tree();
+        let matches = search_tree_query(
+            tree,
+            r#"MATCH { V [lemma="see"]; D []; V -> D; }
+               OPTIONAL { S []; V -[nsubj]-> S; }"#,
+        )
+        .unwrap();
+        let bindings: Vec<_> = matches.into_iter().map(|m| m.bindings).collect();
+        assert_eq!(
+            bindings,
+            vec![
+                hashmap! { "V" => 0, "D" => 1, "S" => 1 },
+                hashmap! { "V" => 0, "D" => 2, "S" => 1 },
+            ]
+        );
+    }
+
+    #[test]
+    fn test_backjumping_keeps_all_matches() {
+        let tree = build_multi_verb_tree();
+        // X is bound before V and A, so "saw" failing to have an advmod child
+        // jumps back over A without retrying it for every X
+        let matches = search_tree_query(
+            tree.clone(),
+            r#"MATCH { X [upos="PROPN"]; V [upos="VERB"]; A []; V -[advmod]-> A; }"#,
+        )
+        .unwrap();
+        assert_eq!(matches.len(), 1);
+        assert_eq!(
+            matches[0].bindings,
+            hashmap! { "X" => 1, "V" => 2, "A" => 3 }
+        );
+
+        let none = search_tree_query(
+            tree,
+            r#"MATCH { X []; V [upos="VERB"]; A [upos="ADV"]; V -[obj]-> A; }"#,
+        )
+        .unwrap();
+        assert!(none.is_empty());
+    }
+
+    #[test]
+    fn test_backjumping_past_64_variables() {
+        // P (variable 63) can take "w1" or "w2", and B (variable 64) needs "w1".
+        // P is bound first, to "w1", so B fails only because of P; a variable
+        // beyond the VarSet bits must not turn that into an empty conflict set,
+        // which would jump back over P without trying "w2".
+        let mut tree = Tree::default();
+        tree.add_minimal_word(0, b"f0", b"_", b"_", b"_", None, b"root");
+        tree.add_minimal_word(1, b"w1", b"_", b"X", b"_", Some(0), b"dep");
+        tree.add_minimal_word(2, b"w2", b"_", b"X", b"_", Some(0), b"dep");
+        for i in 1..63 {
+            let form = format!("f{i}");
+            tree.add_minimal_word(i + 2, form.as_bytes(), b"_", b"_", b"_", Some(0), b"dep");
+        }
+        tree.compile_tree();
+
+        // Built directly, since a compiled query numbers its variables in hash order
+        let literal = |value: &str| ConstraintValue::Literal(value.to_string());
+        let mut pattern = BasePattern::new();
+        for i in 0..63 {
+            pattern.add_var(
+                &format!("F{i}"),
+                Constraint::Form(literal(&format!("f{i}"))),
+            );
+        }
+        pattern.add_var("P", Constraint::UPOS(literal("X")));
+        pattern.add_var("B", Constraint::Form(literal("w1")));
+        pattern.add_edge_constraint(EdgeConstraint {
+            from: "F0".to_string(),
+            to: "P".to_string(),
+            relation: RelationType::Child,
+            label: None,
+            negated: false,
+        });
+        pattern.n_vars = pattern.var_constraints.len();
+        assert_eq!(pattern.var_ids["B"], 64);
+        let matches = solve_with_bindings(&tree, &pattern, &Bindings::new(), false);
+        assert_eq!(matches.len(), 1);
+        assert_eq!(matches[0]["P"], 2);
+    }
+
+    #[test]
+    fn test_solve_with_bindings_checks_symbols() {
+        let tree = build_multi_verb_tree();
+        let block = |query: &str| compile_query(query).unwrap().match_pattern;
+        let saw = Bindings::from([("V".to_string(), 0)]);
+
+        let nsubj = block(r#"MATCH { V [upos="VERB"]; N [upos="PROPN"]; V -[nsubj]-> N; }"#);
+        assert_eq!(solve_with_bindings(&tree, &nsubj, &saw, false).len(), 1);
+        // The pre-bound word fails its own constraint
+        let aux = block(r#"MATCH { V [upos="AUX"]; N []; V -> N; }"#);
+        assert!(solve_with_bindings(&tree, &aux, &saw, false).is_empty());
+        // A lemma the tree has never seen settles the block up front
+        let unseen = block(r#"MATCH { V []; N [lemma="zebra"]; V -> N; }"#);
+        assert!(solve_with_bindings(&tree, &unseen, &saw, false).is_empty());
+    }
+
+    #[test]
+    fn test_anchored_candidates() {
+        let tree = build_multi_verb_tree();
+        let pattern = compile_query("MATCH { V []; M []; V -[advmod]-> M; }")
+            .unwrap()
+            .match_pattern;
+        let (v, m) = (pattern.var_ids["V"], pattern.var_ids["M"]);
+        let mut assign = vec![None; 2];
+        assert_eq!(anchored_candidates(&tree, &pattern, &assign, m), None);
+
+        assign[v] = Some(0);
+        assert_eq!(
+            anchored_candidates(&tree, &pattern, &assign, m),
+            Some(vec![1, 2])
+        );
+        assign[v] = None;
+        assign[m] = Some(3);
+        assert_eq!(
+            anchored_candidates(&tree, &pattern, &assign, v),
+            Some(vec![2])
+        );
+        assign[m] = Some(0);
+        assert_eq!(
+            anchored_candidates(&tree, &pattern, &assign, v),
+            Some(vec![])
+        );
+
+        // A negated edge doesn't restrict anything
+        let pattern = compile_query("MATCH { V []; M []; V !-> M; }")
+            .unwrap()
+            .match_pattern;
+        let assign = vec![Some(0), None];
+        assert_eq!(anchored_candidates(&tree, &pattern, &assign, 1), None);
+    }
+
     #[test]
     fn test_except_complex_pattern() {
         // Tree: saw -> John (nsubj), running (xcomp) -> quickly (advmod)
@@ -1325,6 +2385,34 @@ mod tests {
         );
     }
 
+    #[test]
+    fn test_optional_cross_product_order() {
+        let mut tree = Tree::default();
+        tree.add_minimal_word(0, b"gave", b"give", b"VERB", b"_", None, b"root");
+        tree.add_minimal_word(1, b"her", b"she", b"PRON", b"_", Some(0), b"iobj");
+        tree.add_minimal_word(2, b"it", b"it", b"PRON", b"_", Some(0), b"obj");
+        tree.add_minimal_word(3, b"then", b"then", b"ADV", b"_", Some(0), b"advmod");
+        tree.add_minimal_word(4, b"gladly", b"gladly", b"ADV", b"_", Some(0), b"advmod");
+        tree.add_minimal_word(5, b"there", b"there", b"ADV", b"_", Some(0), b"advmod");
+        tree.compile_tree();
+
+        // 2 x 3 combinations, the last OPTIONAL varying fastest
+        let matches = search_tree_query(
+            tree,
+            r#"MATCH { V [upos="VERB"]; }
+               OPTIONAL { P [upos="PRON"]; V -> P; }
+               OPTIONAL { N [upos="NOUN"]; V -> N; }
+               OPTIONAL { A [upos="ADV"]; V -> A; }"#,
+        )
+        .unwrap();
+        let pairs: Vec<_> = matches
+            .iter()
+            .map(|m| (m.bindings["P"], m.bindings["A"]))
+            .collect();
+        assert_eq!(pairs, vec![(1, 3), (1, 4), (1, 5), (2, 3), (2, 4), (2, 5)]);
+        assert!(matches.iter().all(|m| !m.bindings.contains_key("N")));
+    }
+
     #[test]
     fn test_optional_one_matches_one_doesnt() {
         // Test where one OPTIONAL matches and another doesn't
@@ -1377,6 +2465,104 @@ mod tests {
         );
     }
 
+    #[test]
+    fn test_except_checks_edges_between_match_variables() {
+        // "he" is the subject of "running", not of "saw"
+        let mut tree = Tree::default();
+        tree.add_minimal_word(0, b"saw", b"see", b"VERB", b"_", None, b"root");
+        tree.add_minimal_word(1, b"John", b"John", b"PROPN", b"_", Some(0), b"nsubj");
+        tree.add_minimal_word(2, b"running", b"run", b"VERB", b"_", Some(0), b"xcomp");
+        tree.add_minimal_word(3, b"he", b"he", b"PRON", b"_", Some(2), b"nsubj");
+        tree.compile_tree();
+        let matches = search_tree_query(
+            tree,
+            r#"MATCH { V [upos="VERB"]; D [upos="PRON"]; }
+               EXCEPT { V -[nsubj]-> D; X []; }"#,
+        )
+        .unwrap();
+        assert_eq!(matches.len(), 1);
+        assert_eq!(matches[0].bindings, hashmap! { "V" => 0, "D" => 3 });
+    }
+
+    #[test]
+    fn test_except_pruned_before_match() {
+        let tree = build_multi_verb_tree();
+        // Only "running" has an advmod, so it is dropped from V's candidates
+        let pattern = compile_query(
+            r#"MATCH { V [upos="VERB"]; D []; V -> D; }
+               EXCEPT { M []; V -[advmod]-> M; }"#,
+        )
+        .unwrap();
+        let mut domains = match_domains(&tree, &pattern);
+        assert!(prune_except_words(&tree, &pattern, &mut domains));
+        let v = pattern.match_pattern.var_ids["V"];
+        assert_eq!(domains[v].iter().collect::<Vec<_>>(), vec![0]);
+        let matches = find_all_matches(tree.clone(), &pattern);
+        let dependents: Vec<_> = matches.iter().map(|m| m.bindings["D"]).collect();
+        assert_eq!(dependents, vec![1, 2]);
+
+        // A block sharing no variables rejects the whole tree when it matches
+        let pattern =
+            compile_query(r#"MATCH { V [upos="VERB"]; } EXCEPT { A [upos="ADV"]; }"#).unwrap();
+        let mut domains = match_domains(&tree, &pattern);
+        assert!(!prune_except_words(&tree, &pattern, &mut domains));
+        assert!(find_all_matches(tree, &pattern).is_empty());
+    }
+
+    #[test]
+    fn test_prune_waits_for_nonempty_domains() {
+        let tree = build_multi_verb_tree();
+        let mut pruned = 0;
+        let mut prune = |_: &mut [BitFixed<u64>]| {
+            pruned += 1;
+            true
+        };
+        // No word is both, so D's domain is empty and the search stops
+        // before pruning anything
+        let pattern =
+            compile_query(r#"MATCH { V [upos="VERB"]; D [upos="PROPN" & lemma="run"]; V -> D; }"#)
+                .unwrap()
+                .match_pattern;
+        let block = LoweredBlock::new(&tree, &pattern).unwrap();
+        assert!(solve_lowered(&tree, &pattern, &block, &[], Some(&mut prune), false).is_empty());
+        let pattern = compile_query(r#"MATCH { V [upos="VERB"]; D [upos="ADV"]; V -> D; }"#)
+            .unwrap()
+            .match_pattern;
+        let block = LoweredBlock::new(&tree, &pattern).unwrap();
+        assert_eq!(
+            solve_lowered(&tree, &pattern, &block, &[], Some(&mut prune), false).len(),
+            1
+        );
+        assert_eq!(pruned, 1);
+    }
+
+    /// Unpruned domains of the MATCH variables of `pattern`
+    fn match_domains(tree: &Tree, pattern: &Pattern) -> Vec<BitFixed<u64>> {
+        let num_words = tree.words.len();
+        pattern
+            .match_pattern
+            .eval_constraints
+            .iter()
+            .map(|constraint| {
+                let mut domain = BitFixed::new(num_words);
+                init_domain(tree, constraint, &BitFixed::new(num_words), &mut domain);
+                domain
+            })
+            .collect()
+    }
+
+    #[test]
+    fn test_tree_matches_looks_past_rejected_first_match() {
+        // The first base match (saw, John) is rejected, but (saw, running) isn't
+        let tree = build_multi_verb_tree();
+        let pattern = compile_query(
+            r#"MATCH { V [upos="VERB"]; D []; V -> D; }
+               EXCEPT { V -[nsubj]-> D; X [upos="ADV"]; }"#,
+        )
+        .unwrap();
+        assert!(tree_matches(&tree, &pattern));
+    }
+
     #[test]
     fn test_except_with_anonymous_edge() {
         // Tree: helped -> us (obj), win (xcomp)
@@ -35,7 +35,6 @@ pub struct Word {
     pub head: Option<WordId>,
     pub deprel: Sym,
     pub misc: Features,
-    pub children: Vec<WordId>,
 }
 
 impl Word {
@@ -59,7 +58,6 @@ impl Word {
             head,
             deprel,
             misc: Features::new(),
-            children: Vec::new(),
         }
     }
 
@@ -87,25 +85,93 @@ impl Word {
             head,
             deprel,
             misc,
-            children: Vec::new(),
         }
     }
 
     pub fn children_by_deprel<'a>(&self, tree: &'a Tree, deprel: &str) -> Vec<&'a Word> {
-        self.children
-            .iter()
-            .map(|&id| &tree.words[id])
-            .filter(|child| *tree.string_pool.resolve(child.deprel) == *deprel.as_bytes())
+        // Resolve the label once; a label the pool has never seen can't match
+        let Some(deprel) = tree.string_pool.get(deprel.as_bytes()) else {
+            return Vec::new();
+        };
+        self.children_by_deprel_sym(tree, deprel)
+    }
+
+    pub fn children_by_deprel_sym<'a>(&self, tree: &'a Tree, deprel: Sym) -> Vec<&'a Word> {
+        tree.children_with_deprel(self.id, deprel)
+            .map(|id| &tree.words[id])
             .collect()
     }
 
+    /// Whether any child has `deprel` (and `xpos`, if given), without collecting them
+    pub fn has_child(&self, tree: &Tree, deprel: &str, xpos: Option<&str>) -> bool {
+        // Resolve the labels once, then compare symbols; unseen labels can't match
+        let Some(deprel) = tree.string_pool.get(deprel.as_bytes()) else {
+            return false;
+        };
+        let xpos = match xpos {
+            Some(xpos) => match tree.string_pool.get(xpos.as_bytes()) {
+                Some(sym) => Some(sym),
+                None => return false,
+            },
+            None => None,
+        };
+        // Deprels come from the packed column; a child's Word is only read
+        // when its xpos has to be checked too
+        tree.children_with_deprel(self.id, deprel)
+            .any(|child_id| xpos.is_none_or(|xpos| tree.words[child_id].xpos == xpos))
+    }
+
     pub fn parent<'a>(&self, tree: &'a Tree) -> Option<&'a Word> {
         let id = self.head?;
         Some(&tree.words[id])
     }
 
     pub fn children<'a>(&self, tree: &'a Tree) -> Vec<&'a Word> {
-        self.children.iter().map(|&id| &tree.words[id]).collect()
+        tree.children_of(self.id)
+            .iter()
+            .map(|&id| &tree.words[id])
+            .collect()
+    }
+}
+
+/// Entry in `TagColumns::head` for a word without a head
+pub const NO_HEAD: u32 = u32::MAX;
+
+/// Tag fields and heads stored column-wise, one entry per word in `Tree::words`,
+/// built from the words by `Tree::compile_tree`
+///
+/// Node-constraint scans and arc checks read these densely packed values
+/// instead of striding through whole `Word` structs. Heads are `u32` word
+/// ids with `NO_HEAD` for the root, a quarter of the size of an
+/// `Option<WordId>`, so a head walk touches far fewer cache lines.
+#[derive(Debug, Clone, Default)]
+pub struct TagColumns {
+    pub form: Vec<Sym>,
+    pub lemma: Vec<Sym>,
+    pub upos: Vec<Sym>,
+    pub xpos: Vec<Sym>,
+    pub deprel: Vec<Sym>,
+    pub head: Vec<u32>,
+}
+
+impl TagColumns {
+    fn from_words(words: &[Word]) -> Self {
+        let column = |field: fn(&Word) -> Sym| words.iter().map(field).collect();
+        Self {
+            form: column(|word| word.form),
+            lemma: column(|word| word.lemma),
+            upos: column(|word| word.upos),
+            xpos: column(|word| word.xpos),
+            deprel: column(|word| word.deprel),
+            head: words
+                .iter()
+                .map(|word| {
+                    word.head.map_or(NO_HEAD, |head| {
+                        u32::try_from(head).expect("head id fits in the u32 head column")
+                    })
+                })
+                .collect(),
+        }
     }
 }
 
@@ -113,6 +179,12 @@ impl Word {
 #[derive(Debug, Clone)]
 pub struct Tree {
     pub words: Vec<Word>,
+    /// Column-wise copy of the tag fields, rebuilt from `words` by `compile_tree`
+    columns: TagColumns,
+    /// Children of word `i` are `child_ids[child_offsets[i]..child_offsets[i + 1]]`,
+    /// in word order (compressed sparse rows, filled in by `compile_tree`)
+    pub child_offsets: Vec<usize>,
+    pub child_ids: Vec<WordId>,
     pub root_id: Option<WordId>,
     pub sentence_text: Option<String>,
     pub metadata: HashMap<String, String>,
@@ -123,6 +195,9 @@ impl Tree {
     pub fn new(string_pool: &BytestringPool) -> Self {
         Self {
             words: Vec::with_capacity(25),
+            columns: TagColumns::default(),
+            child_offsets: Vec::new(),
+            child_ids: Vec::new(),
             root_id: None,
             sentence_text: None,
             metadata: HashMap::new(),
@@ -137,6 +212,9 @@ impl Tree {
     ) -> Self {
         Self {
             words: Vec::with_capacity(50),
+            columns: TagColumns::default(),
+            child_offsets: Vec::new(),
+            child_ids: Vec::new(),
             root_id: None,
             sentence_text,
             metadata,
@@ -154,11 +232,9 @@ impl Tree {
         head: Option<WordId>,
         deprel: &[u8],
     ) {
-        let form_sym = self.string_pool.get_or_intern(form);
-        let lemma_sym = self.string_pool.get_or_intern(lemma);
-        let upos_sym = self.string_pool.get_or_intern(upos);
-        let xpos_sym = self.string_pool.get_or_intern(xpos);
-        let deprel_sym = self.string_pool.get_or_intern(deprel);
+        let [form_sym, lemma_sym, upos_sym, xpos_sym, deprel_sym] = self
+            .string_pool
+            .get_or_intern_all([form, lemma, upos, xpos, deprel]);
         let word = Word::new_minimal(
             id, form_sym, lemma_sym, upos_sym, xpos_sym, head, deprel_sym,
         );
@@ -179,11 +255,9 @@ impl Tree {
         deprel: &[u8],
         misc: Features,
     ) {
-        let form_sym = self.string_pool.get_or_intern(form);
-        let lemma_sym = self.string_pool.get_or_intern(lemma);
-        let upos_sym = self.string_pool.get_or_intern(upos);
-        let xpos_sym = self.string_pool.get_or_intern(xpos);
-        let deprel_sym = self.string_pool.get_or_intern(deprel);
+        let [form_sym, lemma_sym, upos_sym, xpos_sym, deprel_sym] = self
+            .string_pool
+            .get_or_intern_all([form, lemma, upos, xpos, deprel]);
 
         let word = Word::new(
             word_id, token_id, form_sym, lemma_sym, upos_sym, xpos_sym, feats, head, deprel_sym,
@@ -192,15 +266,62 @@ impl Tree {
         self.words.push(word);
     }
 
-    /// Fill in children
+    /// Build the tag columns from `words`, and fill in children: count each
+    /// word's children, turn the counts into offsets, then place every word
+    /// after its head's earlier children.
+    ///
+    /// Must be called again after `words` is changed directly.
     pub fn compile_tree(&mut self) {
-        for word_id in 0..self.words.len() {
-            if let Some(head) = self.words[word_id].head {
-                self.words[head].children.push(word_id);
+        self.columns = TagColumns::from_words(&self.words);
+        let n = self.words.len();
+        let mut offsets = vec![0; n + 1];
+        for word in &self.words {
+            if let Some(head) = word.head {
+                offsets[head + 1] += 1;
+            }
+        }
+        for i in 0..n {
+            offsets[i + 1] += offsets[i];
+        }
+
+        let mut next = offsets.clone();
+        let mut child_ids = vec![0; offsets[n]];
+        for (word_id, word) in self.words.iter().enumerate() {
+            if let Some(head) = word.head {
+                child_ids[next[head]] = word_id;
+                next[head] += 1;
             } else {
                 self.root_id = Some(word_id);
             }
         }
+        self.child_offsets = offsets;
+        self.child_ids = child_ids;
+    }
+
+    /// Ids of the children of `word_id`, in word order (empty before `compile_tree`)
+    pub fn children_of(&self, word_id: WordId) -> &[WordId] {
+        match (
+            self.child_offsets.get(word_id),
+            self.child_offsets.get(word_id + 1),
+        ) {
+            (Some(&start), Some(&end)) => &self.child_ids[start..end],
+            _ => &[],
+        }
+    }
+
+    /// Ids of the children of `word_id` whose deprel is `deprel`, in word order
+    ///
+    /// Scans only that word's slice of the child index, comparing symbols in
+    /// the packed deprel column.
+    pub fn children_with_deprel(
+        &self,
+        word_id: WordId,
+        deprel: Sym,
+    ) -> impl Iterator<Item = WordId> + '_ {
+        self.children_of(word_id)
+            .iter()
+            .copied()
+            .filter(move |&child| self.deprel_of(child) == deprel)
     }
 
     pub fn word(&self, id: WordId) -> Result<&Word, String> {
@@ -240,11 +361,31 @@ impl Tree {
     }
 
     pub fn children_ids(&self, word_id: WordId) -> Result<Vec<WordId>, String> {
-        Ok(self.word(word_id)?.children.clone())
+        self.word(word_id)?;
+        Ok(self.children_of(word_id).to_vec())
+    }
+
+    /// Head of `word_id` (panics if the id is invalid), read from the head
+    /// column
+    #[inline]
+    pub fn head_of(&self, word_id: WordId) -> Option<WordId> {
+        match self.tag_columns().head[word_id] {
+            NO_HEAD => None,
+            head => Some(head as WordId),
+        }
     }
 
+    /// Deprel of `word_id` (panics if the id is invalid), read from the deprel
+    /// column
+    #[inline]
+    pub fn deprel_of(&self, word_id: WordId) -> Sym {
+        self.tag_columns().deprel[word_id]
+    }
+
+    /// Whether `to_id` is a child of `from_id`, read from the head column
+    /// rather than searching the parent's child list
     pub fn check_rel(&self, from_id: WordId, to_id: WordId) -> bool {
-        self.words[from_id].children.contains(&to_id)
+        self.head_of(to_id) == Some(from_id)
     }
 
     /// Find dependency path from ancestor X to descendant Y.
@@ -273,38 +414,35 @@ impl Tree {
             return None;
         }
 
-        let mut path = vec![x];
-        self.dfs_find_path(x, y, &mut path)
-    }
-
-    /// Helper method for find_path: DFS traversal to find target node.
-    fn dfs_find_path<'a>(
-        &'a self,
-        current: &'a Word,
-        target: &'a Word,
-        path: &mut Vec<&'a Word>,
-    ) -> Option<Vec<&'a Word>> {
-        // Check each child
-        for &child_id in &current.children {
-            let child = &self.words[child_id];
-
-            // Found target
-            if child.id == target.id {
-                path.push(child);
-                return Some(path.clone());
+        // Walk up from Y through its heads until reaching X or the root
+        let mut path = vec![y];
+        let mut current = y;
+        while let Some(head) = current.head {
+            current = &self.words[head];
+            path.push(current);
+            if current.id == x.id {
+                path.reverse();
+                return Some(path);
             }
-
-            // Recursively search in child's subtree
-            path.push(child);
-            if let Some(found) = self.dfs_find_path(child, target, path) {
-                return Some(found);
+            if path.len() > self.words.len() {
+                break; // Cyclic heads in malformed input
             }
-            path.pop(); // backtrack
         }
 
         None
     }
 
+    /// Tag columns built by the last `compile_tree`
+    #[inline]
+    pub fn tag_columns(&self) -> &TagColumns {
+        debug_assert_eq!(
+            self.columns.head.len(),
+            self.words.len(),
+            "words changed since compile_tree()"
+        );
+        &self.columns
+    }
+
     pub fn len(&self) -> usize {
         self.words.len()
     }
@@ -378,6 +516,79 @@ mod tests {
         let verb = tree.word(0).unwrap();
         let obliques = verb.children_by_deprel(&tree, "obl");
         assert_eq!(obliques.len(), 2);
+
+        let obl = tree.string_pool.get(b"obl").unwrap();
+        assert_eq!(
+            tree.children_with_deprel(0, obl).collect::<Vec<_>>(),
+            [2, 3]
+        );
+        assert_eq!(tree.children_with_deprel(2, obl).count(), 0);
+    }
+
+    #[test]
+    fn test_has_child() {
+        let mut tree = Tree::default();
+        tree.add_minimal_word(0, b"helped", b"help", b"VERB", b"VBD", None, b"root");
+        tree.add_minimal_word(1, b"us", b"we", b"PRON", b"PRP", Some(0), b"obj");
+        tree.add_minimal_word(2, b"to", b"to", b"PART", b"TO", Some(3), b"mark");
+        tree.add_minimal_word(3, b"win", b"win", b"VERB", b"VB", Some(0), b"xcomp");
+        tree.compile_tree();
+
+        let help = &tree.words[0];
+        let win = &tree.words[3];
+        assert!(help.has_child(&tree, "obj", None));
+        assert!(!help.has_child(&tree, "mark", None));
+        assert!(win.has_child(&tree, "mark", Some("TO")));
+        assert!(!win.has_child(&tree, "mark", Some("IN")));
+        assert!(!win.has_child(&tree, "nosuchlabel", None));
+    }
+
+    #[test]
+    fn test_tag_columns() {
+        let mut tree = Tree::default();
+        tree.add_minimal_word(0, b"runs", b"run", b"VERB", b"VBZ", None, b"root");
+        tree.add_minimal_word(1, b"dog", b"dog", b"NOUN", b"NN", Some(0), b"nsubj");
+        tree.compile_tree();
+
+        let columns = tree.tag_columns();
+        let upos: Vec<Sym> = tree.words.iter().map(|w| w.upos).collect();
+        let deprel: Vec<Sym> = tree.words.iter().map(|w| w.deprel).collect();
+        assert_eq!(columns.upos, upos);
+        assert_eq!(columns.deprel, deprel);
+        assert_eq!(columns.head, vec![NO_HEAD, 0]);
+        assert_eq!(tree.head_of(0), None);
+        assert_eq!(tree.head_of(1), Some(0));
+        assert!(tree.check_rel(0, 1));
+        assert!(!tree.check_rel(1, 0));
+        assert_eq!(tree.deprel_of(1), deprel[1]);
+
+        // Words pushed directly are picked up by the next compile_tree()
+        let extra = tree.words[1].clone();
+        tree.words.push(extra);
+        tree.compile_tree();
+        assert_eq!(tree.tag_columns().head, vec![NO_HEAD, 0, 0]);
+        assert!(tree.check_rel(0, 2));
+        assert_eq!(tree.deprel_of(2), deprel[1]);
+    }
+
+    #[test]
+    fn test_children_of() {
+        let mut tree = Tree::default();
+        tree.add_minimal_word(0, b"The", b"the", b"DET", b"DT", Some(1), b"det");
+        tree.add_minimal_word(1, b"dog", b"dog", b"NOUN", b"NN", Some(2), b"nsubj");
+        tree.add_minimal_word(2, b"runs", b"run", b"VERB", b"VBZ", None, b"root");
+        tree.add_minimal_word(3, b"fast", b"fast", b"ADV", b"RB", Some(2), b"advmod");
+        assert!(tree.children_of(2).is_empty());
+
+        tree.compile_tree();
+        assert_eq!(tree.children_of(0), &[] as &[WordId]);
+        assert_eq!(tree.children_of(1), &[0]);
+        assert_eq!(tree.children_of(2), &[1, 3]);
+        assert_eq!(tree.root_id, Some(2));
+
+        // Compiling again rebuilds rather than appending
+        tree.compile_tree();
+        assert_eq!(tree.children_of(2), &[1, 3]);
     }
 
     #[test]
@@ -424,5 +635,13 @@ mod tests {
 
         // Same node
         assert!(tree.find_path(&tree.words[0], &tree.words[0]).is_none());
+
+        // Cyclic heads (malformed input) terminate without a path
+        let mut tree = Tree::default();
+        tree.add_minimal_word(0, b"a", b"a", b"X", b"_", Some(1), b"dep");
+        tree.add_minimal_word(1, b"b", b"b", b"X", b"_", Some(0), b"dep");
+        tree.add_minimal_word(2, b"c", b"c", b"X", b"_", Some(0), b"dep");
+        tree.compile_tree();
+        assert!(tree.find_path(&tree.words[2], &tree.words[0]).is_none());
     }
 }
@@ -10,6 +10,9 @@ Algorithm correctness is tested in the Rust test suite.
 """
 
 import gzip
+import pickle
+from collections.abc import Mapping
+from pathlib import Path
 
 import pytest
 
@@ -21,7 +24,7 @@ import treesearch
 # ==============================================================================
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_conllu():
     """Simple CoNLL-U test data."""
     return """# text = He helped us to win.
@@ -35,7 +38,7 @@ def sample_conllu():
 """
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def complex_conllu():
     """CoNLL-U data with metadata and xpos."""
     return """# sent_id = 1
@@ -49,7 +52,7 @@ def complex_conllu():
 """
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def multi_tree_conllu():
     """CoNLL-U data with multiple trees."""
     return """# text = The dog runs.
@@ -64,32 +67,46 @@ def multi_tree_conllu():
 """
 
 
-@pytest.fixture
-def temp_conllu_file(sample_conllu, tmp_path):
+# The file fixtures are only ever read, so each is written once per session
+@pytest.fixture(scope="session")
+def temp_conllu_file(sample_conllu, tmp_path_factory):
     """Create a temporary CoNLL-U file."""
-    path = tmp_path / "test.conllu"
+    path = tmp_path_factory.mktemp("conllu") / "test.conllu"
     path.write_text(sample_conllu)
     return str(path)
 
 
-@pytest.fixture
-def temp_gzip_file(sample_conllu, tmp_path):
+@pytest.fixture(scope="session")
+def temp_gzip_file(sample_conllu, tmp_path_factory):
     """Create a temporary gzipped CoNLL-U file."""
-    path = tmp_path / "test.conllu.gz"
+    path = tmp_path_factory.mktemp("gzip") / "test.conllu.gz"
     with gzip.open(path, "wt", encoding="utf-8") as f:
         f.write(sample_conllu)
     return str(path)
 
 
-@pytest.fixture
-def temp_multi_files(multi_tree_conllu, tmp_path):
+@pytest.fixture(scope="session")
+def temp_multi_files(multi_tree_conllu, tmp_path_factory):
     """Create multiple temporary CoNLL-U files."""
+    tmpdir = tmp_path_factory.mktemp("multi")
     files = []
     for i in range(3):
-        path = tmp_path / f"test_{i}.conllu"
+        path = tmpdir / f"test_{i}.conllu"
         path.write_text(multi_tree_conllu)
         files.append(str(path))
-    return tmp_path, files
+    return tmpdir, files
+
+
+@pytest.fixture(scope="session")
+def tree(sample_conllu):
+    """The parsed tree of sample_conllu, shared by every test that only reads it."""
+    return list(treesearch.Treebank.from_string(sample_conllu).trees())[0]
+
+
+@pytest.fixture(scope="session")
+def complex_tree(complex_conllu):
+    """The parsed tree of complex_conllu."""
+    return list(treesearch.Treebank.from_string(complex_conllu).trees())[0]
 
 
 # ==============================================================================
@@ -124,6 +141,62 @@ class TestPattern:
             with pytest.raises(Exception):
                 treesearch.compile_query(query)
 
+    @pytest.mark.parametrize(
+        "query, shape",
+        [
+            ('MATCH { V [upos="VERB"]; }', "single_node"),
+            ("MATCH { V []; O []; V -[obj]-> O; }", "single_edge"),
+            ("MATCH { V []; O []; V << O; }", "general"),
+            ("MATCH { V []; O []; V -> O; } OPTIONAL { S []; V -[nsubj]-> S; }", "general"),
+        ],
+    )
+    def test_pattern_shape(self, query, shape):
+        """Pattern.shape classifies the compiled pattern."""
+        assert treesearch.compile_query(query).shape == shape
+
+    def test_module_functions_reuse_compiled_queries(self, temp_conllu_file):
+        """Repeated query strings are compiled once and the Pattern is reused."""
+        query = 'MATCH { V [upos="VERB"]; O []; V -[obj]-> O; }'
+        first = list(treesearch.search(temp_conllu_file, query))
+        hits = treesearch.compile_query.cache_info().hits
+        second = list(treesearch.search(temp_conllu_file, query))
+        assert treesearch.compile_query.cache_info().hits == hits + 1
+        assert [m for _, m in first] == [m for _, m in second]
+
+    def test_compile_query_is_cached(self):
+        """Compiling the same string twice returns the same Pattern."""
+        query = 'MATCH { V [upos="VERB"]; N []; V -[nsubj]-> N; }'
+        treesearch.compile_query.cache_clear()
+        assert treesearch.compile_query(query) is treesearch.compile_query(query)
+        assert treesearch.compile_query.cache_info().hits == 1
+
+    def test_precompile(self, temp_conllu_file):
+        """precompile() returns Patterns that searches by string then reuse."""
+        queries = {"verbs": 'MATCH { V [upos="VERB"]; }', "nouns": 'MATCH { N [upos="NOUN"]; }'}
+        patterns = treesearch.precompile(queries)
+        assert set(patterns) == {"verbs", "nouns"}
+        assert patterns["verbs"] is treesearch.compile_query(queries["verbs"])
+        assert treesearch.count(temp_conllu_file, queries["nouns"]) == treesearch.count(
+            temp_conllu_file, patterns["nouns"]
+        )
+
+    def test_treebank_methods_share_query_cache(self, sample_conllu):
+        """Query strings passed to Treebank methods go through compile_query()'s cache."""
+        query = 'MATCH { V [upos="VERB"]; A []; V -[advmod]-> A; }'
+        treesearch.compile_query.cache_clear()
+        tb = treesearch.Treebank.from_string(sample_conllu)
+        list(tb.search(query))
+        list(tb.filter(query))
+        assert treesearch.compile_query.cache_info().hits == 1
+        assert tb.count(query) == 0
+        assert treesearch.compile_query.cache_info().hits == 2
+
+    def test_module_search_checks_query_before_source(self, tmp_path):
+        """An invalid query fails before the source is looked at."""
+        with pytest.raises(ValueError, match="Query parse error"):
+            treesearch.search(f"{tmp_path}/[", "MATCH { V [upos=; }")
+
+
 
 # ==============================================================================
 # Tree Reading Tests
@@ -177,49 +250,47 @@ class TestTreeReading:
 class TestTreeProperties:
     """Tests for Tree object properties."""
 
-    def test_sentence_text(self, sample_conllu):
+    def test_sentence_text(self, tree):
         """Tree.sentence_text returns the text annotation."""
-        tree = list(treesearch.Treebank.from_string(sample_conllu).trees())[0]
         assert tree.sentence_text == "He helped us to win."
 
-    def test_metadata(self, complex_conllu):
+    def test_metadata(self, complex_tree):
         """Tree.metadata returns a dict of metadata."""
-        tree = list(treesearch.Treebank.from_string(complex_conllu).trees())[0]
-        assert isinstance(tree.metadata, dict)
-        assert tree.metadata["sent_id"] == "1"
-        assert tree.metadata["source"] == "test"
+        assert isinstance(complex_tree.metadata, dict)
+        assert complex_tree.metadata["sent_id"] == "1"
+        assert complex_tree.metadata["source"] == "test"
 
-    def test_len(self, sample_conllu):
+    def test_root(self, tree):
+        """Tree.root returns the word without a head."""
+        assert tree.root.form == "helped"
+        assert tree.root.head is None
+        assert tree.root.parent() is None
+
+    def test_len(self, tree):
         """len(tree) returns word count."""
-        tree = list(treesearch.Treebank.from_string(sample_conllu).trees())[0]
         assert len(tree) == 6
 
-    def test_repr(self, sample_conllu):
+    def test_repr(self, tree):
         """Tree repr shows length and words."""
-        tree = list(treesearch.Treebank.from_string(sample_conllu).trees())[0]
         assert "<Tree len=6" in repr(tree)
 
-    def test_getitem(self, sample_conllu):
+    def test_getitem(self, tree):
         """tree[i] returns word by index."""
-        tree = list(treesearch.Treebank.from_string(sample_conllu).trees())[0]
         word = tree[0]
         assert word.form == "He"
 
-    def test_getitem_out_of_bounds(self, sample_conllu):
+    def test_getitem_out_of_bounds(self, tree):
         """tree[invalid] raises IndexError."""
-        tree = list(treesearch.Treebank.from_string(sample_conllu).trees())[0]
         with pytest.raises(IndexError):
             tree[999]
 
-    def test_word_method(self, sample_conllu):
+    def test_word_method(self, tree):
         """tree.word(i) returns word by index."""
-        tree = list(treesearch.Treebank.from_string(sample_conllu).trees())[0]
         word = tree.word(1)
         assert word.form == "helped"
 
-    def test_word_out_of_bounds(self, sample_conllu):
+    def test_word_out_of_bounds(self, tree):
         """tree.word(invalid) raises IndexError with message."""
-        tree = list(treesearch.Treebank.from_string(sample_conllu).trees())[0]
         with pytest.raises(IndexError, match="word index out of range: 999"):
             tree.word(999)
 
@@ -232,14 +303,6 @@ class TestTreeProperties:
 class TestWordProperties:
     """Tests for Word object properties."""
 
-    @pytest.fixture
-    def tree(self, sample_conllu):
-        return list(treesearch.Treebank.from_string(sample_conllu).trees())[0]
-
-    @pytest.fixture
-    def complex_tree(self, complex_conllu):
-        return list(treesearch.Treebank.from_string(complex_conllu).trees())[0]
-
     def test_basic_properties(self, tree):
         """Word has form, lemma, upos, deprel."""
         word = tree.word(1)  # "helped"
@@ -274,9 +337,8 @@ class TestWordProperties:
         assert isinstance(word.feats, dict)
         assert word.feats.get("Definite") == "Def"
 
-    def test_feats_empty(self, sample_conllu):
+    def test_feats_empty(self, tree):
         """Word.feats returns empty dict when no features."""
-        tree = list(treesearch.Treebank.from_string(sample_conllu).trees())[0]
         assert tree.word(0).feats == {}
 
     def test_misc_as_dict(self, complex_tree):
@@ -302,10 +364,6 @@ class TestWordProperties:
 class TestWordNavigation:
     """Tests for Word navigation methods."""
 
-    @pytest.fixture
-    def tree(self, sample_conllu):
-        return list(treesearch.Treebank.from_string(sample_conllu).trees())[0]
-
     def test_parent(self, tree):
         """word.parent() returns parent Word."""
         word = tree.word(0)  # "He"
@@ -344,6 +402,22 @@ class TestWordNavigation:
         verb = tree.word(1)
         assert verb.children_by_deprel("nonexistent") == []
 
+    def test_find_path(self, tree):
+        """tree.find_path returns the words from ancestor to descendant."""
+        path = tree.find_path(tree.word(1), tree.word(3))  # helped -> win -> to
+        assert [w.form for w in path] == ["helped", "win", "to"]
+        assert tree.find_path(tree.word(3), tree.word(1)) is None
+        assert tree.find_path(tree.word(1), tree.word(1)) is None
+
+    def test_has_child(self, tree):
+        """word.has_child checks deprel and optional xpos."""
+        verb = tree.word(1)  # "helped"
+        assert verb.has_child("obj")
+        assert not verb.has_child("nonexistent")
+        win = tree.word(4)
+        assert win.has_child("mark", "TO")
+        assert not win.has_child("mark", "IN")
+
 
 # ==============================================================================
 # Search Tests - API Surface
@@ -353,10 +427,6 @@ class TestWordNavigation:
 class TestSearch:
     """Tests for search functionality - API correctness."""
 
-    @pytest.fixture
-    def tree(self, sample_conllu):
-        return list(treesearch.Treebank.from_string(sample_conllu).trees())[0]
-
     def test_search_returns_iterator(self, sample_conllu):
         """Treebank.search returns an iterator."""
         tb = treesearch.Treebank.from_string(sample_conllu)
@@ -364,14 +434,63 @@ class TestSearch:
         assert hasattr(result, "__iter__")
         assert hasattr(result, "__next__")
 
-    def test_search_yields_tree_and_dict(self, sample_conllu):
-        """Search yields (tree, match_dict) tuples."""
+    def test_search_batch(self, temp_multi_files):
+        """search_batch() tags each match with its pattern's index."""
+        tmpdir, _ = temp_multi_files
+        tb = treesearch.load(f"{tmpdir}/*.conllu")
+        queries = ['MATCH { V [upos="VERB"]; }', 'MATCH { N [upos="NOUN"]; }']
+        results = list(tb.search_batch([queries[0], treesearch.compile_query(queries[1])]))
+        assert isinstance(tb.search_batch(queries), treesearch.BatchMatchIterator)
+        for i, query in enumerate(queries):
+            batched = [(t.sentence_text, dict(m)) for j, t, m in results if j == i]
+            assert batched == [(t.sentence_text, dict(m)) for t, m in tb.search(query)]
+
+    def test_search_yields_tree_and_match(self, sample_conllu):
+        """Search yields (tree, match) tuples; matches behave as read-only dicts."""
         tb = treesearch.Treebank.from_string(sample_conllu)
         for tree, match in tb.search('MATCH { V [upos="VERB"]; }'):
             assert hasattr(tree, "word")
-            assert isinstance(match, dict)
+            assert isinstance(match, treesearch.Match)
+            assert isinstance(match, Mapping)
+            assert dict(match) == {"V": match["V"]}
+            assert match == {"V": match["V"]}
             break
 
+    def test_match_mapping_methods(self, sample_conllu):
+        """Match has the full read-only mapping interface."""
+        tb = treesearch.Treebank.from_string(sample_conllu)
+        _, match = next(iter(tb.search('MATCH { V [upos="VERB"]; O []; V -[obj]-> O; }')))
+        assert match.values() == [match[name] for name in match.keys()]
+        assert match.to_dict() == dict(match.items())
+        assert type(match.to_dict()) is dict
+
+    def test_match_pickles(self, sample_conllu):
+        """A pickled Match comes back as an equal Match."""
+        tb = treesearch.Treebank.from_string(sample_conllu)
+        query = 'MATCH { V [upos="VERB"]; } OPTIONAL { S []; V -[nsubj]-> S; }'
+        for _, match in tb.search(query):
+            copy = pickle.loads(pickle.dumps(match))
+            assert isinstance(copy, treesearch.Match)
+            assert copy == match
+            assert copy.get("S") == match.get("S")
+
+    def test_match_indexed_by_slot(self, sample_conllu):
+        """Match accepts slots from Pattern.slot() as well as names."""
+        tb = treesearch.Treebank.from_string(sample_conllu)
+        pattern = treesearch.compile_query('MATCH { V [upos="VERB"]; O []; V -[obj]-> O; }')
+        verb, obj = pattern.slot("V"), pattern.slot("O")
+        assert {verb, obj} == {0, 1}
+        tree, match = next(iter(tb.search(pattern)))
+        assert match[verb] == match["V"]
+        assert tree.word(match[obj]).form == "us"
+        assert match.get(obj) == match["O"]
+
+    def test_pattern_slot_unknown_raises_keyerror(self):
+        """Pattern.slot raises KeyError for a name not in the query."""
+        pattern = treesearch.compile_query('MATCH { V [upos="VERB"]; }')
+        with pytest.raises(KeyError):
+            pattern.slot("X")
+
     def test_search_accepts_string_query(self, sample_conllu):
         """Treebank.search accepts query string directly."""
         tb = treesearch.Treebank.from_string(sample_conllu)
@@ -404,6 +523,12 @@ class TestSearch:
         matches = list(treesearch.search_trees(tree, 'MATCH { V [upos="VERB"]; }'))
         assert len(matches) == 2
 
+    def test_matches_in_one_tree_share_tree_object(self, tree):
+        """Consecutive matches in the same tree yield the same Tree object."""
+        matches = list(treesearch.search_trees(tree, 'MATCH { V [upos="VERB"]; }'))
+        assert len(matches) == 2
+        assert matches[0][0] is matches[1][0]
+
     def test_search_trees_with_list(self, sample_conllu, multi_tree_conllu, tmp_path):
         """search_trees works on list of trees."""
         path = tmp_path / "multi.conllu"
@@ -412,6 +537,34 @@ class TestSearch:
         matches = list(treesearch.search_trees(trees, 'MATCH { V [upos="VERB"]; }'))
         assert len(matches) == 2  # One verb per tree
 
+    def test_search_trees_consumes_generator_lazily(self, tree):
+        """search_trees pulls trees from a generator only as results are read."""
+        pulled = []
+
+        def gen():
+            for i in range(2000):
+                pulled.append(i)
+                yield tree
+
+        results = treesearch.search_trees(gen(), 'MATCH { V [upos="VERB"]; }')
+        assert pulled == []
+        next(results)
+        assert 0 < len(pulled) < 2000
+        assert len(list(results)) == 2 * 2000 - 1
+
+    def test_search_trees_from_unordered_trees(self, multi_tree_conllu, tmp_path):
+        """search_trees() reads trees(ordered=False) from several files to the end."""
+        for i in range(8):
+            (tmp_path / f"test_{i}.conllu").write_text(multi_tree_conllu * 100)
+        trees = treesearch.load(f"{tmp_path}/*.conllu").trees(ordered=False)
+        matches = list(treesearch.search_trees(trees, 'MATCH { V [upos="VERB"]; }'))
+        assert len(matches) == 8 * 200
+
+    def test_search_trees_rejects_non_tree_items(self, tree):
+        """A non-Tree item raises TypeError once iteration reaches it."""
+        with pytest.raises(TypeError):
+            list(treesearch.search_trees([tree, "not a tree"], 'MATCH { V [upos="VERB"]; }'))
+
 
 # ==============================================================================
 # Filter Tests
@@ -453,6 +606,119 @@ class TestFilter:
         assert len(trees) == 0
 
 
+# ==============================================================================
+# Projection Tests
+# ==============================================================================
+
+
+class TestProject:
+    """Tests for Treebank.project method."""
+
+    def test_project_yields_tuples(self, sample_conllu):
+        """project() yields one tuple of plain values per match."""
+        tb = treesearch.Treebank.from_string(sample_conllu)
+        query = 'MATCH { H [upos="VERB"]; X [upos="VERB"]; H -[xcomp]-> X; }'
+        rows = list(
+            tb.project(
+                query,
+                ["H.form.lower", "H.has_child(obj)", "X.has_child(mark, TO)", "X.id - H.id"],
+            )
+        )
+        assert rows == [("helped", True, True, 3)]
+
+    def test_next_batch(self, temp_multi_files):
+        """next_batch() returns lists of results, then an empty list."""
+        tmpdir, _ = temp_multi_files
+        tb = treesearch.load(f"{tmpdir}/*.conllu")
+        query = 'MATCH { V [upos="VERB"]; }'
+        rows = tb.project(query, ["V.lemma"])
+        batches = []
+        while batch := rows.next_batch(4):
+            batches.append(batch)
+        assert [len(b) for b in batches] == [4, 2]
+        assert sum(batches, []) == list(tb.project(query, ["V.lemma"]))
+
+        matches = tb.search(query).next_batch()
+        assert len(matches) == 6
+        assert all(isinstance(tree, treesearch.Tree) for tree, _ in matches)
+
+    def test_project_metadata(self, complex_conllu):
+        """project() can read sentence text and metadata."""
+        tb = treesearch.Treebank.from_string(complex_conllu)
+        exprs = ["meta.sent_id", "text", "V.feats.Tense"]
+        rows = list(tb.project('MATCH { V [upos="VERB"]; }', exprs))
+        assert rows == [("1", "The big dog runs.", "Pres")]
+
+    def test_project_dependency_path(self, sample_conllu):
+        """path(A, B) joins the deprels from A down to B."""
+        tb = treesearch.Treebank.from_string(sample_conllu)
+        query = 'MATCH { H [lemma="help"]; T [lemma="to"]; }'
+        rows = list(tb.project(query, ["path(H, T)", "path(T, H)"]))
+        assert rows == [("xcomp/mark", None)]
+
+    def test_project_unbound_optional_is_none(self, sample_conllu):
+        """Unbound OPTIONAL variables project to None."""
+        tb = treesearch.Treebank.from_string(sample_conllu)
+        query = 'MATCH { V [lemma="help"]; } OPTIONAL { A [deprel="aux"]; V -> A; }'
+        rows = list(tb.project(query, ["V.lemma", "A.lemma"]))
+        assert rows == [("help", None)]
+
+    def test_project_invalid_expression_raises_valueerror(self, sample_conllu):
+        """Invalid projection expressions raise ValueError."""
+        tb = treesearch.Treebank.from_string(sample_conllu)
+        with pytest.raises(ValueError, match="Projection error"):
+            tb.project('MATCH { V [upos="VERB"]; }', ["V.colour"])
+
+    def test_project_unknown_variable_raises_valueerror(self, sample_conllu):
+        """A variable that isn't in the query raises ValueError instead of yielding None."""
+        tb = treesearch.Treebank.from_string(sample_conllu)
+        query = 'MATCH { H [upos="VERB"]; X [upos="VERB"]; H -[xcomp]-> X; }'
+        with pytest.raises(ValueError, match="unknown variable 'Haed'"):
+            tb.project(query, ["Haed.lemma"])
+        with pytest.raises(ValueError, match="unknown variable 'Hed'"):
+            tb.count(query, "X.id - Hed.id")
+        # OPTIONAL variables are known even when left unbound
+        optional = query + " OPTIONAL { S []; H -[nsubj]-> S; }"
+        assert tb.count(optional, "S.lemma") == {"he": 1}
+
+
+class TestCount:
+    """Tests for Treebank.count method."""
+
+    def test_count_single_key(self, temp_multi_files):
+        """A single expression produces scalar keys."""
+        tmpdir, _ = temp_multi_files
+        tb = treesearch.load(f"{tmpdir}/*.conllu")
+        counts = tb.count('MATCH { V [upos="VERB"]; }', "V.lemma")
+        assert counts == {"run": 3, "sleep": 3}
+
+    def test_count_tuple_key(self, sample_conllu):
+        """A list of expressions produces tuple keys."""
+        tb = treesearch.Treebank.from_string(sample_conllu)
+        counts = tb.count('MATCH { V [upos="VERB"]; }', ["V.lemma", "V.has_child(obj)"])
+        assert counts == {("help", True): 1, ("win", False): 1}
+
+    def test_count_module_function(self, temp_multi_files):
+        """treesearch.count() matches Treebank.count()."""
+        tmpdir, _ = temp_multi_files
+        counts = treesearch.count(f"{tmpdir}/*.conllu", 'MATCH { N [upos="NOUN"]; }', "N.form")
+        assert counts == {"dog": 3, "Cats": 3}
+
+    def test_count_without_key_returns_total(self, temp_multi_files):
+        """Without a key, count() returns the number of matches."""
+        tmpdir, _ = temp_multi_files
+        query = 'MATCH { V [upos="VERB"]; }'
+        tb = treesearch.load(f"{tmpdir}/*.conllu")
+        assert tb.count(query) == len(list(tb.search(query)))
+        assert treesearch.count(f"{tmpdir}/*.conllu", query) == 6
+
+    def test_count_invalid_expression_raises_valueerror(self, sample_conllu):
+        """Invalid key expressions raise ValueError."""
+        tb = treesearch.Treebank.from_string(sample_conllu)
+        with pytest.raises(ValueError, match="Projection error"):
+            tb.count('MATCH { V [upos="VERB"]; }', "V.colour")
+
+
 # ==============================================================================
 # Multi-file Tests
 # ==============================================================================
@@ -483,6 +749,27 @@ class TestMultiFile:
         for t1, t2 in zip(ordered1, ordered2):
             assert t1.sentence_text == t2.sentence_text
 
+    def test_search_unordered(self, temp_multi_files):
+        """search_unordered() finds the same matches as search(), in any order."""
+        tmpdir, _ = temp_multi_files
+        source = f"{tmpdir}/*.conllu"
+        query = 'MATCH { V [upos="VERB"]; }'
+        results = treesearch.search_unordered(source, query)
+        unordered = [(t.sentence_text, dict(m)) for t, m in results]
+        ordered = [(t.sentence_text, dict(m)) for t, m in treesearch.search(source, query)]
+        assert sorted(unordered, key=repr) == sorted(ordered, key=repr)
+
+    def test_search_many(self, temp_multi_files):
+        """search_many() matches search() for each query, tagged by index."""
+        tmpdir, _ = temp_multi_files
+        source = f"{tmpdir}/*.conllu"
+        queries = ['MATCH { V [upos="VERB"]; }', 'MATCH { N [upos="NOUN"]; }']
+        results = list(treesearch.search_many(source, iter(queries)))
+        for i, query in enumerate(queries):
+            batched = [(t.sentence_text, dict(m)) for j, t, m in results if j == i]
+            single = treesearch.search(source, query)
+            assert batched == [(t.sentence_text, dict(m)) for t, m in single]
+
     def test_search_glob(self, temp_multi_files):
         """search() works with glob pattern."""
         tmpdir, _ = temp_multi_files
@@ -494,6 +781,66 @@ class TestMultiFile:
         results = list(treesearch.load(f"{tmp_path}/nonexistent/*.conllu").trees())
         assert len(results) == 0
 
+    def test_load_path_is_literal(self, multi_tree_conllu, tmp_path):
+        """Path objects are opened as-is, even if the name has glob characters."""
+        path = tmp_path / "shard[1].conllu"
+        path.write_text(multi_tree_conllu)
+        expected = len(list(treesearch.from_string(multi_tree_conllu).trees()))
+        assert len(list(treesearch.load(path).trees())) == expected
+
+    def test_load_recursive_glob(self, multi_tree_conllu, tmp_path):
+        """** in a glob matches files in nested directories."""
+        for sub in ["a", "a/b", "c"]:
+            (tmp_path / sub).mkdir(parents=True, exist_ok=True)
+            (tmp_path / sub / "x.conllu").write_text(multi_tree_conllu)
+        trees = list(treesearch.load(f"{tmp_path}/**/*.conllu").trees())
+        assert len(trees) == 3 * len(list(treesearch.from_string(multi_tree_conllu).trees()))
+
+    def test_load_glob_sees_new_files(self, multi_tree_conllu, tmp_path):
+        """Loading the same glob again picks up files added since."""
+        (tmp_path / "a.conllu").write_text(multi_tree_conllu)
+        n = len(list(treesearch.load(f"{tmp_path}/*.conllu").trees()))
+        (tmp_path / "b.conllu").write_text(multi_tree_conllu)
+        assert len(list(treesearch.load(f"{tmp_path}/*.conllu").trees())) == 2 * n
+
+    def test_glob_visits_paths_in_sorted_order(self, tmp_path):
+        """Glob matches across directories are read in sorted path order."""
+        for rel in ["b/x", "a/y", "a/x"]:
+            path = tmp_path / f"{rel}.conllu"
+            path.parent.mkdir(exist_ok=True)
+            path.write_text(f"# text = {rel}\n1\tw\tw\tX\t_\t_\t0\troot\t_\t_\n\n")
+        texts = [t.sentence_text for t in treesearch.load(f"{tmp_path}/*/*.conllu").trees()]
+        assert texts == ["a/x", "a/y", "b/x"]
+
+    def test_from_glob(self, temp_multi_files):
+        """Treebank.from_glob expands the pattern in Rust, in sorted order."""
+        tmpdir, files = temp_multi_files
+        tb = treesearch.Treebank.from_glob(f"{tmpdir}/*.conllu")
+        from_files = treesearch.Treebank.from_files(sorted(files))
+        texts = [t.sentence_text for t in tb.trees()]
+        assert texts == [t.sentence_text for t in from_files.trees()]
+        assert len(texts) == 6
+
+    def test_from_files_accepts_path_generator(self, temp_multi_files):
+        """from_files() and load() take any iterable of str or Path objects."""
+        tmpdir, files = temp_multi_files
+        tb = treesearch.Treebank.from_files(Path(f) for f in sorted(files))
+        assert len(list(tb.trees())) == 6
+        assert len(list(treesearch.load(Path(tmpdir).glob("*.conllu")).trees())) == 6
+        with pytest.raises(TypeError):
+            treesearch.Treebank.from_files(files[0])
+
+    def test_from_glob_invalid_pattern_raises_valueerror(self, tmp_path):
+        """Invalid glob patterns raise ValueError."""
+        with pytest.raises(ValueError, match="Glob pattern error"):
+            treesearch.Treebank.from_glob(f"{tmp_path}/***.conllu")
+
+    def test_load_missing_file_raises_oserror(self, tmp_path):
+        """load() of a plain path opens it directly, so a missing file is an error."""
+        trees = treesearch.load(f"{tmp_path}/missing.conllu").trees()
+        with pytest.raises(OSError, match="Failed to open file"):
+            list(trees)
+
 
 # ==============================================================================
 # Constraint Type Tests
@@ -653,6 +1000,9 @@ class TestExceptOptional:
         assert len(matches) == 1
         _, match = matches[0]
         assert "S" not in match
+        assert match.get("S") is None
+        with pytest.raises(KeyError):
+            match["S"]
 
 
 # ==============================================================================
@@ -753,9 +1103,16 @@ class TestIntegration:
 class TestVisualization:
     """Tests for visualization functions."""
 
-    def test_to_displacy_structure(self, sample_conllu):
+    def test_displacy_columns(self, tree):
+        """Tree.displacy_columns returns parallel per-word lists."""
+        forms, tags, heads, deprels = tree.displacy_columns()
+        assert forms == [tree.word(i).form for i in range(len(tree))]
+        assert tags == [tree.word(i).upos for i in range(len(tree))]
+        assert heads == [tree.word(i).head for i in range(len(tree))]
+        assert deprels == [tree.word(i).deprel for i in range(len(tree))]
+
+    def test_to_displacy_structure(self, tree):
         """to_displacy returns correct structure."""
-        tree = list(treesearch.Treebank.from_string(sample_conllu).trees())[0]
         data = treesearch.to_displacy(tree)
 
         assert "words" in data
@@ -763,18 +1120,16 @@ class TestVisualization:
         assert isinstance(data["words"], list)
         assert isinstance(data["arcs"], list)
 
-    def test_to_displacy_words(self, sample_conllu):
+    def test_to_displacy_words(self, tree):
         """to_displacy words have text and tag."""
-        tree = list(treesearch.Treebank.from_string(sample_conllu).trees())[0]
         data = treesearch.to_displacy(tree)
 
         assert len(data["words"]) == 6
         assert data["words"][0] == {"text": "He", "tag": "PRON"}
         assert data["words"][1] == {"text": "helped", "tag": "VERB"}
 
-    def test_to_displacy_arcs(self, sample_conllu):
+    def test_to_displacy_arcs(self, tree):
         """to_displacy arcs have start, end, label, dir."""
-        tree = list(treesearch.Treebank.from_string(sample_conllu).trees())[0]
         data = treesearch.to_displacy(tree)
 
         # Check that arcs exist and have correct structure
@@ -803,9 +1158,8 @@ class TestVisualization:
         assert nsubj_arc["end"] == 1
         assert nsubj_arc["dir"] == "left"
 
-    def test_tree_to_displacy_method(self, sample_conllu):
+    def test_tree_to_displacy_method(self, tree):
         """Tree.to_displacy() works as instance method."""
-        tree = list(treesearch.Treebank.from_string(sample_conllu).trees())[0]
         data = tree.to_displacy()
 
         assert "words" in data